@@ -0,0 +1,116 @@
+"""
+/api/search 合并结果的序列化与压缩基准：JSONResponse（标准库 json）与 index.json_backend 的序列化耗时，
+以及 gzip / br / zstd 各级别的传输字节数与压缩耗时
+
+用法:
+    PYTHONPATH=src python benchmarks/bench_compression.py [录制的合并响应.json ...]
+
+不传文件时生成模拟的合并结果（插件块数与每块条数见 --plugins / --rows）。
+"""
+import argparse
+import json
+import random
+import time
+import zlib
+
+from index import json_backend
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def synthetic_payload(plugins: int, rows: int) -> dict:
+    rnd = random.Random(0)
+    blocks = []
+    for p in range(plugins):
+        blocks.append({
+            "list": [{
+                "messageId": f"plugin{p}-{i}",
+                "title": f"测试资源 第{i}集 [1080P]",
+                "pubDate": "2024-01-01T00:00:00",
+                # 每条内容不同，避免压缩率虚高
+                "content": "".join(f"<p>【资源简介】第{rnd.randint(1, 9)}季 全{rnd.randint(6, 26)}集 "
+                                   f"{rnd.choice(['1080P', '4K', '720P'])} {rnd.getrandbits(64):016x}</p><br/>"
+                                   for _ in range(6)),
+                "image": "",
+                "cloudLinks": [{"link": f"https://pan.quark.cn/s/{p:02d}{i:06x}", "cloudType": "quark"}],
+                "tags": ["动漫", "1080P"],
+                "magnetLink": "",
+                "channel": f"插件{p}",
+                "channelId": f"plugin{p}",
+            } for i in range(rows)],
+            "channelInfo": {"id": f"plugin{p}", "name": f"插件{p}", "index": 1000 + p, "channelLogo": ""},
+            "id": f"plugin{p}",
+            "index": 1000 + p,
+        })
+    return {"code": 0, "data": blocks}
+
+
+def stdlib_dumps(obj) -> bytes:
+    """与 starlette JSONResponse.render 一致"""
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def timed(func, arg, rounds):
+    result = func(arg)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(arg)
+    return result, (time.perf_counter() - start) / rounds
+
+
+def compressors():
+    for level in (1, 6, 9):
+        yield f"gzip-{level}", lambda data, level=level: _gzip(data, level)
+    if brotli is not None:
+        for quality in (4, 11):
+            yield f"br-{quality}", lambda data, quality=quality: brotli.compress(data, quality=quality)
+    if zstandard is not None:
+        for level in (3, 10):
+            yield f"zstd-{level}", lambda data, level=level: zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return obj.compress(data) + obj.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--plugins", type=int, default=15)
+    parser.add_argument("--rows", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = []
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            payloads.append((path, json.load(f)))
+    if not args.files:
+        payloads.append((f"synthetic plugins={args.plugins} rows={args.rows}",
+                         synthetic_payload(args.plugins, args.rows)))
+
+    backend = json_backend.backend
+    for name, payload in payloads:
+        body, stdlib_elapsed = timed(stdlib_dumps, payload, args.rounds)
+        fast, fast_elapsed = timed(json_backend.dumps, payload, args.rounds)
+        assert json.loads(body) == json.loads(fast), "序列化结果不一致"
+        print(f"{name}: {len(body) / 1024:.1f} KB")
+        print(f"  {'JSONResponse':<22} {stdlib_elapsed * 1e3:8.3f} ms")
+        print(f"  {'json_backend(' + backend + ')':<22} {fast_elapsed * 1e3:8.3f} ms")
+        for label, compress in compressors():
+            compressed, elapsed = timed(compress, body, args.rounds)
+            print(f"  {label:<22} {elapsed * 1e3:8.3f} ms  {len(compressed) / 1024:8.1f} KB  "
+                  f"({len(compressed) / len(body):.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+__NUXT_DATA__ 路径解析基准：逐条解释执行的 _resolve_json_chain 与编译路径 + 惰性对象图对比
+
+用法:
+    PYTHONPATH=src python benchmarks/bench_nuxt_chain.py [录制的搜资源吧页面.html ...]
+
+不传页面时使用按 devalue 格式生成的模拟载荷（rows 条数见 --rows）。
+"""
+import argparse
+import json
+import re
+import sys
+import time
+
+from index.base import BaseSearch
+from index.nuxt import NuxtPayload
+from index.api.souziyuanba import SouziyuanbaSearch
+
+NUXT_DATA_REGEX = re.compile(r'<script[^>]*id="__NUXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+
+def flatten(value, out):
+    """按 devalue 规则把嵌套结构打平为数组，返回 value 的下标"""
+    idx = len(out)
+    out.append(None)
+    if isinstance(value, dict):
+        out[idx] = {k: flatten(v, out) for k, v in value.items()}
+    elif isinstance(value, list):
+        out[idx] = [flatten(v, out) for v in value]
+    else:
+        out[idx] = value
+    return idx
+
+
+def synthetic_page(rows: int, filler: int) -> str:
+    state = {"filler": [{"id": i, "name": f"item-{i}", "tags": ["a", "b"]} for i in range(filler)]}
+    search = {
+        "source_name_default": {
+            "rows": [
+                {"title": f"资源{i}", "res_dict": {"quark": [{"url": f"https://pan.quark.cn/s/{i:08x}"}]}}
+                for i in range(rows)
+            ]
+        }
+    }
+    out = [["ShallowReactive", 1], None, None]
+    out[1] = flatten(state, out)
+    # 下标2固定为包含 source_name 的对象，与站点一致
+    out[2] = out[flatten(search, out)]
+    return json.dumps(out)
+
+
+def legacy(nuxt_json):
+    chain = [
+        ('idx', 2), ('match', 'source_name'), ("origin", None), ("key", "rows"), ("origin", None),
+    ]
+
+    def match_func(data, val):
+        if isinstance(data, dict):
+            for k, v in data.items():
+                if isinstance(k, str) and val in k:
+                    return v
+        return None
+    rows = BaseSearch._resolve_json_chain(None, nuxt_json, chain, match_func, nuxt_json)
+    urls = []
+    for idx, _ in enumerate(rows):
+        echain = chain + [("list", idx), ("origin", None), ('key', 'res_dict'), ('origin', None), ('key', 'quark'),
+                          ('origin', None), ('list', 0), ('origin', None), ('key', 'url'), ('origin', None)]
+        urls.append(BaseSearch._resolve_json_chain(None, nuxt_json, echain, match_func, nuxt_json))
+    return urls
+
+
+def compiled(payload):
+    return SouziyuanbaSearch._resolve_resource_url_by_source(SouziyuanbaSearch, payload)
+
+
+def bench(name, func, arg, rounds):
+    func(arg)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func(arg)
+    return result, (time.perf_counter() - start) / rounds
+
+
+def report(name, elapsed, items):
+    print(f"  {name:<16} {elapsed * 1e3:8.3f} ms/页  {elapsed / max(items, 1) * 1e6:8.2f} us/条")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pages", nargs="*")
+    parser.add_argument("--rows", type=int, default=30)
+    parser.add_argument("--filler", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, encoding="utf-8") as f:
+            m = NUXT_DATA_REGEX.search(f.read())
+        if not m:
+            print(f"{path}: 未找到 __NUXT_DATA__", file=sys.stderr)
+            continue
+        pages.append((path, m.group(1)))
+    if not args.pages:
+        pages.append((f"synthetic rows={args.rows} filler={args.filler}", synthetic_page(args.rows, args.filler)))
+
+    for name, text in pages:
+        nuxt_json, parse = bench("parse", json.loads, text, args.rounds)
+        old, old_elapsed = bench("legacy", legacy, nuxt_json, args.rounds)
+        # 编译路径每页只解析一次载荷，这里每轮新建载荷以排除页面级缓存
+        new, new_elapsed = bench("compiled", lambda raw: compiled(NuxtPayload(raw)), nuxt_json, args.rounds)
+        assert old == new, "解析结果不一致"
+        print(f"{name} ({len(old)} 条)")
+        report("json.loads", parse, len(old))
+        report("legacy chain", old_elapsed, len(old))
+        report("compiled chain", new_elapsed, len(old))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+代理中间件单次请求的路由开销基准：原先逐条判断（函数内 import + re.fullmatch + any(startswith) + dict(headers)）
+与预编译路由表 PathRouter + 原始请求头转发对比
+
+用法:
+    PYTHONPATH=src python benchmarks/bench_router.py [--rules 1 10 100]
+"""
+import argparse
+import time
+
+from starlette.requests import Request
+
+from router import PathRouter
+
+LOCAL_API_PREFIX = "/_proxy"
+PATHS = [
+    "/api/search",
+    "/api/douban/hot",
+    "/assets/douban-Bx3k_9a.js",
+    "/api/detail/123",
+    "/_proxy/search/batch",
+    "/",
+]
+
+
+def make_request(path: str) -> Request:
+    headers = [
+        (b"host", b"localhost:8000"),
+        (b"user-agent", b"Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"),
+        (b"accept", b"application/json, text/plain, */*"),
+        (b"accept-language", b"zh-CN,zh;q=0.9,en;q=0.8"),
+        (b"accept-encoding", b"gzip, deflate, br"),
+        (b"referer", b"http://localhost:8000/"),
+        (b"cookie", b"session=abcdef0123456789; theme=dark"),
+    ]
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"keyword=test",
+                    "headers": headers})
+
+
+def legacy_route(request: Request, intercept_paths):
+    """与改造前 proxy_middleware 的判断顺序一致"""
+    path = request.url.path
+    if path.startswith(LOCAL_API_PREFIX):
+        return "local"
+    if path == "/api/douban/hot":
+        import urllib.parse  # noqa: F401
+        return "douban_hot"
+    import re
+    if re.fullmatch(r"/assets/douban-[\w\-]+\.js", path):
+        headers = dict(request.headers)
+        headers.pop("host", None)
+        return "douban_js"
+    headers = dict(request.headers)
+    headers.pop("host", None)
+    if any(path.startswith(p) for p in intercept_paths):
+        import urllib.parse  # noqa: F401,F811
+        return "search"
+    return None
+
+
+def build_router(intercept_paths) -> PathRouter:
+    router = PathRouter()
+    router.add_prefix(LOCAL_API_PREFIX, "local")
+    router.add_exact("/api/douban/hot", "douban_hot")
+    router.add_pattern(r"/assets/douban-[\w\-]+\.js", "douban_js")
+    for p in intercept_paths:
+        router.add_prefix(p, "search")
+    return router.compile()
+
+
+def compiled_route(router: PathRouter, request: Request):
+    route = router.route(request.scope["path"])
+    if route not in ("local", "douban_hot"):
+        [(k, v) for k, v in request.headers.raw if k != b"host"]
+    return route
+
+
+def bench(func, requests, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for request in requests:
+            func(request)
+    return (time.perf_counter() - start) / (rounds * len(requests))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type=int, nargs="*", default=[1, 10, 100])
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    for rules in args.rules:
+        # 真实的拦截路径放在最后，模拟配置了大量规则的最坏情况
+        intercept_paths = [f"/api/extra{i}/" for i in range(rules - 1)] + ["/api/search"]
+        router = build_router(intercept_paths)
+        for path in PATHS:
+            expected = legacy_route(make_request(path), intercept_paths)
+            assert compiled_route(router, make_request(path)) == expected, path
+
+        # 每次新建 Request，与真实请求一致（url/headers 按请求惰性构建），并扣除构建本身的耗时
+        base = bench(make_request, PATHS, args.rounds)
+        old = bench(lambda p: legacy_route(make_request(p), intercept_paths), PATHS, args.rounds) - base
+        new = bench(lambda p: compiled_route(router, make_request(p)), PATHS, args.rounds) - base
+        print(f"{rules:>4} 条拦截规则  legacy {old * 1e6:7.3f} us/请求  compiled {new * 1e6:7.3f} us/请求")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import asyncio
+import zlib
+from typing import Iterable, List, Optional
+
+try:
+    import brotli
+except ImportError:  # 可选依赖
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖
+    zstandard = None
+
+# 服务端偏好顺序，客户端同时支持时优先选择靠前的编码
+DEFAULT_ENCODINGS = ("zstd", "br", "gzip")
+COMPRESSIBLE_TYPES = (
+    b"text/",
+    b"application/json",
+    b"application/javascript",
+    b"application/xml",
+    b"application/x-javascript",
+)
+# 超过该大小的分片在线程中压缩（zlib/brotli/zstd 压缩时释放 GIL），避免阻塞事件循环
+THREAD_THRESHOLD = 64 * 1024
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.compress(data)
+        # 流式响应的每个分片都要立即发给客户端
+        return out + self._obj.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.process(data)
+        return out + (self._obj.finish() if final else self._obj.flush())
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.compress(data)
+        return out + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH if final
+                                     else zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+
+def available_encodings(encodings: Iterable[str] = DEFAULT_ENCODINGS) -> List[str]:
+    """过滤掉未安装依赖的编码"""
+    installed = {"gzip": True, "br": brotli is not None, "zstd": zstandard is not None}
+    return [e for e in encodings if installed.get(e)]
+
+
+def negotiate(accept_encoding: str, encodings: Iterable[str]) -> Optional[str]:
+    """按服务端偏好顺序选择客户端接受（q > 0）的编码"""
+    accepted, rejected = set(), set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        (accepted if q > 0 else rejected).add(name)
+    for encoding in encodings:
+        if encoding in accepted or ("*" in accepted and encoding not in rejected):
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    响应压缩（ASGI 中间件），作用于合并后的最终响应
+    - 按 Accept-Encoding 协商 zstd / br / gzip（后两者需安装 zstandard / brotli）
+    - 小于 minimum_size 的响应、已编码或不可压缩类型的响应原样返回
+    - 流式响应超过阈值后逐片压缩并立即刷新，不等待完整响应
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, encodings: Iterable[str] = DEFAULT_ENCODINGS,
+                 gzip_level: int = 6, brotli_quality: int = 4, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings(encodings)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.zstd_level = zstd_level
+
+    @staticmethod
+    async def _compress(encoder, data: bytes, final: bool) -> bytes:
+        if len(data) >= THREAD_THRESHOLD:
+            return await asyncio.to_thread(encoder.compress, data, final)
+        return encoder.compress(data, final)
+
+    def _encoder(self, encoding: str):
+        if encoding == "zstd":
+            return _ZstdEncoder(self.zstd_level)
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding, self.encodings) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+        passthrough = False
+        # 上游中间件（BaseHTTPMiddleware）会把一次性响应拆成多片发送，
+        # 未达到 minimum_size 前先缓存，结束时仍不足阈值则原样返回
+        pending: List[bytes] = []
+        pending_size = 0
+
+        async def send_wrapper(message):
+            nonlocal start_message, encoder, passthrough, pending_size
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is not None:
+                await send({"type": "http.response.body",
+                            "body": await self._compress(encoder, body, not more_body),
+                            "more_body": more_body})
+                return
+
+            headers = start_message.get("headers", [])
+            if not self._should_compress(start_message["status"], headers):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            pending.append(body)
+            pending_size += len(body)
+            if pending_size < self.minimum_size and not self._is_event_stream(headers):
+                if more_body:
+                    return
+                passthrough = True
+                await send(start_message)
+                await send({"type": "http.response.body", "body": b"".join(pending), "more_body": False})
+                return
+            encoder = self._encoder(encoding)
+            compressed = await self._compress(encoder, b"".join(pending), not more_body)
+            pending.clear()
+            start_message["headers"] = self._rewrite_headers(
+                headers, encoding, None if more_body else len(compressed))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _is_event_stream(headers) -> bool:
+        """SSE 等实时流不缓存，逐片压缩发送"""
+        for key, value in headers:
+            if key == b"content-type":
+                return value.startswith(b"text/event-stream")
+        return False
+
+    @staticmethod
+    def _should_compress(status: int, headers) -> bool:
+        if status < 200 or status in (204, 304):
+            return False
+        content_type = b""
+        for key, value in headers:
+            if key == b"content-encoding":
+                return False
+            if key == b"content-type":
+                content_type = value
+        return content_type.startswith(COMPRESSIBLE_TYPES) or b"+json" in content_type
+
+    @staticmethod
+    def _rewrite_headers(headers, encoding: str, content_length: Optional[int]):
+        new_headers = []
+        vary = None
+        for key, value in headers:
+            if key == b"content-length":
+                continue
+            if key == b"vary":
+                vary = value
+                continue
+            if key == b"etag" and not value.startswith(b"W/"):
+                # 压缩后的字节与原始表示不同，强 ETag 降级为弱 ETag
+                value = b"W/" + value
+            new_headers.append((key, value))
+        new_headers.append((b"content-encoding", encoding.encode("latin-1")))
+        if vary is None:
+            vary = b"Accept-Encoding"
+        elif b"accept-encoding" not in vary.lower():
+            vary += b", Accept-Encoding"
+        new_headers.append((b"vary", vary))
+        if content_length is not None:
+            new_headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return new_headers
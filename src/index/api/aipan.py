@@ -1,22 +1,67 @@
-from ..base import BaseSearch
-import requests
-import re
-from typing import List, Dict, Any
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from .. import http_client
+import asyncio
+import httpx
+import time
+from collections import deque
+from typing import List, Dict, Any, Iterable, Optional
 import urllib.parse
+import logging
+
+logger = logging.getLogger(__name__)
 
 class AipanSearch(BaseSearch):
-    """爱盘搜索实现"""
+    """爱盘搜索实现
+
+    爱盘有 8 个数据源（/api/sources/1..8），结果高度重合。单个插件实例通过一个
+    共享连接池的 AsyncClient 并发请求所有数据源，按链接去重合并：
+    - 去重后结果达到 RESULT_TARGET 或剩余时间用完即返回，不等待慢数据源
+    - 单个数据源的超时、重试与对冲使用共享的 http_client.RetryPolicy（HEDGE_AFTER 秒未返回时补发一次请求）
+    - 最近 STATS_WINDOW 次搜索都没有贡献新链接的数据源暂时跳过，每 PROBE_INTERVAL 次搜索重新探测一次
+    """
 
-    def __init__(self, source_id: int = 2, use_playwright: bool = False):
+    SOURCE_IDS = tuple(range(1, 9))
+    BASE_URL = "https://www.aipan.me/api/sources/{source_id}"
+    DEFAULT_TIMEOUT = 10
+    RESULT_TARGET = 60
+    HEDGE_AFTER = 3.0
+    # 截止时间前预留给合并与返回的时间（秒）
+    DEADLINE_MARGIN = 0.3
+    STATS_WINDOW = 8
+    PROBE_INTERVAL = 10
+    MAX_CONNECTIONS = 8
+    POLICY = http_client.RetryPolicy(max_attempts=2, timeout=DEFAULT_TIMEOUT, hedge_after=HEDGE_AFTER)
+
+    def __init__(self, source_ids: Iterable[int] = SOURCE_IDS, use_playwright: bool = False):
         """初始化爱盘搜索
-        
+
         Args:
-            source_id: 数据源ID (1-8)
+            source_ids: 数据源ID列表 (1-8)
             use_playwright: 是否使用playwright
         """
-        self.source_id = source_id
+        self.source_ids = tuple(source_ids)
         self.use_playwright = use_playwright
-        self.base_url = f"https://www.aipan.me/api/sources/{self.source_id}"
+        # AsyncClient 绑定事件循环，首次搜索时在应用的事件循环中创建
+        self._client: Optional[httpx.AsyncClient] = None
+        # 数据源 -> 最近几次搜索是否贡献了新链接
+        self._source_stats = {sid: deque(maxlen=self.STATS_WINDOW) for sid in self.source_ids}
+        self._search_count = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.DEFAULT_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.MAX_CONNECTIONS
+                )
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     def _clean_title(self, title: str) -> str:
         """清理资源标题，提取第一个有效资源名称"""
@@ -33,19 +78,24 @@ class AipanSearch(BaseSearch):
         # 如果处理后为空，返回原始名称
         return title if title else "未命名资源"
 
-    def search(self, keyword: str) -> List[Dict[str, Any]]:
-        """搜索爱盘资源并返回结构化结果
+    def _active_sources(self) -> List[int]:
+        """过滤掉最近一直没有贡献新链接的数据源，定期全量探测以便恢复"""
+        self._search_count += 1
+        if self._search_count % self.PROBE_INTERVAL == 0:
+            return list(self.source_ids)
+        active = [sid for sid, history in self._source_stats.items()
+                  if len(history) < self.STATS_WINDOW or any(history)]
+        return active or list(self.source_ids)
+
+    async def search(self, keyword: str) -> Dict[str, Any]:
+        """并发搜索所有数据源并合并去重
 
         Args:
             keyword: 搜索关键词
 
         Returns:
-            标准化的结果列表，包含完整元数据
+            标准化的结果，所有数据源合并为一个结果块
         """
-        return self._search_with_api(keyword)
-
-    def _search_with_api(self, keyword: str) -> List[Dict[str, Any]]:
-        """通过API搜索"""
         headers = {
             'accept': 'application/json',
             'accept-language': 'zh-CN,zh;q=0.9,en;q=0.8,zh-TW;q=0.7',
@@ -54,49 +104,76 @@ class AipanSearch(BaseSearch):
             'referer': f'https://www.aipan.me/search?keyword={urllib.parse.quote(keyword)}',
             'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36'
         }
+        sources = self._active_sources()
+        tasks = {
+            asyncio.ensure_future(self._request_source(sid, keyword, headers)): sid
+            for sid in sources
+        }
+        results: List[SearchResult] = []
+        seen_links = set()
+        productive = {sid: False for sid in sources}
 
+        left = http_client.remaining()
+        budget = self.DEFAULT_TIMEOUT if left is None else max(0.0, left - self.DEADLINE_MARGIN)
+        end_time = time.monotonic() + budget
+        pending = set(tasks)
         try:
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                json={"name": keyword},
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # 转换为标准格式，只保留天翼和夸克资源
-            return {
-                "list": [{
-                    "messageId": "",
-                    "title": self._clean_title(item["name"]),
-                    "pubDate": "",
-                    "content": self._clean_title(item["name"]),
-                    "image": "",
-                    "cloudLinks": [{
-                        "link": link["link"],
-                        "cloudType": self.detect_cloud_type(link["link"]),
-                        "password": link.get("pwd", "")
-                    } for link in item["links"]
-                       if "quark" in link["link"] or "189.cn" in link["link"]],
-                    "tags": [],
-                    "magnetLink": "",
-                    "channel": f"爱盘-{self.source_id}",
-                    "channelId": f"aipan_{self.source_id}"
-                } for item in data.get("list", [])
-                   if item.get("links") and
-                      any("quark" in link["link"] or "189.cn" in link["link"]
-                          for link in item["links"])],
-                "channelInfo": {
-                    "id": f"aipan_{self.source_id}",
-                    "name": f"爱盘-{self.source_id}",
-                    "index": 1002,
-                    "channelLogo": ""
-                },
-                "id": f"aipan_{self.source_id}",
-                "index": 1002
-            }
-
-        except Exception as e:
-            print(f"API请求失败: {str(e)}")
-            return []
\ No newline at end of file
+            while pending and len(results) < self.RESULT_TARGET:
+                timeout = end_time - time.monotonic()
+                if timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    sid = tasks[task]
+                    try:
+                        items = task.result()
+                    except Exception as e:
+                        logger.error("爱盘数据源 %s 请求失败: %s", sid, e)
+                        continue
+                    for item in items:
+                        links = [link for link in item.cloudLinks if link.link not in seen_links]
+                        if not links:
+                            continue
+                        seen_links.update(link.link for link in links)
+                        item.cloudLinks = links
+                        results.append(item)
+                        productive[sid] = True
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # 结果已足够时未返回的数据源不计入统计；预算用完仍未返回的记为无贡献
+        target_reached = len(results) >= self.RESULT_TARGET
+        for task, sid in tasks.items():
+            if task not in pending or not target_reached:
+                self._source_stats[sid].append(productive[sid])
+
+        return result_block("aipan", "爱盘", 1002, results[:self.RESULT_TARGET])
+
+    async def _request_source(self, source_id: int, keyword: str, headers: Dict[str, str]) -> List[SearchResult]:
+        response = await http_client.arequest_with_retry(
+            "POST",
+            self.BASE_URL.format(source_id=source_id),
+            client=self._get_client(),
+            policy=self.POLICY,
+            headers=headers,
+            json={"name": keyword}
+        )
+        response.raise_for_status()
+        data = self.parse_json(response)
+
+        # 转换为标准格式，只保留天翼和夸克资源
+        return [SearchResult(
+            messageId="",
+            title=self._clean_title(item["name"]),
+            content=self._clean_title(item["name"]),
+            cloudLinks=[CloudLink(link["link"], self.detect_cloud_type(link["link"]), link.get("pwd", ""))
+                        for link in item["links"]
+                        if "quark" in link["link"] or "189.cn" in link["link"]],
+            channel=f"爱盘-{source_id}",
+            channelId=f"aipan_{source_id}"
+        ) for item in data.get("list", [])
+           if item.get("links") and
+              any("quark" in link["link"] or "189.cn" in link["link"]
+                  for link in item["links"])]
@@ -1,6 +1,9 @@
-from ..base import BaseSearch
-import requests
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..http_client import request_with_retry
 from typing import Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
 
 class AlipanxSearch(BaseSearch):
     """alipanx.com 阿里盘盘侠网盘搜索实现"""
@@ -56,7 +59,8 @@ class AlipanxSearch(BaseSearch):
                     "platform": "pc"
                 }
             }
-            resp = requests.post(
+            resp = request_with_retry(
+                "POST",
                 self.base_url,
                 headers=self.headers,
                 cookies=self.cookies,
@@ -64,7 +68,7 @@ class AlipanxSearch(BaseSearch):
                 timeout=10
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = self.parse_json(resp)
             results = data.get("data", {}).get("list", [])
             list_data = []
             for item in results:
@@ -77,47 +81,19 @@ class AlipanxSearch(BaseSearch):
                 pwd = item.get("disk_pass", "")
                 disk_type = item.get("disk_type", "")
                 tags = item.get("tags") or []
-                list_data.append({
-                    "messageId": item.get("doc_id", "") or item.get("disk_id", ""),
-                    "title": clean_html(item.get("disk_name", "")),
-                    "pubDate": item.get("shared_time", ""),
-                    "content": clean_html(item.get("files", "")),
-                    "fileType": item.get("disk_type", ""),
-                    "uploader": item.get("share_user", ""),
-                    "cloudLinks": [{
-                        "link": link,
-                        "cloudType": self.detect_cloud_type(link),
-                        "pwd": pwd
-                    }],
-                    "tags": tags if isinstance(tags, list) else [],
-                    "magnetLink": "",
-                    "channel": "alipanx",
-                    "channelId": "alipanx"
-                })
-            return {
-                "list": list_data,
-                "channelInfo": {
-                    "id": "alipanx",
-                    "name": "阿里盘盘侠",
-                    "index": 1012,
-                    "channelLogo": ""
-                },
-                "id": "alipanx",
-                "index": 1012,
-                "total": data.get("data", {}).get("total", len(results)),
-                "keyword": keyword
-            }
+                list_data.append(SearchResult(
+                    messageId=item.get("doc_id", "") or item.get("disk_id", ""),
+                    title=clean_html(item.get("disk_name", "")),
+                    pubDate=item.get("shared_time", ""),
+                    content=clean_html(item.get("files", "")),
+                    cloudLinks=[CloudLink(link, self.detect_cloud_type(link), pwd)],
+                    tags=tags if isinstance(tags, list) else [],
+                    channel="alipanx",
+                    channelId="alipanx"
+                ))
+            return result_block("alipanx", "阿里盘盘侠", 1012, list_data,
+                                total=data.get("data", {}).get("total", len(results)), keyword=keyword)
         except Exception as e:
-            print(f"API请求失败: {str(e)}")
-            return {
-                "list": [],
-                "channelInfo": {
-                    "id": "alipanx",
-                    "name": "阿里盘盘侠",
-                    "index": 1012,
-                    "channelLogo": ""
-                },
-                "id": "alipanx",
-                "index": 1012
-            }
+            logger.error("API请求失败: %s", e)
+            return result_block("alipanx", "阿里盘盘侠", 1012, [])
         # 云盘类型映射
\ No newline at end of file
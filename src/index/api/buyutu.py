@@ -1,11 +1,49 @@
 import base64
 import hashlib
+import re
 import requests
 from bs4 import BeautifulSoup
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import unpad
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..cache import TTLCache
 from typing import List, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+# obfuscator.io 字符串数组中的字符串字面量
+STRING_LITERAL_REGEX = re.compile(r"'((?:[^'\\\n]|\\.)*)'|\"((?:[^\"\\\n]|\\.)*)\"")
+# 未混淆（或已反混淆）代码中的解密调用: _0xabc(_0xdef, "KEY")
+KEY_CALL_REGEX = re.compile(r'_0x\w+\(_0x\w+,\s*["\']([^"\']+)["\']\)')
+JS_ESCAPE_REGEX = re.compile(r'\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|.)')
+KEY_MIN_LENGTH = 6
+KEY_MAX_LENGTH = 64
+
+
+class DetailCipher:
+    """
+    预计算的解密器，与 test2.js 中的 _0x2215d5 方法功能一致：
+    key 为密钥 SHA256 摘要（AES-256），iv 为摘要前16字节，AES-CBC + PKCS7
+    ECB 对象无状态可复用，CBC 链式异或手动完成，解密无需重复创建 cipher
+    """
+    __slots__ = ("secret_key", "_ecb", "_iv")
+
+    def __init__(self, secret_key: str):
+        digest = hashlib.sha256(secret_key.encode()).digest()
+        self.secret_key = secret_key
+        self._ecb = AES.new(digest, AES.MODE_ECB)
+        self._iv = digest[:16]
+
+    def decrypt(self, encrypted_data: str) -> str:
+        data = base64.b64decode(encrypted_data)
+        if not data or len(data) % AES.block_size:
+            raise ValueError("密文长度不合法")
+        raw = self._ecb.decrypt(data)
+        prev = self._iv + data[:-AES.block_size]
+        plain = (int.from_bytes(raw, 'big') ^ int.from_bytes(prev, 'big')).to_bytes(len(data), 'big')
+        # 移除填充并返回UTF-8字符串
+        return unpad(plain, AES.block_size).decode('utf-8')
 
 
 def decrypt_data(encrypted_data, secret_key):
@@ -15,49 +53,73 @@ def decrypt_data(encrypted_data, secret_key):
     :param secret_key: 解密密钥
     :return: 解密后的字符串
     """
-    # 生成SHA256哈希
-    sha256 = hashlib.sha256(secret_key.encode()).hexdigest()
-    
-    # 处理key和iv
-    key_hex = sha256[:64]  # 取前64个字符
-    iv_hex = sha256[:32]   # 取前32个字符
-    
-    # 将16进制字符串转换为WordArray类似的结构
-    def hex_to_word_array(hex_str):
-        words = []
-        i = 0
-        while i < len(hex_str):
-            # 每8个字符(4字节)转换为一个32位整数
-            word = int(hex_str[i:i+2], 16) << 24 | \
-                   int(hex_str[i+2:i+4], 16) << 16 | \
-                   int(hex_str[i+4:i+6], 16) << 8 | \
-                   int(hex_str[i+6:i+8], 16)
-            words.append(word)
-            i += 8
-        return words
-    
-    # 创建AES解密器
-    key_words = hex_to_word_array(key_hex)
-    iv_words = hex_to_word_array(iv_hex)
-    
-    # 将WordArray转换为字节
-    key_bytes = b''.join([word.to_bytes(4, 'big') for word in key_words])
-    iv_bytes = b''.join([word.to_bytes(4, 'big') for word in iv_words])
-    
-    # 解密
-    cipher = AES.new(key_bytes, AES.MODE_CBC, iv=iv_bytes)
-    decrypted = cipher.decrypt(base64.b64decode(encrypted_data))
-    
-    # 移除填充并返回UTF-8字符串
-    return unpad(decrypted, AES.block_size).decode('utf-8')
+    return DetailCipher(secret_key).decrypt(encrypted_data)
+
+
+def _unescape_js(literal: str) -> str:
+    def repl(m):
+        esc = m.group(1)
+        if esc[0] in 'xu' and len(esc) > 1:
+            return chr(int(esc[1:], 16))
+        return {'n': '\n', 't': '\t', 'r': '\r'}.get(esc, esc)
+    return JS_ESCAPE_REGEX.sub(repl, literal)
+
+
+def _decode_obfuscator_base64(value: str):
+    """
+    obfuscator.io 的 base64 字符串编码：字母表小写在前，等价于大小写互换后的标准 base64
+    """
+    try:
+        padded = value.swapcase() + '=' * (-len(value) % 4)
+        return base64.b64decode(padded, validate=True).decode('utf-8')
+    except Exception:
+        return None
+
+
+def extract_secret_key(js_code: str, encrypted_sample: str):
+    """
+    从 detail.js（可为混淆源码）中提取解密密钥，纯 Python 实现，无需外部反混淆工具
+    1. 直接匹配解密调用中的字面量密钥
+    2. 解码字符串数组（含 base64 编码），以能否解密样本密文为准筛选候选
+    :return: DetailCipher 或 None
+    """
+    candidates = KEY_CALL_REGEX.findall(js_code)
+    for m in STRING_LITERAL_REGEX.finditer(js_code):
+        literal = _unescape_js(m.group(1) if m.group(1) is not None else m.group(2))
+        candidates.append(literal)
+        decoded = _decode_obfuscator_base64(literal)
+        if decoded:
+            candidates.append(decoded)
+
+    seen = set()
+    for candidate in candidates:
+        if candidate in seen or not KEY_MIN_LENGTH <= len(candidate) <= KEY_MAX_LENGTH:
+            continue
+        seen.add(candidate)
+        cipher = DetailCipher(candidate)
+        try:
+            plain = cipher.decrypt(encrypted_sample)
+        except Exception:
+            continue
+        if plain.startswith('http'):
+            return cipher
+    return None
 
 
 class BuyutuSearch(BaseSearch):
     """捕娱兔搜索实现"""
 
+    # detail.js URL 到内容哈希的映射，过期后重新下载校验
+    JS_URL_TTL = 3600
+    # 内容哈希到解密器的映射，同一份 detail.js 只提取一次密钥
+    KEY_TTL = 7 * 24 * 3600
+    # 提取失败的 detail.js 负缓存时间，期间各条目不再重复下载和尝试解密
+    KEY_FAILURE_TTL = 600
+
     def __init__(self, use_playwright: bool = False):
         self.use_playwright = use_playwright
-        self._key_cache = {}  # 缓存页面URL到密钥的映射
+        self._js_hash_cache = TTLCache(maxsize=64, ttl=self.JS_URL_TTL)
+        self._key_cache = TTLCache(maxsize=64, ttl=self.KEY_TTL, negative_ttl=self.KEY_FAILURE_TTL)
 
     def search(self, keyword: str) -> List[Dict[str, Any]]:
         """搜索捕娱兔资源并返回结构化结果
@@ -70,11 +132,39 @@ class BuyutuSearch(BaseSearch):
         """
         return self._search_with_api(keyword)
 
+    def _get_cipher(self, detail_js_url: str, encrypted_sample: str, refresh: bool = False):
+        """
+        获取 detail.js 对应的解密器：URL -> 内容哈希 -> 解密器，均命中时不发起请求
+        提取失败的内容哈希负缓存 KEY_FAILURE_TTL，期间直接返回 None
+        """
+        content_hash = None if refresh else self._js_hash_cache.get(detail_js_url)
+        if content_hash:
+            found, cipher = self._key_cache.lookup(content_hash)
+            if found:
+                return cipher
+
+        # 下载detail.js文件
+        js_response = requests.get(detail_js_url, timeout=10)
+        js_response.raise_for_status()
+        content_hash = hashlib.sha1(js_response.content).hexdigest()
+        self._js_hash_cache.set(detail_js_url, content_hash)
+        found, cipher = self._key_cache.lookup(content_hash)
+        if found:
+            return cipher
+
+        cipher = extract_secret_key(js_response.text, encrypted_sample)
+        if cipher:
+            self._key_cache.set(content_hash, cipher)
+            logger.info("buyutu 从detail.js提取密钥成功: %s...", cipher.secret_key[:8])
+        else:
+            self._key_cache.set_negative(content_hash)
+        return cipher
+
     def _get_real_link(self, detail_url: str, page_url: str) -> str:
         """获取真实的网盘链接
         Args:
             detail_url: 详情页URL
-            page_url: 搜索页URL(用于缓存key)
+            page_url: 搜索页URL(用于日志)
         """
         try:
             # 统一获取详情页内容和密文
@@ -87,33 +177,19 @@ class BuyutuSearch(BaseSearch):
             )
             response.raise_for_status()
             soup = BeautifulSoup(response.text, 'html.parser')
-            
-            encrypted_data = soup.find('input', {'id': 'encryptedData'})
-            if not encrypted_data or 'value' not in encrypted_data.attrs:
-                print(f"[DEBUG] buyutu _get_real_link: 未找到加密数据 detail_url={detail_url} page_url={page_url}")
-                return ""
 
-            # 优先使用缓存密钥
-            if page_url in self._key_cache:
-                try:
-                    decrypted = decrypt_data(encrypted_data['value'], self._key_cache[page_url])
-                    print(f"使用缓存密钥解密成功: {self._key_cache[page_url][:8]}...")
-                    return decrypted
-                except Exception as e:
-                    print(f"缓存密钥解密失败({str(e)}), 将重新解析detail.js")
-            
-            # 提取加密数据
             encrypted_data = soup.find('input', {'id': 'encryptedData'})
             if not encrypted_data or 'value' not in encrypted_data.attrs:
-                print(f"[DEBUG] buyutu _get_real_link: 再次未找到加密数据 detail_url={detail_url} page_url={page_url}")
+                logger.debug("buyutu _get_real_link: 未找到加密数据 detail_url=%s page_url=%s", detail_url, page_url)
                 return ""
-                
+            encrypted_value = encrypted_data['value']
+
             # 从页面中提取detail.js路径
             detail_js = soup.find('script', {'src': lambda x: x and 'detail.js' in x})
             if not detail_js:
-                print(f"[DEBUG] buyutu _get_real_link: 未找到detail.js detail_url={detail_url} page_url={page_url}")
+                logger.debug("buyutu _get_real_link: 未找到detail.js detail_url=%s page_url=%s", detail_url, page_url)
                 return ""
-                
+
             detail_js_path = detail_js['src']
             # 处理相对路径
             if detail_js_path.startswith('../'):
@@ -123,72 +199,21 @@ class BuyutuSearch(BaseSearch):
                 detail_js_url = f"https://buyutu.com{detail_js_path}"
             else:
                 detail_js_url = detail_js_path
-                
-            # 下载detail.js文件
-            js_response = requests.get(detail_js_url)
-            js_response.raise_for_status()
-            
-            # 创建临时文件处理反混淆(静默模式)
-            import tempfile
-            import os
-            import subprocess
-            
-            with tempfile.NamedTemporaryFile(suffix='.js', delete=False) as tmp:
-                tmp.write(js_response.content)
-                tmp_path = tmp.name
-                
-            # 设置静默模式环境变量
-            env = os.environ.copy()
-            env['OBFUSCATOR_SILENT'] = '1'
-                
-            try:
-                # 反混淆JS代码
-                output_path = f"{tmp_path}.deobfuscated.js"
-                subprocess.run([
-                    'obfuscator-io-deobfuscator',
-                    tmp_path,
-                    '-o', output_path
-                ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                
-                # 读取反混淆后的代码
-                with open(output_path, 'r') as f:
-                    deobfuscated_js = f.read()
-                
-                # 从JS代码中提取解密密钥
-                def extract_secret_key(js_code):
-                    import re
-                    # 匹配202行附近的解密函数调用模式
-                    pattern = r'_0x\w+\(_0x\w+,\s*"([^"]+)"\)'
-                    match = re.search(pattern, js_code)
-                    if match:
-                        return match.group(1)
-                    return None
-                
-                secret_key = extract_secret_key(deobfuscated_js)
-                if not secret_key:
-                    print("无法从JS代码中提取解密密钥")
-                    return encrypted_data['value']
-                
-                # 成功解析密钥后更新缓存
-                self._key_cache[page_url] = secret_key
-                
+
+            # 优先使用缓存的解密器，解密失败时重新下载detail.js校验
+            for refresh in (False, True):
+                cipher = self._get_cipher(detail_js_url, encrypted_value, refresh=refresh)
+                if not cipher:
+                    break
                 try:
-                    decrypted = decrypt_data(encrypted_data['value'], secret_key)
-                    return decrypted
+                    return cipher.decrypt(encrypted_value)
                 except Exception as e:
-                    print(f"解密失败: {str(e)}")
-                    return encrypted_data['value']
-            except Exception as e:
-                print(f"JS反混淆处理失败: {str(e)}")
-                return encrypted_data['value']
-            finally:
-                # 清理临时文件
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-                if os.path.exists(output_path):
-                    os.unlink(output_path)
+                    logger.warning("缓存密钥解密失败(%s), 将重新解析detail.js", e)
+
+            logger.error("无法从JS代码中提取解密密钥")
+            return encrypted_value
         except Exception as e:
-            print(f"[DEBUG] buyutu _get_real_link: 获取真实链接失败 detail_url={detail_url} page_url={page_url} error={str(e)}")
+            logger.debug("buyutu _get_real_link: 获取真实链接失败 detail_url=%s page_url=%s error=%s", detail_url, page_url, e)
             return ""
 
     def _search_with_api(self, keyword: str) -> List[Dict[str, Any]]:
@@ -236,7 +261,6 @@ class BuyutuSearch(BaseSearch):
                         continue
                         
                     title_link = title_card.select_one('a')
-                    title_img = title_card.select_one('img')
                     
                     # 提取内容部分
                     body_card = item.select_one('#body .card-body')
@@ -250,62 +274,34 @@ class BuyutuSearch(BaseSearch):
                     if not all([title_link, cloud_span, date_span, user_span]):
                         continue
                     
-                    # 提取文件类型
-                    file_type = 'dir'  # 默认为文件夹
-                    if title_img and 'src' in title_img.attrs:
-                        if 'txt.png' in title_img['src']:
-                            file_type = 'txt'
-                    
                     # 提取发布日期
                     pub_date = "1970-01-01T00:00:00+00:00"
                     if date_span and date_span.text.strip():
                         date_str = date_span.text.strip().replace('\n', '').replace(' ', '')
                         pub_date = f"{date_str}T00:00:00+00:00"
                     
-                    # 提取用户信息
-                    user_info = user_span.text.strip().replace('\n', '').replace(' ', '')
-                    
                     # 获取真实链接
                     detail_url = f"https://buyutu.com{title_link['href'].replace('../', '/')}"
                     real_link = self._get_real_link(detail_url, url)
                     if not real_link:
-                        print(f"[DEBUG] buyutu _search_with_api: real_link为空，跳过该资源 detail_url={detail_url}")
+                        logger.debug("buyutu _search_with_api: real_link为空，跳过该资源 detail_url=%s", detail_url)
                         continue
 
-                    results.append({
-                        "messageId": title_link['href'].split('/')[-1].replace('.html', ''),
-                        "title": title_link.get('title', '').strip(),
-                        "pubDate": pub_date,
-                        "content": title_link.get('title', '').strip(),
-                        "fileType": file_type,
-                        "uploader": user_info,
-                        "cloudLinks": [{
-                            "link":real_link,
-                            "cloudType": self.detect_cloud_type(real_link)
-                        }],
-                        "tags": [],
-                        "magnetLink": "",
-                        "channel": "捕娱兔",
-                        "channelId": "buyutu"
-                    })
+                    results.append(SearchResult(
+                        messageId=title_link['href'].split('/')[-1].replace('.html', ''),
+                        title=title_link.get('title', '').strip(),
+                        pubDate=pub_date,
+                        content=title_link.get('title', '').strip(),
+                        cloudLinks=[CloudLink(real_link, self.detect_cloud_type(real_link))],
+                        channel="捕娱兔",
+                        channelId="buyutu"
+                    ))
                 except Exception as e:
-                    print(f"解析结果项失败: {str(e)}")
+                    logger.warning("解析结果项失败: %s", e)
                     continue
             
-            return {
-                "list": results,
-                "channelInfo": {
-                    "id": "buyutu",
-                    "name": "捕娱兔",
-                    "index": 1001,
-                    "channelLogo": ""
-                },
-                "id": "buyutu",
-                "index": 1001,
-                "total": len(results),
-                "keyword": keyword
-            }
+            return result_block("buyutu", "捕娱兔", 1001, results, total=len(results), keyword=keyword)
 
         except Exception as e:
-            print(f"捕娱兔搜索失败: {str(e)}")
-            return []
\ No newline at end of file
+            logger.error("捕娱兔搜索失败: %s", e)
+            return result_block("buyutu", "捕娱兔", 1001, [])
\ No newline at end of file
@@ -1,9 +1,12 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
 import requests
 import json
 from typing import List, Dict, Any
 from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor
+import logging
+
+logger = logging.getLogger(__name__)
 
 class EsouaSearch(BaseSearch):
     """e搜啊网盘搜索实现"""
@@ -76,23 +79,13 @@ class EsouaSearch(BaseSearch):
                         if result:
                             valid_results.append(result)
                     except Exception as e:
-                        print(f"详情页处理异常: {str(e)}")
+                        logger.warning("详情页处理异常: %s", e)
             
-            return {
-                "list": valid_results,
-                "channelInfo": {
-                    "id": "esoua",
-                    "name": "爱搜",
-                    "index": 1005,
-                    "channelLogo": ""
-                },
-                "id": "esoua",
-                "index": 1005
-            }
+            return result_block("esoua", "爱搜", 1005, valid_results)
             
         except Exception as e:
-            print(f"HTML请求失败: {str(e)}")
-            return []
+            logger.error("HTML请求失败: %s", e)
+            return result_block("esoua", "爱搜", 1005, [])
     
     def _process_detail_page(self, link, title, cloud_type, date):
         """处理详情页(多线程调用)"""
@@ -109,23 +102,16 @@ class EsouaSearch(BaseSearch):
             # 验证链接有效性
             resp = requests.head(resource_link['href'], timeout=5, allow_redirects=True)
             if resp.status_code == 200:
-                return {
-                    "messageId": link.split('/')[-1],
-                    "title": title,
-                    "pubDate": date,
-                    "content": "",
-                    "image": "",
-                    "cloudLinks": [{
-                        "link": resource_link['href'],
-                        "cloudType": self.detect_cloud_type(resource_link['href'])
-                    }],
-                    "tags": [],
-                    "magnetLink": "",
-                    "channel": "爱搜",
-                    "channelId": "esoua"
-                }
+                return SearchResult(
+                    messageId=link.split('/')[-1],
+                    title=title,
+                    pubDate=date,
+                    cloudLinks=[CloudLink(resource_link['href'], self.detect_cloud_type(resource_link['href']))],
+                    channel="爱搜",
+                    channelId="esoua"
+                )
         except Exception as e:
-            print(f"详情页处理失败: {str(e)}")
+            logger.warning("详情页处理失败: %s", e)
             return None
 
     def _map_cloud_type(self, disk_type: str) -> str:
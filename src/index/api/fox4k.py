@@ -1,4 +1,6 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from .. import http_client
+from ..http_client import RetryPolicy, request_with_retry
 import requests
 import re
 from bs4 import BeautifulSoup
@@ -9,6 +11,8 @@ import logging
 from urllib.parse import urljoin, urlparse
 from requests.adapters import HTTPAdapter
 
+logger = logging.getLogger(__name__)
+
 # 常量定义
 BASE_URL = "https://4kfox.com"
 SEARCH_URL = BASE_URL + "/search/%s-------------.html"
@@ -21,6 +25,12 @@ DEBUG_MODE = False  # 调试开关 - 默认关闭
 PROXY_ENABLED = False  # 代理开关 - 默认关闭
 MAX_CONCURRENCY = 50  # 并发数限制 - 大幅提高并发数
 MAX_PAGES = 10  # 最大分页数（避免无限请求）
+PAGE_BATCH_SIZE = 2  # 同时预取的分页数
+CANDIDATE_LIMIT = 30  # 最多补全详情的候选数，达到后不再请求后续分页（部分详情页没有有效链接，取值略多于期望的结果数）
+CHANNEL_NAME = "4K影视"
+PUB_DATE = "2022-11-03T14:07:54+00:00"  # 站点不提供发布时间，使用固定时间
+# 重试策略：最多3次，5xx/超时/连接失败才重试，单次请求超过2.5秒未返回时对冲一次
+RETRY_POLICY = RetryPolicy(max_attempts=3, timeout=DEFAULT_TIMEOUT, backoff=0.2, hedge_after=2.5)
 
 # 预编译正则表达式
 DETAIL_ID_REGEX = re.compile(r'/video/(\d+)\.html')
@@ -79,12 +89,12 @@ class Fox4kSearch(BaseSearch):
             # SOCKS5代理
             transport['proxy'] = {'http': proxy_url, 'https': proxy_url}
             if DEBUG_MODE:
-                logging.debug(f"🔧 [Fox4k DEBUG] 使用SOCKS5代理: {proxy_url}")
+                logger.debug("🔧 [Fox4k DEBUG] 使用SOCKS5代理: %s", proxy_url)
         else:
             # HTTP代理
             transport['proxy'] = {'http': proxy_url, 'https': proxy_url}
             if DEBUG_MODE:
-                logging.debug(f"🔧 [Fox4k DEBUG] 使用HTTP代理: {proxy_url}")
+                logger.debug("🔧 [Fox4k DEBUG] 使用HTTP代理: %s", proxy_url)
 
         return transport
 
@@ -99,14 +109,14 @@ class Fox4kSearch(BaseSearch):
             # 代理未启用，使用直连
             selected_proxy = ""
             if DEBUG_MODE:
-                logging.debug("🔧 [Fox4k DEBUG] 代理功能已禁用，使用直连模式")
+                logger.debug("🔧 [Fox4k DEBUG] 代理功能已禁用，使用直连模式")
 
         transport = self.create_proxy_transport(selected_proxy)
         if not transport:
             transport = self.create_proxy_transport("")
 
         if not selected_proxy and PROXY_ENABLED:
-            logging.debug("🔧 [Fox4k DEBUG] 使用直连模式")
+            logger.debug("🔧 [Fox4k DEBUG] 使用直连模式")
         session = requests.Session()
                 # 配置适配器，增加连接池大小
         adapter = HTTPAdapter(
@@ -126,93 +136,86 @@ class Fox4kSearch(BaseSearch):
 
     def search_with_result(self, keyword):
         if DEBUG_MODE:
-            logging.debug(f"🔧 [Fox4k DEBUG] SearchWithResult 开始 - keyword: {keyword}")
+            logger.debug("🔧 [Fox4k DEBUG] SearchWithResult 开始 - keyword: %s", keyword)
 
         result, err = self.async_search_with_result(keyword, self.search_impl)
         if DEBUG_MODE:
-            logging.debug(f"🔧 [Fox4k DEBUG] SearchWithResult 完成 - 结果数: {len(result['results'])}, 错误: {err}")
+            logger.debug("🔧 [Fox4k DEBUG] SearchWithResult 完成 - 结果数: %s, 错误: %s", len(result['results']), err)
         if result['results']:
-            logging.debug("🔧 [Fox4k DEBUG] 前3个结果示例:")
+            logger.debug("🔧 [Fox4k DEBUG] 前3个结果示例:")
             for i, r in enumerate(result['results']):
                 if i >= 3:
                     break
-                logging.debug(f"  {i+1}. 标题: {r['title']}, 链接数: {len(r['links'])}")
-
-        # 转换为标准格式
-        standard_results = []
-        for item in result['results']:
-            # 转换链接格式
-            cloud_links = []
-            for link in item['links']:
-                cloud_link = {
-                    "link": link['url'] + (f"?pwd={link['password']}" if link['password'] else ""),
-                    "cloudType": link['type']
-                }
-                cloud_links.append(cloud_link)
-
-            standard_item = {
-                "messageId": item['unique_id'],
-                "title": item['title'],
-                "pubDate": "2022-11-03T14:07:54+00:00",  # 使用固定时间
-                "content": item['content'],
-                "image": "",  # 暂时为空，可以考虑从item中提取图片URL
-                "cloudLinks": cloud_links,
-                "tags": item['tags'],
-                "magnetLink": "",  # 暂时为空
-                "channel": "4K影视",
-                "channelId": "fox4k"
-            }
-            standard_results.append(standard_item)
-
-        return {
-            "list": standard_results,
-            "channelInfo": {
-                "id": "fox4k",
-                "name": "4K影视",
-                "index": 1000,
-                "channelLogo": ""
-            },
-            "id": "fox4k",
-            "index": 1000
-        }, None
+                logger.debug("  %s. 标题: %s, 链接数: %s", i + 1, r.title, len(r.cloudLinks))
+
+        # 列表页解析时已直接构建标准结果，无需再转换
+        return result_block("fox4k", CHANNEL_NAME, 1000, result['results']), None
 
     def search_impl(self, keyword):
         if DEBUG_MODE:
-            logging.debug(f"🔧 [Fox4k DEBUG] searchImpl 开始执行 - keyword: {keyword}")
+            logger.debug("🔧 [Fox4k DEBUG] searchImpl 开始执行 - keyword: %s", keyword)
         start_time = time.time()
         global search_requests
         search_requests += 1
 
         encoded_keyword = requests.utils.quote(keyword)
-        all_results = []
 
         # 1. 搜索第一页，获取总页数
-        first_page_results, total_pages, err = self.search_page(encoded_keyword, 1)
+        page_results, total_pages, err = self.search_page(encoded_keyword, 1)
         if err:
             return None, err
-        all_results.extend(first_page_results)
-
-        # 2. 如果有多页，继续搜索其他页面（限制最大页数）
-        max_pages_to_search = total_pages
-        if max_pages_to_search > MAX_PAGES:
-            max_pages_to_search = MAX_PAGES
-
-        if total_pages > 1 and max_pages_to_search > 1:
-            # 并发搜索其他页面
-            results = [None] * (max_pages_to_search - 1)
-            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as executor:
-                futures = {executor.submit(self.search_page, encoded_keyword, page): page for page in range(2, max_pages_to_search + 1)}
-                for future in concurrent.futures.as_completed(futures):
-                    page = futures[future]
-                    page_results, _, err = future.result()
-                    if not err:
-                        all_results.extend(page_results)
-
-        # 3. 并发获取详情页信息
-        all_results = self.enrich_with_detail_info(all_results)
-
-        # 4. 过滤关键词匹配的结果
-        results = self.filter_results_by_keyword(all_results, keyword)
+
+        # 2. 列表页到达即按标题/标签打分过滤，只为得分最高的候选补全详情；
+        #    详情请求随列表页流式提交，候选数足够后不再请求后续页面（限制最大页数）
+        max_pages_to_search = min(total_pages, MAX_PAGES)
+        keyword_lower = keyword.lower()
+        next_page = 2
+        order = 0
+        candidates = []  # (得分, 列表序号, 详情 future)
+        page_futures = []
+        prefetcher = concurrent.futures.ThreadPoolExecutor(max_workers=PAGE_BATCH_SIZE)
+        detail_executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENCY)
+        try:
+            while True:
+                scored = []
+                for item in page_results or []:
+                    score = self.score_list_item(item, keyword_lower)
+                    if score > 0:
+                        scored.append((score, order, item))
+                    order += 1
+                scored.sort(key=lambda x: (-x[0], x[1]))
+                for score, idx, item in scored[:CANDIDATE_LIMIT - len(candidates)]:
+                    candidates.append((score, idx, http_client.submit(detail_executor, self.enrich_item, item)))
+                if len(candidates) >= CANDIDATE_LIMIT:
+                    break
+
+                # 保持 PAGE_BATCH_SIZE 个列表页请求在途
+                while len(page_futures) < PAGE_BATCH_SIZE and next_page <= max_pages_to_search:
+                    page_futures.append(http_client.submit(prefetcher, self.search_page, encoded_keyword, next_page))
+                    next_page += 1
+                if not page_futures:
+                    break
+                page_results, _, err = page_futures.pop(0).result()
+                if err:
+                    page_results = []
+
+            # 3. 等待详情补全，丢弃没有有效下载链接的结果，按得分和列表顺序排列
+            results = []
+            for score, idx, future in sorted(candidates, key=lambda x: (-x[0], x[1])):
+                try:
+                    enriched = future.result()
+                except Exception as e:
+                    if DEBUG_MODE:
+                        logger.debug("❌ [Fox4k DEBUG] 获取详情失败: %s", e)
+                    continue
+                if enriched:
+                    results.append(enriched)
+        finally:
+            prefetcher.shutdown(wait=False, cancel_futures=True)
+            detail_executor.shutdown(wait=False, cancel_futures=True)
+
+        if DEBUG_MODE:
+            logger.debug("🔧 [Fox4k DEBUG] 分页结束 - 已请求 %s/%s 页", next_page - 1, total_pages)
 
         # 记录性能统计
         search_duration = time.time() - start_time
@@ -220,19 +223,19 @@ class Fox4kSearch(BaseSearch):
         total_search_time += search_duration
 
         if DEBUG_MODE:
-            logging.debug(f"🔧 [Fox4k DEBUG] searchImpl 完成 - 原始结果: {len(all_results)}, 过滤后结果: {len(results)}, 耗时: {search_duration}秒")
+            logger.debug("🔧 [Fox4k DEBUG] searchImpl 完成 - 列表条目: %s, 补全候选: %s, 有效结果: %s, 耗时: %s秒", order, len(candidates), len(results), search_duration)
 
         return results, None
 
     def search_page(self, encoded_keyword, page):
         if DEBUG_MODE:
-            logging.debug(f"🔧 [Fox4k DEBUG] searchPage 开始 - 第{page}页, keyword: {encoded_keyword}")
+            logger.debug("🔧 [Fox4k DEBUG] searchPage 开始 - 第%s页, keyword: %s", page, encoded_keyword)
 
         # 1. 构建搜索URL
         search_url = SEARCH_URL % encoded_keyword if page == 1 else SEARCH_PAGE_URL % (encoded_keyword, page)
 
         if DEBUG_MODE:
-            logging.debug(f"🔧 [Fox4k DEBUG] 构建的URL: {search_url}")
+            logger.debug("🔧 [Fox4k DEBUG] 构建的URL: %s", search_url)
 
         # 2. 创建带超时的上下文
         start_time = time.time()
@@ -257,10 +260,10 @@ class Fox4kSearch(BaseSearch):
 
         # 5. 发送HTTP请求
         if DEBUG_MODE:
-            logging.debug(f"🔧 [Fox4k DEBUG] 开始发送HTTP请求到: {search_url}")
-            logging.debug("🔧 [Fox4k DEBUG] 请求头信息:")
+            logger.debug("🔧 [Fox4k DEBUG] 开始发送HTTP请求到: %s", search_url)
+            logger.debug("🔧 [Fox4k DEBUG] 请求头信息:")
             for key, value in headers.items():
-                logging.debug(f"    {key}: {value}")
+                logger.debug("    %s: %s", key, value)
 
         resp, err = self.do_request_with_retry(search_url, headers)
         if err:
@@ -269,13 +272,13 @@ class Fox4kSearch(BaseSearch):
         # 6. 检查状态码
         if resp.status_code != 200:
             if DEBUG_MODE:
-                logging.debug(f"❌ [Fox4k DEBUG] 状态码异常: {resp.status_code}")
+                logger.debug("❌ [Fox4k DEBUG] 状态码异常: %s", resp.status_code)
             return None, 0, f"第{page}页请求返回状态码: {resp.status_code}"
 
         # 7. 读取并打印HTML响应
         html_content = resp.text
         if DEBUG_MODE:
-            logging.debug(f"🔧 [Fox4k DEBUG] 第{page}页 HTML长度: {len(html_content)} bytes")
+            logger.debug("🔧 [Fox4k DEBUG] 第%s页 HTML长度: %s bytes", page, len(html_content))
 
         # 保存HTML到文件（仅在调试模式下）
         if DEBUG_MODE:
@@ -287,9 +290,9 @@ class Fox4kSearch(BaseSearch):
             try:
                 with open(filepath, 'w', encoding='utf-8') as f:
                     f.write(html_content)
-                logging.debug(f"✅ [Fox4k DEBUG] HTML已保存到: {filepath}")
+                logger.debug("✅ [Fox4k DEBUG] HTML已保存到: %s", filepath)
             except Exception as e:
-                logging.debug(f"❌ [Fox4k DEBUG] 保存HTML文件失败: {e}")
+                logger.debug("❌ [Fox4k DEBUG] 保存HTML文件失败: %s", e)
 
         # 解析HTML响应
         doc = BeautifulSoup(html_content, 'html.parser')
@@ -413,55 +416,62 @@ class Fox4kSearch(BaseSearch):
         if score_text:
             content = "评分: " + score_text + "\n" + content
 
-        return {
-            "unique_id": f"fox4k-{id}",
-            "title": title,
-            "content": content,
-            "datetime": None,  # 使用零值而不是None，参考jikepan插件标准
-            "tags": tags,
-            "links": [],  # 初始为空，后续在详情页中填充
-            "channel": "",  # 插件搜索结果，Channel必须为空
-        }
+        return SearchResult(
+            messageId=f"fox4k-{id}",
+            title=title,
+            pubDate=PUB_DATE,
+            content=content,
+            tags=tags,
+            channel=CHANNEL_NAME,
+            channelId="fox4k",
+        )
 
-    def enrich_with_detail_info(self, results):
-        if not results:
-            return results
-
-        # 使用信号量控制并发数
-        semaphore = [True] * MAX_CONCURRENCY
-        enriched_results = results.copy()
-
-        def fetch_detail(index):
-            nonlocal semaphore
-            # 获取详情页信息
-            detail_info = self.get_detail_info(enriched_results[index]['unique_id'].split('-')[1])
-            if detail_info:
-                enriched_results[index]['links'] = detail_info['downloads']
-                if detail_info['content']:
-                    enriched_results[index]['content'] = detail_info['content']
-                # 补充标签
-                for tag in detail_info['tags']:
-                    if tag not in enriched_results[index]['tags']:
-                        enriched_results[index]['tags'].append(tag)
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as executor:
-            futures = [executor.submit(fetch_detail, i) for i in range(len(enriched_results))]
-            concurrent.futures.wait(futures)
-
-        # 过滤掉没有有效下载链接的结果
-        valid_results = [result for result in enriched_results if result['links']]
-        return valid_results
+    def enrich_item(self, result):
+        """用详情页信息补全单条结果，没有有效下载链接时返回 None"""
+        detail_info = self.get_detail_info(result.messageId.split('-')[1])
+        if detail_info:
+            result.cloudLinks = [
+                CloudLink(link['url'] + (f"?pwd={link['password']}" if link['password'] else ""), link['type'])
+                for link in detail_info['downloads']
+            ]
+            if detail_info['content']:
+                result.content = detail_info['content']
+            # 补充标签
+            for tag in detail_info['tags']:
+                if tag not in result.tags:
+                    result.tags.append(tag)
+        return result if result.cloudLinks else None
+
+    def score_list_item(self, result, keyword_lower):
+        """按列表页信息给结果打分，0 表示不匹配（不再请求详情页）"""
+        title = result.title.lower()
+        if title == keyword_lower:
+            return 100
+        if title.startswith(keyword_lower):
+            return 80
+        if keyword_lower in title:
+            return 60
+        if any(keyword_lower in tag.lower() for tag in result.tags):
+            return 30
+        if keyword_lower in result.content.lower():
+            return 20
+        return 0
 
     def get_detail_info(self, id):
+        # 详情页解析结果按URL缓存，跨关键词复用
+        return self._fetch_detail_cached(
+            DETAIL_URL % id,
+            self.fetch_detail_info,
+            is_negative=lambda detail: not detail or not detail['downloads']
+        )
+
+    def fetch_detail_info(self, detail_url):
         if DEBUG_MODE:
-            logging.debug(f"🔧 [Fox4k DEBUG] getDetailInfo 开始 - ID: {id}")
+            logger.debug("🔧 [Fox4k DEBUG] getDetailInfo 开始 - URL: %s", detail_url)
         start_time = time.time()
         global detail_page_requests
         detail_page_requests += 1
 
-        # 构建详情页URL
-        detail_url = DETAIL_URL % id
-
         # 创建带超时的上下文
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.0.0 Safari/537.36",
@@ -474,7 +484,8 @@ class Fox4kSearch(BaseSearch):
         # 发送请求
         resp, err = self.do_request_with_retry(detail_url, headers)
         if err:
-            return None
+            # 请求失败抛出，不写入详情缓存
+            raise Exception(f"详情页请求失败: {err}")
 
         # 解析HTML
         doc = BeautifulSoup(resp.text, 'html.parser')
@@ -626,66 +637,28 @@ class Fox4kSearch(BaseSearch):
         detail['downloads'].append(link)
 
     def do_request_with_retry(self, url, headers):
-        max_retries = 3
-        last_err = None
-
-        if DEBUG_MODE:
-            logging.debug(f"🔄 [Fox4k DEBUG] 开始重试机制 - 最大重试次数: {max_retries}")
-
-        for i in range(max_retries):
+        """按共享重试策略请求：单次超时与重试等待都不超过本次搜索的剩余时间，慢请求发出对冲请求"""
+        try:
+            attempt_start = time.time()
+            resp = request_with_retry("GET", url, session=self.optimized_client, policy=RETRY_POLICY,
+                                      headers=headers, timeout=DEFAULT_TIMEOUT)
             if DEBUG_MODE:
-                logging.debug(f"🔄 [Fox4k DEBUG] 第 {i+1}/{max_retries} 次尝试")
-
-            if i > 0:
-                # 指数退避重试
-                backoff = (2 ** (i - 1)) * 0.2  # 0.2, 0.4, 0.8 seconds
-                if DEBUG_MODE:
-                    logging.debug(f"⏳ [Fox4k DEBUG] 等待 {backoff} 秒后重试")
-                time.sleep(backoff)
-
-            try:
-                attempt_start = time.time()
-                resp = self.optimized_client.get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
-                attempt_duration = time.time() - attempt_start
-
-                if DEBUG_MODE:
-                    logging.debug(f"🔧 [Fox4k DEBUG] 第 {i+1} 次尝试耗时: {attempt_duration}秒")
-
-                if resp.status_code == 200:
-                    if DEBUG_MODE:
-                        logging.debug(f"✅ [Fox4k DEBUG] 第 {i+1} 次尝试成功!")
-                    return resp, None
-
-                if DEBUG_MODE:
-                    logging.debug(f"❌ [Fox4k DEBUG] 第 {i+1} 次尝试状态码异常: {resp.status_code}")
-
-                # 读取响应体以便调试
-                if resp.text and len(resp.text) > 0:
-                    body_preview = resp.text
-                    if len(body_preview) > 200:
-                        body_preview = body_preview[:200] + "..."
-                    if DEBUG_MODE:
-                        logging.debug(f"🔧 [Fox4k DEBUG] 响应体预览: {body_preview}")
-
-                last_err = f"状态码 {resp.status_code}"
-            except Exception as e:
-                if DEBUG_MODE:
-                    logging.debug(f"❌ [Fox4k DEBUG] 第 {i+1} 次尝试失败: {e}")
-                last_err = e
-                continue
-
-        if DEBUG_MODE:
-            logging.debug("❌ [Fox4k DEBUG] 所有重试都失败了!")
-        return None, f"重试 {max_retries} 次后仍然失败: {last_err}"
-
-
-    def filter_results_by_keyword(self, results, keyword):
-        # 简单的关键词过滤
-        filtered_results = []
-        for result in results:
-            if keyword.lower() in result['title'].lower() or keyword.lower() in result['content'].lower():
-                filtered_results.append(result)
-        return filtered_results
+                logger.debug("🔧 [Fox4k DEBUG] 请求耗时: %s秒, 状态码: %s", time.time() - attempt_start, resp.status_code)
+        except Exception as e:
+            if DEBUG_MODE:
+                logger.debug("❌ [Fox4k DEBUG] 请求失败: %s", e)
+            return None, f"请求失败: {e}"
+
+        if resp.status_code == 200:
+            return resp, None
+
+        # 读取响应体以便调试
+        if DEBUG_MODE and resp.text:
+            body_preview = resp.text
+            if len(body_preview) > 200:
+                body_preview = body_preview[:200] + "..."
+            logger.debug("🔧 [Fox4k DEBUG] 响应体预览: %s", body_preview)
+        return None, f"状态码 {resp.status_code}"
 
     def async_search_with_result(self, keyword, search_func, *args):
         # 简单的异步搜索实现
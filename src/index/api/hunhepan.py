@@ -1,5 +1,5 @@
-from ..base import BaseSearch
-import requests
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..http_client import request_with_retry
 import json
 from typing import List, Dict, Any
 
@@ -68,14 +68,15 @@ class HunhepanSearch(BaseSearch):
             try:
                 headers = self.headers_base.copy()
                 headers['referer'] = referer
-                resp = requests.post(
+                resp = request_with_retry(
+                    "POST",
                     api_url,
                     headers=headers,
                     json=payload,
                     timeout=10
                 )
                 resp.raise_for_status()
-                data = resp.json()
+                data = self.parse_json(resp)
                 if data.get("code") == 200:
                     with lock:
                         results.extend(data.get("data", {}).get("list", []))
@@ -100,28 +101,12 @@ class HunhepanSearch(BaseSearch):
                 seen.add(key)
                 deduped.append(item)
 
-        return {
-            "list": [{
-                "messageId": item.get("doc_id", ""),
-                "title": item.get("disk_name", "").replace("<em>", "").replace("</em>", ""),
-                "pubDate": item.get("shared_time", ""),
-                "content": item.get("files", ""),
-                "image": "",
-                "cloudLinks": [{
-                    "link": item.get("link", ""),
-                    "cloudType": self.detect_cloud_type(item.get("link", ""))
-                }],
-                "tags": [],
-                "magnetLink": "",
-                "channel": "混合盘",
-                "channelId": "hunhepan"
-            } for item in deduped],
-            "channelInfo": {
-                "id": "hunhepan",
-                "name": "混合盘",
-                "index": 1004,
-                "channelLogo": ""
-            },
-            "id": "hunhepan",
-            "index": 1004
-        }
\ No newline at end of file
+        return result_block("hunhepan", "混合盘", 1004, [SearchResult(
+            messageId=item.get("doc_id", ""),
+            title=item.get("disk_name", "").replace("<em>", "").replace("</em>", ""),
+            pubDate=item.get("shared_time", ""),
+            content=item.get("files", ""),
+            cloudLinks=[CloudLink(item.get("link", ""), self.detect_cloud_type(item.get("link", "")))],
+            channel="混合盘",
+            channelId="hunhepan"
+        ) for item in deduped])
\ No newline at end of file
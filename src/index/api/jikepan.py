@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
-from ..base import BaseSearch
-import requests
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..http_client import request_with_retry
 from typing import List, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
 
 class JikepanSearch(BaseSearch):
     """即刻盘搜索实现"""
@@ -34,27 +37,18 @@ class JikepanSearch(BaseSearch):
             "is_all": is_all
         }
         try:
-            resp = requests.post(
+            resp = request_with_retry(
+                "POST",
                 self.api_url,
                 headers=self.headers,
                 json=payload,
                 timeout=15
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = self.parse_json(resp)
             if data.get("msg") != "success":
-                print(f"API请求失败: {data.get('msg')}")
-                return {
-                    "list": [],
-                    "channelInfo": {
-                        "id": "jikepan",
-                        "name": "即刻盘",
-                        "index": 1020,
-                        "channelLogo": ""
-                    },
-                    "id": "jikepan",
-                    "index": 1020
-                }
+                logger.error("API请求失败: %s", data.get('msg'))
+                return result_block("jikepan", "即刻盘", 1020, [])
 
             results = []
             for idx, item in enumerate(data.get("list", [])):
@@ -71,50 +65,22 @@ class JikepanSearch(BaseSearch):
                             link_type = fallback_type
                     if not link_type:
                         continue
-                    links.append({
-                        "link": link.get("link", ""),
-                        "cloudType": link_type,
-                        "Password": link.get("pwd", "")
-                    })
+                    links.append(CloudLink(link.get("link", ""), link_type, link.get("pwd", "")))
                 if not links:
                     continue
-                results.append({
-                    "messageId": f"jikepan-{idx}",
-                    "title": item.get("name", ""),
-                    "pubDate": "",
-                    "content": item.get("name", ""),
-                    "image": "",
-                    "cloudLinks": links,
-                    "tags": [],
-                    "magnetLink": "",
-                    "channel": "即刻盘",
-                    "channelId": "jikepan"
-                })
+                results.append(SearchResult(
+                    messageId=f"jikepan-{idx}",
+                    title=item.get("name", ""),
+                    content=item.get("name", ""),
+                    cloudLinks=links,
+                    channel="即刻盘",
+                    channelId="jikepan"
+                ))
 
-            return {
-                "list": results,
-                "channelInfo": {
-                    "id": "jikepan",
-                    "name": "即刻盘",
-                    "index": 1020,
-                    "channelLogo": ""
-                },
-                "id": "jikepan",
-                "index": 1020
-            }
+            return result_block("jikepan", "即刻盘", 1020, results)
         except Exception as e:
-            print(f"API请求异常: {str(e)}")
-            return {
-                "list": [],
-                "channelInfo": {
-                    "id": "jikepan",
-                    "name": "即刻盘",
-                    "index": 1020,
-                    "channelLogo": ""
-                },
-                "id": "jikepan",
-                "index": 1020
-            }
+            logger.error("API请求异常: %s", e)
+            return result_block("jikepan", "即刻盘", 1020, [])
 
     def _convert_link_type(self, service: str) -> str:
         service = (service or "").lower()
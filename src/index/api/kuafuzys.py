@@ -1,10 +1,13 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
 import requests
 from bs4 import BeautifulSoup
 from typing import Dict, Any, List
 import re
 import yaml
 from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
 
 class KuafuzysSearch(BaseSearch):
     """
@@ -121,21 +124,15 @@ class KuafuzysSearch(BaseSearch):
                     image = ""
                     
                     # 构造结果对象
-                    result = {
-                        "messageId": self._extract_message_id(link),
-                        "title": self._clean_html(title),
-                        "pubDate": "",
-                        "content": self._clean_html(content),
-                        "image": image,
-                        "cloudLinks": [{
-                            "link": quark_link,
-                            "cloudType": self.detect_cloud_type(quark_link)
-                        }],
-                        "tags": [],
-                        "magnetLink": "",
-                        "channel": "Kuafuzys",
-                        "channelId": "kuafuzys"
-                    }
+                    result = SearchResult(
+                        messageId=self._extract_message_id(link),
+                        title=self._clean_html(title),
+                        content=self._clean_html(content),
+                        image=image,
+                        cloudLinks=[CloudLink(quark_link, self.detect_cloud_type(quark_link))],
+                        channel="Kuafuzys",
+                        channelId="kuafuzys"
+                    )
                     
                     # 添加到待处理列表
                     items_to_process.append((link, result))
@@ -144,7 +141,7 @@ class KuafuzysSearch(BaseSearch):
                     if valid_count >= 3:  # 如果已经选择了3个结果，则跳出循环
                         break
                 except Exception as e:
-                    print(f"解析结果项失败: {str(e)}")
+                    logger.warning("解析结果项失败: %s", e)
                     continue
             
             # 使用异步多线程处理结果项
@@ -156,7 +153,7 @@ class KuafuzysSearch(BaseSearch):
             return self._format_results(results, keyword)
             
         except Exception as e:
-            print(f"kuafuzys搜索失败: {str(e)}")
+            logger.error("kuafuzys搜索失败: %s", e)
             return self._format_results([], keyword)
     def _extract_message_id(self, link: str) -> str:
         """
@@ -168,23 +165,11 @@ class KuafuzysSearch(BaseSearch):
         if match:
             return match.group(1)
 
-    def _format_results(self, results: List[Dict[str, Any]], keyword: str) -> Dict[str, Any]:
+    def _format_results(self, results: List[SearchResult], keyword: str) -> Dict[str, Any]:
         """
         格式化结果，与其它搜索插件保持一致
         """
-        return {
-            "list": results,
-            "channelInfo": {
-                "id": "kuafuzys",
-                "name": "Kuafuzys",
-                "index": 1080,
-                "channelLogo": ""
-            },
-            "id": "kuafuzys",
-            "index": 1080,
-            "total": len(results),
-            "keyword": keyword
-        }
+        return result_block("kuafuzys", "Kuafuzys", 1080, results, total=len(results), keyword=keyword)
 
     def post_comment(self, thread_id: int, message: str) -> bool:
         """
@@ -240,7 +225,7 @@ class KuafuzysSearch(BaseSearch):
             
             # 解析响应JSON并检查"code"字段
             try:
-                response_json = response.json()
+                response_json = self.parse_json(response)
                 # 如果"code"为"0"则认为发表成功
                 if response_json.get("code") == "0":
                     return True
@@ -248,11 +233,11 @@ class KuafuzysSearch(BaseSearch):
                     return False
             except Exception as json_error:
                 # 如果无法解析JSON，则根据状态码判断
-                print(f"无法解析响应JSON: {str(json_error)}")
+                logger.warning("无法解析响应JSON: %s", json_error)
                 return False
                 
         except Exception as e:
-            print(f"发表评论失败: {str(e)}")
+            logger.error("发表评论失败: %s", e)
             return False
 
     def _process_result_item(self, item):
@@ -307,7 +292,7 @@ class KuafuzysSearch(BaseSearch):
                 if img_tag:
                     image_url = img_tag.get('data-original', '') or img_tag.get('src', '')
                     # 更新结果对象中的图片URL
-                    result["image"] = image_url
+                    result.image = image_url
                 
                 # 提取夸克链接
                 alert_div = detail_soup.find('div', class_='alert alert-success')
@@ -317,22 +302,18 @@ class KuafuzysSearch(BaseSearch):
                         quark_link = link_tag['href']
                         # 更新结果对象中的cloudLinks
                         if quark_link:
-                            result["cloudLinks"] = [{
-                                "link": quark_link,
-                                "cloudType": self.detect_cloud_type(quark_link)
-                            }]
+                            result.cloudLinks = [CloudLink(quark_link, self.detect_cloud_type(quark_link))]
             
             # 更新cloudLinks中的原始链接
             if link:
                 original_link = f"https://www.kuafuzys.com/{link.lstrip('/')}" if link.startswith('/') else link
                 # 如果还没有夸克链接，则保留原始链接
-                if not result["cloudLinks"][0]["link"]:
-                    result["cloudLinks"][0]["link"] = original_link
-                    result["cloudLinks"][0]["cloudType"] = self.detect_cloud_type(original_link)
+                if not result.cloudLinks[0].link:
+                    result.cloudLinks[0] = CloudLink(original_link, self.detect_cloud_type(original_link))
             
             return result
         except Exception as detail_error:
-            print(f"处理结果项失败: {str(detail_error)}")
+            logger.warning("处理结果项失败: %s", detail_error)
             return None
 
 
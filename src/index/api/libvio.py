@@ -1,11 +1,14 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
 import requests
 from bs4 import BeautifulSoup
 from typing import List, Dict, Any
 import urllib.parse
 import threading
 import re
-import json
+from .. import json_backend
+import logging
+
+logger = logging.getLogger(__name__)
 
 class LibvioSearch(BaseSearch):
     """Libvio可用域名接口，自动检测并缓存可用域名"""
@@ -29,7 +32,7 @@ class LibvioSearch(BaseSearch):
                     domains.append(href.rstrip("/"))
             return domains
         except Exception as e:
-            print(f"Libvio获取域名失败: {str(e)}")
+            logger.error("Libvio获取域名失败: %s", e)
             return []
 
     def refresh_cache(self, keyword: str = "测试") -> str:
@@ -111,17 +114,14 @@ class LibvioSearch(BaseSearch):
                             m = re.search(r'var\s+player_aaaa\s*=\s*(\{.*?\})', play_html, re.DOTALL)
                             if m:
                                 js_obj_str = m.group(1)
-                                js_obj = json.loads(js_obj_str)
+                                js_obj = json_backend.loads(js_obj_str)
                                 url = js_obj.get("url", "").replace('\\/', '/')
                                 if url.startswith("http"):
-                                    info["cloudLinks"].append({
-                                        "link": url,
-                                        "cloudType": self.detect_cloud_type(url)
-                                    })
+                                    info["cloudLinks"].append(CloudLink(url, self.detect_cloud_type(url)))
                     except Exception as e:
-                        print(f"解析播放页失败: {str(e)}")
+                        logger.warning("解析播放页失败: %s", e)
         except Exception as e:
-            print(f"解析详情页信息失败: {str(e)}")
+            logger.warning("解析详情页信息失败: %s", e)
         return info
 
     def search(self, keyword: str) -> Dict[str, Any]:
@@ -133,17 +133,7 @@ class LibvioSearch(BaseSearch):
         if not domain:
             domain = self.refresh_cache(keyword)
         if not domain:
-            return {
-                "list": [],
-                "channelInfo": {
-                    "id": "libvio",
-                    "name": "Libvio",
-                    "index": 1050,
-                    "channelLogo": ""
-                },
-                "id": "libvio",
-                "index": 1050
-            }
+            return result_block("libvio", "Libvio", 1050, [])
         # 搜索页
         search_url = f"{domain}/search/-------------.html?wd={urllib.parse.quote(keyword)}&submit="
         detail_links_set = set()
@@ -158,7 +148,7 @@ class LibvioSearch(BaseSearch):
                         if a and re.match(r"^/detail/\d+\.html", a["href"]):
                             detail_links_set.add(a["href"])
         except Exception as e:
-            print(f"Libvio搜索页解析失败: {str(e)}")
+            logger.warning("Libvio搜索页解析失败: %s", e)
 
         detail_links = list(detail_links_set)
         # 多线程批量采集详情页
@@ -171,27 +161,15 @@ class LibvioSearch(BaseSearch):
         result_list = []
         for detail_url, info in zip(detail_links, detail_infos):
             if info and info.get("cloudLinks"):
-                result_list.append({
-                    "messageId": detail_url,
-                    "title": info["title"],
-                    "pubDate": info["year"],
-                    "content": info["desc"],
-                    "image": info["poster"],
-                    "cloudLinks": info["cloudLinks"],
-                    "tags": [],
-                    "magnetLink": "",
-                    "channel": "Libvio",
-                    "channelId": "libvio"
-                })
+                result_list.append(SearchResult(
+                    messageId=detail_url,
+                    title=info["title"],
+                    pubDate=info["year"],
+                    content=info["desc"],
+                    image=info["poster"],
+                    cloudLinks=info["cloudLinks"],
+                    channel="Libvio",
+                    channelId="libvio"
+                ))
 
-        return {
-            "list": result_list,
-            "channelInfo": {
-                "id": "libvio",
-                "name": "Libvio",
-                "index": 1050,
-                "channelLogo": ""
-            },
-            "id": "libvio",
-            "index": 1050
-        }
\ No newline at end of file
+        return result_block("libvio", "Libvio", 1050, result_list)
\ No newline at end of file
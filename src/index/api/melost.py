@@ -1,6 +1,9 @@
-from ..base import BaseSearch
-import requests
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..http_client import request_with_retry
 from typing import List, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
 
 class MelostSearch(BaseSearch):
     """Melost 资源搜索实现"""
@@ -67,7 +70,8 @@ class MelostSearch(BaseSearch):
         }
 
         try:
-            response = requests.post(
+            response = request_with_retry(
+                "POST",
                 url,
                 headers=headers,
                 cookies=cookies,
@@ -75,38 +79,23 @@ class MelostSearch(BaseSearch):
                 timeout=10
             )
             response.raise_for_status()
-            data = response.json()
+            data = self.parse_json(response)
 
             # 资源列表在 data['list']
             items = data.get('data', {}).get('list', [])
             def safe_tags(tags):
                 return tags if isinstance(tags, list) else []
-            return {
-                "list": [{
-                    "messageId": str(item.get("disk_id", "")),
-                    "title": self._clean_html(item.get("disk_name", "")),
-                    "pubDate": item.get("shared_time", ""),
-                    "content": self._clean_html(item.get("disk_name", "")),
-                    "image": "",
-                    "cloudLinks": [{
-                        "link": item.get("link", ""),
-                        "cloudType": self.detect_cloud_type(item.get("link", ""))
-                    }],
-                    "tags": safe_tags(item.get("tags", [])),
-                    "magnetLink": "",
-                    "channel": "Melost",
-                    "channelId": "melost"
-                } for item in items],
-                "channelInfo": {
-                    "id": "melost",
-                    "name": "Melost",
-                    "index": 1001,
-                    "channelLogo": ""
-                },
-                "id": "melost",
-                "index": 1001
-            }
+            return result_block("melost", "Melost", 1001, [SearchResult(
+                messageId=str(item.get("disk_id", "")),
+                title=self._clean_html(item.get("disk_name", "")),
+                pubDate=item.get("shared_time", ""),
+                content=self._clean_html(item.get("disk_name", "")),
+                cloudLinks=[CloudLink(item.get("link", ""), self.detect_cloud_type(item.get("link", "")))],
+                tags=safe_tags(item.get("tags", [])),
+                channel="Melost",
+                channelId="melost"
+            ) for item in items])
 
         except Exception as e:
-            print(f"Melost API请求失败: {str(e)}")
-            return []
\ No newline at end of file
+            logger.error("Melost API请求失败: %s", e)
+            return result_block("melost", "Melost", 1001, [])
\ No newline at end of file
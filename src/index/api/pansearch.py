@@ -1,11 +1,30 @@
 import re
+import json
+import os
+import time
+import threading
 import requests
-from typing import List, Dict, Any
-from ..base import BaseSearch
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from .. import json_backend
+import logging
+
+logger = logging.getLogger(__name__)
 
 class PansearchSearch(BaseSearch):
     """pansearch.me 网盘搜索实现"""
 
+    BUILD_ID_TTL = 6 * 3600  # buildId 缓存有效期
+    BUILD_ID_REFRESH_INTERVAL = 1800  # 后台刷新 buildId 的间隔
+    BUILD_ID_FILE_NAME = "pansearch_build_id.json"  # 多进程共享的 buildId 缓存文件
+
+    # buildId 为站点级数据，所有实例共享
+    _build_id: Optional[str] = None
+    _build_id_updated_at = 0.0
+    _build_id_lock = threading.Lock()
+    _refresher_started = False
+
     def __init__(self):
         self.website_url = "https://www.pansearch.me/search"
         self.api_url_template = "https://www.pansearch.me/_next/data/{buildId}/search.json"
@@ -18,9 +37,84 @@ class PansearchSearch(BaseSearch):
             'cache-control': 'no-cache',
             'pragma': 'no-cache',
         }
+        self._start_build_id_refresher()
 
     # 云盘类型识别统一用父类方法
 
+    def _start_build_id_refresher(self):
+        """启动后台刷新线程，稳态下搜索无需等待 buildId 提取"""
+        cls = PansearchSearch
+        with cls._build_id_lock:
+            if cls._refresher_started:
+                return
+            cls._refresher_started = True
+
+        def refresher():
+            while True:
+                time.sleep(self.BUILD_ID_REFRESH_INTERVAL)
+                try:
+                    self._store_build_id(self._get_build_id())
+                except Exception as e:
+                    logger.error("pansearch: 后台刷新 buildId 失败: %s", e)
+        t = threading.Thread(target=refresher, daemon=True)
+        t.start()
+
+    def _get_cached_build_id(self) -> str:
+        """获取 buildId：内存缓存 -> 文件缓存 -> 请求首页提取"""
+        cls = PansearchSearch
+        if cls._build_id and time.time() - cls._build_id_updated_at < self.BUILD_ID_TTL:
+            return cls._build_id
+        with cls._build_id_lock:
+            if cls._build_id and time.time() - cls._build_id_updated_at < self.BUILD_ID_TTL:
+                return cls._build_id
+            build_id, updated_at = self._load_build_id_from_file()
+            if build_id and time.time() - updated_at < self.BUILD_ID_TTL:
+                cls._build_id, cls._build_id_updated_at = build_id, updated_at
+                return build_id
+        build_id = self._get_build_id()
+        self._store_build_id(build_id)
+        return build_id
+
+    def _store_build_id(self, build_id: str):
+        cls = PansearchSearch
+        with cls._build_id_lock:
+            cls._build_id = build_id
+            updated_at = cls._build_id_updated_at = time.time()
+        try:
+            # 先写临时文件再原子替换，其他进程/后台刷新线程不会读到写了一半的文件
+            tmp_path = Path(f"{self.BUILD_ID_FILE_NAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({"buildId": build_id, "updated_at": updated_at}, f)
+            os.replace(tmp_path, self.BUILD_ID_FILE_NAME)
+        except Exception as e:
+            logger.error("pansearch: 保存 buildId 到文件失败: %s", e)
+
+    def _invalidate_build_id(self, stale_build_id: str):
+        """数据接口返回404说明 buildId 已随站点发版失效，丢弃内存和文件缓存"""
+        cls = PansearchSearch
+        with cls._build_id_lock:
+            if cls._build_id == stale_build_id:
+                cls._build_id = None
+                cls._build_id_updated_at = 0.0
+            build_id, _ = self._load_build_id_from_file()
+            if build_id == stale_build_id:
+                try:
+                    Path(self.BUILD_ID_FILE_NAME).unlink()
+                except OSError:
+                    pass
+
+    def _load_build_id_from_file(self):
+        """从文件加载 buildId，返回 (buildId, 更新时间)"""
+        config_path = Path(self.BUILD_ID_FILE_NAME)
+        if not config_path.exists():
+            return None, 0.0
+        try:
+            with open(config_path, 'r') as f:
+                data = json.load(f)
+            return data.get("buildId"), float(data.get("updated_at", 0))
+        except Exception:
+            return None, 0.0
+
     def _get_build_id(self) -> str:
         """从首页HTML提取buildId"""
         resp = requests.get(self.website_url, headers=self.headers, timeout=10)
@@ -33,9 +127,8 @@ class PansearchSearch(BaseSearch):
         # 兼容 __NEXT_DATA__ 脚本
         m2 = re.search(r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', html)
         if m2:
-            import json
             try:
-                data = json.loads(m2.group(1))
+                data = json_backend.loads(m2.group(1))
                 if "buildId" in data:
                     return data["buildId"]
             except Exception:
@@ -82,16 +175,22 @@ class PansearchSearch(BaseSearch):
             标准化的结果字典
         """
         try:
-            build_id = self._get_build_id()
-            api_url = self.api_url_template.format(buildId=build_id)
+            build_id = self._get_cached_build_id()
             offset = (page - 1) * 10
             params = {
                 "keyword": keyword,
                 "offset": offset
             }
-            resp = requests.get(api_url, headers=self.headers, params=params, timeout=10)
+            resp = requests.get(self.api_url_template.format(buildId=build_id),
+                                headers=self.headers, params=params, timeout=10)
+            if resp.status_code == 404:
+                # buildId 已过期，失效缓存后重新获取并重试一次
+                self._invalidate_build_id(build_id)
+                build_id = self._get_cached_build_id()
+                resp = requests.get(self.api_url_template.format(buildId=build_id),
+                                    headers=self.headers, params=params, timeout=10)
             resp.raise_for_status()
-            data = resp.json()
+            data = self.parse_json(resp)
             items = data.get("pageProps", {}).get("data", {}).get("data", [])
             total = data.get("pageProps", {}).get("data", {}).get("total", len(items))
             list_data = []
@@ -100,46 +199,16 @@ class PansearchSearch(BaseSearch):
                 link_info = self._extract_link_and_pwd(content)
                 link = link_info["link"]
                 pwd = link_info["pwd"]
-                list_data.append({
-                    "messageId": f"pansearch-{item.get('id', '')}",
-                    "title": self._extract_title(content, keyword),
-                    "pubDate": item.get("time", ""),
-                    "content": content,
-                    "fileType": "dir",
-                    "uploader": "",
-                    "cloudLinks": [{
-                        "link": link,
-                        "cloudType": self.detect_cloud_type(link),
-                        "pwd": pwd
-                    }],
-                    "tags": [],
-                    "magnetLink": "",
-                    "channel": "pansearch",
-                    "channelId": "pansearch"
-                })
-            return {
-                "list": list_data,
-                "channelInfo": {
-                    "id": "pansearch",
-                    "name": "pansearch",
-                    "index": 1011,
-                    "channelLogo": ""
-                },
-                "id": "pansearch",
-                "index": 1011,
-                "total": total,
-                "keyword": keyword
-            }
+                list_data.append(SearchResult(
+                    messageId=f"pansearch-{item.get('id', '')}",
+                    title=self._extract_title(content, keyword),
+                    pubDate=item.get("time", ""),
+                    content=content,
+                    cloudLinks=[CloudLink(link, self.detect_cloud_type(link), pwd)],
+                    channel="pansearch",
+                    channelId="pansearch"
+                ))
+            return result_block("pansearch", "pansearch", 1011, list_data, total=total, keyword=keyword)
         except Exception as e:
-            print(f"API请求失败: {str(e)}")
-            return {
-                "list": [],
-                "channelInfo": {
-                    "id": "pansearch",
-                    "name": "pansearch",
-                    "index": 1011,
-                    "channelLogo": ""
-                },
-                "id": "pansearch",
-                "index": 1011
-            }
\ No newline at end of file
+            logger.error("API请求失败: %s", e)
+            return result_block("pansearch", "pansearch", 1011, [])
\ No newline at end of file
@@ -1,6 +1,9 @@
-from ..base import BaseSearch
-import requests
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..http_client import request_with_retry
 from typing import List, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
 
 class PanwsSearch(BaseSearch):
     """panws.top 网盘搜索实现"""
@@ -44,7 +47,8 @@ class PanwsSearch(BaseSearch):
                 "q": keyword,
                 "page": page
             }
-            resp = requests.get(
+            resp = request_with_retry(
+                "GET",
                 self.base_url,
                 headers=self.headers,
                 cookies=self.cookies,
@@ -52,50 +56,21 @@ class PanwsSearch(BaseSearch):
                 timeout=10
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = self.parse_json(resp)
             results = data.get("results", [])
             list_data = []
             for item in results:
                 link = item.get("link", "")
-                list_data.append({
-                    "messageId": link,
-                    "title": item.get("name", ""),
-                    "pubDate": "",
-                    "content": item.get("name", ""),
-                    "fileType": "dir",
-                    "uploader": "",
-                    "cloudLinks": [{
-                        "link": link,
-                        "cloudType": self.detect_cloud_type(link)
-                    }],
-                    "tags": [],
-                    "magnetLink": "",
-                    "channel": "panws",
-                    "channelId": "panws"
-                })
-            return {
-                "list": list_data,
-                "channelInfo": {
-                    "id": "panws",
-                    "name": "panws",
-                    "index": 1010,
-                    "channelLogo": ""
-                },
-                "id": "panws",
-                "index": 1010,
-                "total": data.get("totalResults", len(results)),
-                "keyword": keyword
-            }
+                list_data.append(SearchResult(
+                    messageId=link,
+                    title=item.get("name", ""),
+                    content=item.get("name", ""),
+                    cloudLinks=[CloudLink(link, self.detect_cloud_type(link))],
+                    channel="panws",
+                    channelId="panws"
+                ))
+            return result_block("panws", "panws", 1010, list_data,
+                                total=data.get("totalResults", len(results)), keyword=keyword)
         except Exception as e:
-            print(f"API请求失败: {str(e)}")
-            return {
-                "list": [],
-                "channelInfo": {
-                    "id": "panws",
-                    "name": "panws",
-                    "index": 1010,
-                    "channelLogo": ""
-                },
-                "id": "panws",
-                "index": 1010
-            }
\ No newline at end of file
+            logger.error("API请求失败: %s", e)
+            return result_block("panws", "panws", 1010, [])
\ No newline at end of file
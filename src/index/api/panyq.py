@@ -1,5 +1,11 @@
-from ..base import BaseSearch
-import requests
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..cache import TTLCache
+from .. import http_client
+from .. import json_backend
+from ..query import canonicalize, matches
+from ..http_client import RetryPolicy, request_with_retry
+import httpx
+import importlib.util
 import re
 import json
 import os
@@ -7,20 +13,38 @@ import time
 import urllib.parse
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from threading import Lock, RLock
+from threading import Lock
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
-from requests.adapters import HTTPAdapter
+import logging
+
+logger = logging.getLogger(__name__)
+
+# httpx 的 HTTP/2 支持依赖 h2（pip install httpx[http2]）
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 class PanyqSearch(BaseSearch):
     """盘友圈搜索实现"""
     
     # 常量定义
     DEFAULT_TIMEOUT = 15
-    MAX_CONCURRENCY = 100
+    RESOLVE_CONCURRENCY = 16  # 中间步骤/最终链接请求的并发数，HTTP/2 下复用少量连接多路复用
+    MAX_CONNECTIONS = 4
     MAX_RETRIES = 0
-    DEBUG_LOG = False
+    RETRY_POLICY = RetryPolicy(max_attempts=MAX_RETRIES + 1, timeout=DEFAULT_TIMEOUT, backoff=0.5, max_backoff=5)
+    MAX_PAGES = 3  # 最大分页数
+    RESULT_TARGET = 20  # 结果目标数，达到后不再请求后续分页
     CONFIG_FILE_NAME = "panyq_config.json"
+    # 缓存上限：条目数 / 有效期（秒） / 估算内存占用
+    ACTION_ID_TTL = 12 * 3600
+    FINAL_LINK_CACHE_MAXSIZE = 20000
+    FINAL_LINK_CACHE_TTL = 6 * 3600
+    FINAL_LINK_CACHE_MAX_BYTES = 32 * 1024 * 1024
+    SEARCH_RESULT_CACHE_MAXSIZE = 512
+    SEARCH_RESULT_CACHE_TTL = 1800
+    SEARCH_RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    INTERMEDIATE_CACHE_TTL = 600
+    CACHE_PURGE_INTERVAL = 300
     BASE_URL = "https://panyq.com"
     ENABLE_REFERER_CHECK = True
     
@@ -38,33 +62,47 @@ class PanyqSearch(BaseSearch):
     def __init__(self, use_playwright: bool = False):
         self.use_playwright = use_playwright
         self.client = self._create_http_client()
-        self.action_id_cache = {}
-        self.final_link_cache = {}
-        self.search_result_cache = {}
-        self.action_id_lock = RLock()
-        self.final_link_lock = RLock()
-        self.search_result_lock = RLock()
+        # Action ID 整组缓存，过期后重新加载/发现
+        self.action_id_cache = TTLCache(maxsize=1, ttl=self.ACTION_ID_TTL)
+        # 已确认中间状态的 (action_id, hash, eid)，同一凭证下重复出现的结果不再确认
+        self.intermediate_cache = TTLCache(
+            maxsize=self.FINAL_LINK_CACHE_MAXSIZE,
+            ttl=self.INTERMEDIATE_CACHE_TTL
+        )
+        # 常驻的结果解析线程池，所有搜索共享，避免每页新建上百线程
+        self._resolver = ThreadPoolExecutor(
+            max_workers=self.RESOLVE_CONCURRENCY,
+            thread_name_prefix="panyq-resolve"
+        )
+        # 按条目过期并限制总量，热点链接长期保留，冷数据自然淘汰
+        self.final_link_cache = TTLCache(
+            maxsize=self.FINAL_LINK_CACHE_MAXSIZE,
+            ttl=self.FINAL_LINK_CACHE_TTL,
+            max_bytes=self.FINAL_LINK_CACHE_MAX_BYTES
+        )
+        self.search_result_cache = TTLCache(
+            maxsize=self.SEARCH_RESULT_CACHE_MAXSIZE,
+            ttl=self.SEARCH_RESULT_CACHE_TTL,
+            max_bytes=self.SEARCH_RESULT_CACHE_MAX_BYTES
+        )
         
-        # 启动缓存清理
+        # 启动过期条目清理
         self._start_cache_cleaner()
     
     def _create_http_client(self):
-        """创建HTTP客户端"""
-        
-        session = requests.Session()
-        
-        # 配置适配器，增加连接池大小
-        adapter = HTTPAdapter(
-            pool_connections=20,  # 连接池中的连接数
-            pool_maxsize=50,      # 连接池最大连接数
+        """创建HTTP客户端：可用时启用 HTTP/2，多线程共享少量连接"""
+        if not HTTP2_AVAILABLE:
+            logger.warning("panyq: 未安装 h2（pip install httpx[http2]），使用 HTTP/1.1 连接池")
+        max_connections = self.MAX_CONNECTIONS if HTTP2_AVAILABLE else self.RESOLVE_CONCURRENCY
+        return httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            timeout=self.DEFAULT_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
         )
-        
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        
-        # session.verify = False  # 忽略HTTPS证书验证
-        session.timeout = self.DEFAULT_TIMEOUT
-        return session
     
     def search(self, keyword: str, ext: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """搜索盘友圈资源并返回结构化结果
@@ -79,16 +117,14 @@ class PanyqSearch(BaseSearch):
         if ext is None:
             ext = {}
             
-        if self.DEBUG_LOG:
-            print(f"panyq: ext 参数内容: {ext}")
+        logger.debug("panyq: ext 参数内容: %s", ext)
             
         # 检查搜索结果缓存
-        cache_key = f"search:{keyword}"
-        with self.search_result_lock:
-            if cache_key in self.search_result_cache:
-                if self.DEBUG_LOG:
-                    print(f"panyq: 缓存命中搜索结果: {keyword}")
-                return self._format_results(self.search_result_cache[cache_key])
+        cache_key = f"search:{canonicalize(keyword)}"
+        cached = self.search_result_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("panyq: 缓存命中搜索结果: %s", keyword)
+            return self._format_results(cached)
         
         # 请求来源检查
         if self.ENABLE_REFERER_CHECK and ext:
@@ -96,59 +132,28 @@ class PanyqSearch(BaseSearch):
             allowed = any(referer.startswith(r) for r in self.ALLOWED_REFERERS)
             
             if not allowed:
-                if self.DEBUG_LOG:
-                    print(f"panyq: 拒绝来自 {referer} 的请求")
-                return {"list": [], "channelInfo": self._get_channel_info()}
+                logger.warning("panyq: 拒绝来自 %s 的请求", referer)
+                return self._format_results([])
         
         try:
             results = self._do_search(keyword, ext)
             
             # 缓存结果
-            with self.search_result_lock:
-                self.search_result_cache[cache_key] = results
+            self.search_result_cache.set(cache_key, results)
                 
             return self._format_results(results)
             
         except Exception as e:
-            print(f"panyq: 搜索失败: {str(e)}")
-            return {"list": [], "channelInfo": self._get_channel_info()}
-    
-    def _format_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """将结果格式化为yunso.py的格式"""
-        return {
-            "list": [{
-                "messageId": item.get("unique_id", ""),
-                "title": item.get("title", ""),
-                "pubDate": item.get("datetime", ""),
-                "content": item.get("content", ""),
-                "image": "",
-                "cloudLinks": [{
-                    "link": link["url"],
-                    "cloudType": link["type"]
-                } for link in item.get("links", [])],
-                "tags": [],
-                "magnetLink": "",
-                "channel": "盘友圈",
-                "channelId": "panyq"
-            } for item in results],
-            "channelInfo": self._get_channel_info(),
-            "id": "panyq",
-            "index": 1001
-        }
-    
-    def _get_channel_info(self) -> Dict[str, Any]:
-        """获取频道信息"""
-        return {
-            "id": "panyq",
-            "name": "盘友圈",
-            "index": 1001,
-            "channelLogo": ""
-        }
+            logger.error("panyq: 搜索失败: %s", e)
+            return self._format_results([])
     
-    def _do_search(self, keyword: str, ext: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _format_results(self, results: List[SearchResult]) -> Dict[str, Any]:
+        """包装为插件返回结构；结果在 _process_hit 中已是标准格式，缓存命中时直接复用"""
+        return result_block("panyq", "盘友圈", 1001, results)
+
+    def _do_search(self, keyword: str, ext: Dict[str, Any]) -> List[SearchResult]:
         """实际的搜索实现"""
-        if self.DEBUG_LOG:
-            print(f"panyq: searching for {keyword}")
+        logger.debug("panyq: searching for %s", keyword)
             
         # 获取Action IDs
         action_ids = self._get_or_discover_action_ids()
@@ -164,76 +169,85 @@ class PanyqSearch(BaseSearch):
             if not credentials:
                 raise Exception("获取搜索凭证失败")
                 
-        # 获取搜索结果
+        # 获取第一页搜索结果
         hits, max_page_num = self._get_search_results(credentials["sign"], 1)
         if not hits:
-            if self.DEBUG_LOG:
-                print(f"panyq: no results found for {keyword}")
+            logger.debug("panyq: no results found for %s", keyword)
             return []
-            
-        # 如果有多页结果，并发获取其他页的数据
-        if max_page_num > 1:
-            if self.DEBUG_LOG:
-                print(f"panyq: found {max_page_num} pages, fetching additional pages...")
-                
-            if max_page_num >= 3:
-                max_page_num = 3
-                
-            with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENCY) as executor:
-                futures = []
-                for page in range(2, max_page_num + 1):
-                    futures.append(executor.submit(self._get_search_results, credentials["sign"], page))
-                    
-                for future in as_completed(futures):
-                    try:
-                        page_hits, _ = future.result()
-                        hits.extend(page_hits)
-                    except Exception as e:
-                        print(f"panyq: 获取页面失败: {str(e)}")
-                        
-            if self.DEBUG_LOG:
-                print(f"panyq: total {len(hits)} results from all pages")
-                
-        # 并发处理每个搜索结果
+
+        # 逐页处理，过滤后结果达到目标数即停止，不再请求后续分页
+        max_page_num = min(max_page_num, self.MAX_PAGES)
         results = []
-        with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENCY) as executor:
-            futures = []
-            for i, hit in enumerate(hits):
-                futures.append(executor.submit(self._process_hit, hit, i, action_ids, credentials))
-                
-            for future in as_completed(futures):
+        offset = 0
+        page = 1
+        prefetcher = ThreadPoolExecutor(max_workers=1)
+        try:
+            while True:
+                # 处理当前页的同时预取下一页列表（列表请求开销小，结果足够时直接丢弃）
+                next_future = None
+                if page < max_page_num:
+                    next_future = http_client.submit(prefetcher, self._get_search_results, credentials["sign"], page + 1)
+
+                results.extend(self._filter_results_by_keyword(
+                    self._process_hits(hits, offset, action_ids, credentials), keyword))
+                offset += len(hits)
+                if len(results) >= self.RESULT_TARGET or next_future is None:
+                    break
+
+                logger.debug("panyq: %s results after %s pages, continue with page %s...", len(results), page, page + 1)
                 try:
-                    result = future.result()
-                    if result:
-                        results.append(result)
+                    hits, _ = next_future.result()
                 except Exception as e:
-                    print(f"panyq: 处理结果失败: {str(e)}")
-                    
-        # 使用关键词过滤结果
-        filtered_results = self._filter_results_by_keyword(results, keyword)
-        
-        if self.DEBUG_LOG:
-            print(f"panyq: returning {len(filtered_results)} filtered results")
-            
-        return filtered_results
-    
-    def _process_hit(self, hit: Dict[str, Any], index: int, action_ids: Dict[str, str], credentials: Dict[str, str]) -> Optional[Dict[str, Any]]:
+                    logger.error("panyq: 获取页面失败: %s", e)
+                    break
+                page += 1
+                if not hits:
+                    break
+        finally:
+            prefetcher.shutdown(wait=False, cancel_futures=True)
+
+        logger.debug("panyq: returning %s filtered results from %s pages", len(results), page)
+
+        return results
+
+    def _process_hits(self, hits: List[Dict[str, Any]], offset: int, action_ids: Dict[str, str], credentials: Dict[str, str]) -> List[SearchResult]:
+        """并发处理一页搜索结果，offset 为该页第一条结果的全局序号"""
+        results = []
+        futures = [
+            http_client.submit(self._resolver, self._process_hit, hit, offset + i, action_ids, credentials)
+            for i, hit in enumerate(hits)
+        ]
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+                if result:
+                    results.append(result)
+            except Exception as e:
+                logger.warning("panyq: 处理结果失败: %s", e)
+        return results
+
+    def _process_hit(self, hit: Dict[str, Any], index: int, action_ids: Dict[str, str], credentials: Dict[str, str]) -> Optional[SearchResult]:
         """处理单个搜索结果"""
-        # 执行中间状态确认
-        if not self._perform_intermediate_step(
-            action_ids[self.ACTION_ID_KEYS[1]],
-            credentials["hash"],
-            credentials["sha"],
-            hit["eid"]
-        ):
-            print(f"panyq: intermediate step failed for {hit['eid']}")
-            return None
-            
-        # 获取最终链接
-        final_link = self._get_final_link(
-            action_ids[self.ACTION_ID_KEYS[2]],
-            hit["eid"]
-        )
+        eid = hit["eid"]
+        final_action_id = action_ids[self.ACTION_ID_KEYS[2]]
+        # 最终链接已缓存时无需再确认中间状态
+        final_link = self.final_link_cache.get(f"link:{final_action_id}:{eid}")
+        if not final_link:
+            # 执行中间状态确认，同一凭证下按 eid 缓存
+            intermediate_key = (action_ids[self.ACTION_ID_KEYS[1]], credentials["hash"], eid)
+            if intermediate_key not in self.intermediate_cache:
+                if not self._perform_intermediate_step(
+                    action_ids[self.ACTION_ID_KEYS[1]],
+                    credentials["hash"],
+                    credentials["sha"],
+                    eid
+                ):
+                    logger.warning("panyq: intermediate step failed for %s", eid)
+                    return None
+                self.intermediate_cache.set(intermediate_key, True)
+                
+            # 获取最终链接
+            final_link = self._get_final_link(final_action_id, eid)
         
         if not final_link:
             return None
@@ -242,23 +256,20 @@ class PanyqSearch(BaseSearch):
         link_type = self._determine_link_type(final_link)
         
         # 创建结果
-        return {
-            "unique_id": f"panyq-{index}",
-            "title": self._extract_title(hit["desc"]),
-            "content": self._clean_escaped_html(hit["desc"]),
-            "links": [{
-                "url": final_link,
-                "type": link_type,
-                "password": self._extract_password(final_link, link_type)
-            }],
-            "datetime": ""
-        }
+        return SearchResult(
+            messageId=f"panyq-{index}",
+            title=self._extract_title(hit["desc"]),
+            content=self._clean_escaped_html(hit["desc"]),
+            cloudLinks=[CloudLink(final_link, link_type, self._extract_password(final_link, link_type))],
+            channel="盘友圈",
+            channelId="panyq",
+        )
     
     def _get_or_discover_action_ids(self) -> Dict[str, str]:
         """获取或发现Action ID"""
-        with self.action_id_lock:
-            if len(self.action_id_cache) >= len(self.ACTION_ID_KEYS):
-                return self.action_id_cache.copy()
+        action_ids = self.action_id_cache.get("action_ids")
+        if action_ids and len(action_ids) >= len(self.ACTION_ID_KEYS):
+            return dict(action_ids)
                 
         return self._discover_action_ids()
     
@@ -267,10 +278,8 @@ class PanyqSearch(BaseSearch):
         # 尝试从缓存文件加载
         final_ids = self._load_action_ids_from_file()
         if final_ids and len(final_ids) == len(self.ACTION_ID_KEYS):
-            if self.DEBUG_LOG:
-                print("panyq: loaded Action IDs from file cache")
-            with self.action_id_lock:
-                self.action_id_cache.update(final_ids)
+            logger.debug("panyq: loaded Action IDs from file cache")
+            self.action_id_cache.set("action_ids", dict(final_ids))
             return final_ids
             
         # 从网站获取潜在的Action ID
@@ -278,16 +287,14 @@ class PanyqSearch(BaseSearch):
         if not potential_ids:
             raise Exception("未找到潜在的Action ID")
             
-        if self.DEBUG_LOG:
-            print(f"panyq: 找到 {len(potential_ids)} 个潜在的 Action ID")
-            if potential_ids:
-                print(f"panyq: 样例ID: {potential_ids[0]}")
+        logger.debug("panyq: 找到 %s 个潜在的 Action ID", len(potential_ids))
+        if potential_ids:
+            logger.debug("panyq: 样例ID: %s", potential_ids[0])
                 
         final_ids = {}
         
         # 1. 验证credential_action_id
-        if self.DEBUG_LOG:
-            print("panyq: validating credential_action_id...")
+        logger.debug("panyq: validating credential_action_id...")
             
         credential_id = None
         for id in potential_ids:
@@ -305,15 +312,13 @@ class PanyqSearch(BaseSearch):
         if not test_creds:
             raise Exception("获取测试凭证失败")
             
-        if self.DEBUG_LOG:
-            print(f"panyq: 获取到测试凭证: sign={test_creds['sign'][:10]}..., hash={test_creds['hash'][:10]}..., sha={test_creds['sha'][:10]}...")
+        logger.debug("panyq: 获取到测试凭证: sign=%s..., hash=%s..., sha=%s...", test_creds['sign'][:10], test_creds['hash'][:10], test_creds['sha'][:10])
             
         # 从剩余ID中排除已使用的ID
         remaining_ids = [id for id in potential_ids if id != credential_id]
         
         # 2. 验证intermediate_action_id
-        if self.DEBUG_LOG:
-            print(f"panyq: validating intermediate_action_id ({len(remaining_ids)} candidates)...")
+        logger.debug("panyq: validating intermediate_action_id (%s candidates)...", len(remaining_ids))
             
         intermediate_id = None
         for id in reversed(remaining_ids):
@@ -333,15 +338,13 @@ class PanyqSearch(BaseSearch):
             
         test_eid = test_hits[0]["eid"]
         
-        if self.DEBUG_LOG:
-            print(f"panyq: 获取到测试EID: {test_eid}")
+        logger.debug("panyq: 获取到测试EID: %s", test_eid)
             
         # 从剩余ID中排除已使用的ID
         remaining_ids = [id for id in remaining_ids if id != intermediate_id]
         
         # 3. 验证final_link_action_id
-        if self.DEBUG_LOG:
-            print(f"panyq: validating final_link_action_id ({len(remaining_ids)} candidates)...")
+        logger.debug("panyq: validating final_link_action_id (%s candidates)...", len(remaining_ids))
             
         final_link_id = None
         for id in remaining_ids:
@@ -349,7 +352,7 @@ class PanyqSearch(BaseSearch):
             try:
                 self._perform_intermediate_step(intermediate_id, test_creds["hash"], test_creds["sha"], test_eid)
             except Exception as e:
-                print(f"panyq: 中间步骤执行失败, 继续尝试下一个ID: {str(e)}")
+                logger.warning("panyq: 中间步骤执行失败, 继续尝试下一个ID: %s", e)
                 continue
                 
             if self._validate_final_link_id(id, test_eid):
@@ -358,8 +361,7 @@ class PanyqSearch(BaseSearch):
                 
         if not final_link_id and len(remaining_ids) == 1 and len(potential_ids) == 3:
             # 尝试交换intermediate_action_id和final_link_action_id
-            if self.DEBUG_LOG:
-                print("panyq: final_link_action_id验证失败，尝试交换intermediate_action_id和final_link_action_id...")
+            logger.warning("panyq: final_link_action_id验证失败，尝试交换intermediate_action_id和final_link_action_id...")
                 
             old_inter_id = final_ids[self.ACTION_ID_KEYS[1]]
             final_ids[self.ACTION_ID_KEYS[1]] = remaining_ids[0]
@@ -369,11 +371,9 @@ class PanyqSearch(BaseSearch):
                 self._perform_intermediate_step(final_ids[self.ACTION_ID_KEYS[1]], test_creds["hash"], test_creds["sha"], test_eid)
                 if self._validate_final_link_id(final_ids[self.ACTION_ID_KEYS[2]], test_eid):
                     final_link_id = final_ids[self.ACTION_ID_KEYS[2]]
-                    if self.DEBUG_LOG:
-                        print("panyq: 交换ID后验证成功!")
+                    logger.debug("panyq: 交换ID后验证成功!")
             except Exception as e:
-                if self.DEBUG_LOG:
-                    print(f"panyq: 交换后中间步骤执行失败: {str(e)}")
+                logger.warning("panyq: 交换后中间步骤执行失败: %s", e)
                     
         if not final_link_id:
             raise Exception("未能验证final_link_action_id")
@@ -381,19 +381,17 @@ class PanyqSearch(BaseSearch):
         final_ids[self.ACTION_ID_KEYS[2]] = final_link_id
         
         # 保存到内存缓存
-        with self.action_id_lock:
-            self.action_id_cache.update(final_ids)
+        self.action_id_cache.set("action_ids", dict(final_ids))
             
         # 保存到文件缓存
         try:
             self._save_action_ids_to_file(final_ids)
         except Exception as e:
-            print(f"panyq: 保存Action IDs到文件失败: {str(e)}")
+            logger.error("panyq: 保存Action IDs到文件失败: %s", e)
             
-        if self.DEBUG_LOG:
-            print("panyq: all Action IDs validated successfully:")
-            for key in self.ACTION_ID_KEYS:
-                print(f"panyq:   {key} = {final_ids[key]}")
+        logger.debug("panyq: all Action IDs validated successfully:")
+        for key in self.ACTION_ID_KEYS:
+            logger.debug("panyq:   %s = %s", key, final_ids[key])
                 
         return final_ids
     
@@ -431,11 +429,10 @@ class PanyqSearch(BaseSearch):
                 id_matches = id_regex.findall(js_resp.text)
                 id_set.update(id_matches)
             except Exception as e:
-                print(str(e))
+                logger.warning("panyq: 获取JS文件失败: %s", e)
                 continue
                 
-        if self.DEBUG_LOG:
-            print(f"panyq: found {len(id_set)} potential Action IDs")
+        logger.debug("panyq: found %s potential Action IDs", len(id_set))
         return list(id_set)
     
     def _validate_credential_id(self, action_id: str) -> bool:
@@ -467,35 +464,23 @@ class PanyqSearch(BaseSearch):
         except Exception:
             return False
     
-    def _do_request_with_retry(self, method: str, url: str, **kwargs) -> requests.Response:
-        """发送HTTP请求并支持重试"""
+    def _do_request_with_retry(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """发送HTTP请求，按共享重试策略重试，不超出本次搜索的剩余时间"""
         max_retries = kwargs.pop('max_retries', self.MAX_RETRIES)
-        
-        for attempt in range(max_retries + 1):
-            if attempt > 0:
-                backoff = min(2 ** (attempt - 1) * 0.5, 5)  # 指数退避，最大5秒
-                time.sleep(backoff)
-                if self.DEBUG_LOG:
-                    print(f"panyq: 重试请求 #{attempt}，等待 {backoff}秒")
-                    
-            try:
-                resp = self.client.request(method, url, **kwargs)
-                return resp
-            except (requests.exceptions.RequestException, requests.exceptions.Timeout) as e:
-                if attempt == max_retries:
-                    raise
-                continue
-                
-        raise Exception(f"请求失败，重试{max_retries}次后仍然失败")
+        # server action 请求体为纯文本
+        if isinstance(kwargs.get('data'), str):
+            kwargs['content'] = kwargs.pop('data')
+        policy = self.RETRY_POLICY if max_retries == self.MAX_RETRIES else RetryPolicy(
+            max_attempts=max_retries + 1, timeout=self.DEFAULT_TIMEOUT, backoff=0.5, max_backoff=5)
+        return request_with_retry(method, url, session=self.client, policy=policy, **kwargs)
     
     def _get_raw_final_link_response(self, action_id: str, eid: str) -> str:
         """获取最终链接的原始响应文本"""
         cache_key = f"{action_id}:{eid}"
-        with self.final_link_lock:
-            if cache_key in self.final_link_cache:
-                if self.DEBUG_LOG:
-                    print(f"panyq: 缓存命中 raw final link: {eid}")
-                return self.final_link_cache[cache_key]
+        cached = self.final_link_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("panyq: 缓存命中 raw final link: %s", eid)
+            return cached
                 
         # 构建URL
         final_url = f"{self.BASE_URL}/go/{eid}"
@@ -517,13 +502,11 @@ class PanyqSearch(BaseSearch):
             response_text = resp.text
             
             # 保存到缓存
-            with self.final_link_lock:
-                self.final_link_cache[cache_key] = response_text
+            self.final_link_cache.set(cache_key, response_text)
                 
             return response_text
         except Exception as e:
-            if self.DEBUG_LOG:
-                print(f"panyq: network error: {str(e)}")
+            logger.debug("panyq: network error: %s", e)
             raise
     
     def _get_credentials(self, query: str, action_id: str) -> Optional[Dict[str, str]]:
@@ -555,8 +538,7 @@ class PanyqSearch(BaseSearch):
                 "hash": hash_match.group(1)
             }
         except Exception as e:
-            if self.DEBUG_LOG:
-                print(f"panyq: 获取凭证失败: {str(e)}")
+            logger.debug("panyq: 获取凭证失败: %s", e)
             raise
     
     def _get_search_results(self, sign: str, page_num: int) -> tuple[List[Dict[str, Any]], int]:
@@ -570,21 +552,20 @@ class PanyqSearch(BaseSearch):
         }
         
         # 从缓存中获取credential_action_id并添加到请求头
-        with self.action_id_lock:
-            if self.ACTION_ID_KEYS[0] in self.action_id_cache:
-                headers["next-action"] = self.action_id_cache[self.ACTION_ID_KEYS[0]]
+        action_ids = self.action_id_cache.get("action_ids") or {}
+        if self.ACTION_ID_KEYS[0] in action_ids:
+            headers["next-action"] = action_ids[self.ACTION_ID_KEYS[0]]
         
         try:
             resp = self._do_request_with_retry("GET", search_url, headers=headers)
-            data = resp.json()
+            data = self.parse_json(resp)
             
             hits = data.get("data", {}).get("hits", [])
             max_page_num = data.get("data", {}).get("maxPageNum", 1)
             
             return hits, max_page_num
         except Exception as e:
-            if self.DEBUG_LOG:
-                print(f"panyq: 获取搜索结果失败: {str(e)}")
+            logger.debug("panyq: 获取搜索结果失败: %s", e)
             raise
     
     def _perform_intermediate_step(self, action_id: str, hash_val: str, sha_val: str, eid: str) -> bool:
@@ -606,18 +587,16 @@ class PanyqSearch(BaseSearch):
             resp = self._do_request_with_retry("POST", intermediate_url, data=payload, headers=headers)
             return resp.status_code == 200
         except Exception as e:
-            if self.DEBUG_LOG:
-                print(f"panyq: 中间步骤执行失败: {str(e)}")
+            logger.warning("panyq: 中间步骤执行失败: %s", e)
             return False
     
     def _get_final_link(self, action_id: str, eid: str) -> Optional[str]:
         """获取最终链接"""
         cache_key = f"link:{action_id}:{eid}"
-        with self.final_link_lock:
-            if cache_key in self.final_link_cache:
-                if self.DEBUG_LOG:
-                    print(f"panyq: 缓存命中最终链接: {eid}")
-                return self.final_link_cache[cache_key]
+        cached = self.final_link_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("panyq: 缓存命中最终链接: %s", eid)
+            return cached
                 
         # 获取原始响应
         try:
@@ -632,11 +611,11 @@ class PanyqSearch(BaseSearch):
         if lines:
             last_line = lines[-1]
             try:
-                link_data = json.loads(last_line)
+                link_data = json_backend.loads(last_line)
                 if isinstance(link_data, list) and len(link_data) > 1:
                     if isinstance(link_data[1], dict):
                         final_link = link_data[1].get("url")
-            except json.JSONDecodeError:
+            except ValueError:
                 pass
                 
         # 如果JSON解析失败，尝试使用正则表达式
@@ -646,13 +625,11 @@ class PanyqSearch(BaseSearch):
                 final_link = url_match.group(0)
                 
         if not final_link:
-            if self.DEBUG_LOG:
-                print("panyq: 提取链接失败")
+            logger.warning("panyq: 提取链接失败")
             return None
             
         # 保存链接到缓存
-        with self.final_link_lock:
-            self.final_link_cache[cache_key] = final_link
+        self.final_link_cache.set(cache_key, final_link)
             
         return final_link
     
@@ -771,29 +748,21 @@ class PanyqSearch(BaseSearch):
             
         return clean_desc.strip()
     
-    def _filter_results_by_keyword(self, results: List[Dict[str, Any]], keyword: str) -> List[Dict[str, Any]]:
-        """使用关键词过滤结果"""
-        # 这里实现与Go代码相同的过滤逻辑
-        return results
+    def _filter_results_by_keyword(self, results: List[SearchResult], keyword: str) -> List[SearchResult]:
+        """按关键词过滤结果：标题或内容需包含关键词的每个词（与 Go 版一致，比较前统一规范化）"""
+        return [result for result in results if matches(keyword, f"{result.title} {result.content}")]
     
     def _start_cache_cleaner(self):
-        """启动缓存清理器"""
+        """启动缓存清理器，只清理已过期的条目，不整体清空"""
         import threading
         
         def cleaner():
             while True:
-                time.sleep(1800)  # 30分钟
-                if self.DEBUG_LOG:
-                    print("panyq: 开始清理缓存")
-                    
-                with self.final_link_lock:
-                    self.final_link_cache = {}
-                    
-                with self.search_result_lock:
-                    self.search_result_cache = {}
-                    
-                if self.DEBUG_LOG:
-                    print("panyq: 缓存清理完成")
+                time.sleep(self.CACHE_PURGE_INTERVAL)
+                purged = self.final_link_cache.purge_expired() + self.search_result_cache.purge_expired()
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("panyq: 清理过期缓存 %s 条, final_link=%s, search_result=%s",
+                                 purged, self.final_link_cache.stats(), self.search_result_cache.stats())
                     
         thread = threading.Thread(target=cleaner, daemon=True)
         thread.start()
@@ -815,8 +784,7 @@ class PanyqSearch(BaseSearch):
                     
             return ids
         except Exception as e:
-            if self.DEBUG_LOG:
-                print(f"panyq: 加载Action IDs失败: {str(e)}")
+            logger.warning("panyq: 加载Action IDs失败: %s", e)
             return {}
     
     def _save_action_ids_to_file(self, ids: Dict[str, str]):
@@ -1,11 +1,18 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from .. import http_client
+from .. import json_backend
+from ..query import canonicalize
+import concurrent.futures
 import requests
 import threading
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 import json
 import re
 import urllib.parse
+import logging
+
+logger = logging.getLogger(__name__)
 
 class PlanorgSearch(BaseSearch):
     """
@@ -33,26 +40,29 @@ class PlanorgSearch(BaseSearch):
         t.start()
 
     def search(self, keyword: str) -> Dict[str, Any]:
-        cache_key = keyword.strip()
+        cache_key = canonicalize(keyword)
         now = time.time()
         with self._cache_lock:
             cached = self._cache.get(cache_key)
             if cached and now - cached["timestamp"] < self.CACHE_TTL:
                 return self._format_results(cached["results"], keyword)
         try:
-            items = self._search_api(keyword)
-            results = self._convert_results(items)
-            with self._cache_lock:
-                self._cache[cache_key] = {
-                    "results": results,
-                    "timestamp": time.time()
-                }
+            # 边读事件流边解析真链，解析与事件流传输重叠
+            results, complete = self._convert_results(self._iter_search_api(keyword))
+            # 事件流中途出错时只返回已收到的部分结果，不缓存，避免之后相同查询一直拿到截断的结果
+            if complete:
+                with self._cache_lock:
+                    self._cache[cache_key] = {
+                        "results": results,
+                        "timestamp": time.time()
+                    }
             return self._format_results(results, keyword)
         except Exception as e:
-            print(f"planorg API error: {str(e)}")
+            logger.error("planorg API error: %s", e)
             return self._format_results([], keyword)
 
-    def _search_api(self, keyword: str) -> List[Dict[str, Any]]:
+    def _iter_search_api(self, keyword: str) -> Iterator[Dict[str, Any]]:
+        """逐条产出 SSE 事件，不等待 [DONE]"""
         params = {
             "title": keyword,
             "is_type": 0
@@ -77,103 +87,64 @@ class PlanorgSearch(BaseSearch):
             "__51vuft__23kqyqxydKgZPU3F": "1754294369330",
             "__vtins__23kqyqxydKgZPU3F": '{"sid": "b892af21-d2d2-5f7d-9b85-1dd452e1e616", "vd": 11, "stt": 873065, "dr": 10863, "expires": 1754297042393, "ct": 1754295242393}'
         }
-        items = []
-        resp = requests.get(self.API_URL, headers=headers, params=params, cookies=cookies, stream=True, timeout=15)
-        resp.raise_for_status()
-        for line in resp.iter_lines(decode_unicode=True):
-            if not line or not line.startswith("data: "):
-                continue
-            data_str = line[6:].strip()
-            if data_str == "[DONE]":
-                break
-            try:
-                obj = json.loads(data_str)
-                items.append(obj)
-            except Exception as e:
-                print(f"planorg SSE parse error: {str(e)} line={data_str}")
-                continue
-        return items
-
-    def _convert_results(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        # 1. 收集所有 (url, title, stoken)
-        tasks = []
-        for idx, item in enumerate(items):
-            url = item.get("url", "")
-            if not url:
-                continue
-            url = url.replace("\\/", "/")
-            title = self._clean_html(item.get("title", ""))
-            stoken = item.get("stoken", "")
-            tasks.append({
-                "idx": idx,
-                "url": url,
-                "title": title,
-                "stoken": stoken,
-                "is_type": item.get("is_type", 0)
-            })
+        with requests.get(self.API_URL, headers=headers, params=params, cookies=cookies, stream=True, timeout=15) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue
+                data_str = line[6:].strip()
+                if data_str == "[DONE]":
+                    break
+                try:
+                    obj = json_backend.loads(data_str)
+                except Exception as e:
+                    logger.warning("planorg SSE parse error: %s line=%s", e, data_str)
+                    continue
+                yield obj
 
-        # 2. 用线程池批量请求 save_url
+    def _convert_results(self, items: Iterable[Dict[str, Any]]) -> Tuple[List[SearchResult], bool]:
+        """边读事件流边解析真链，返回 (结果, 事件流是否完整结束)"""
+        # 1. 同一资源url的真链跨关键词缓存
         def fetch_real_link(task):
-            save_headers = {
-                "accept": "application/json, text/plain, */*",
-                "accept-language": "zh-CN,zh;q=0.9,en;q=0.8,zh-TW;q=0.7",
-                "content-type": "application/json;charset=UTF-8",
-                "origin": "https://v.planorg.cn",
-                "priority": "u=1, i",
-                "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
-                "sec-ch-ua-mobile": "?0",
-                "sec-ch-ua-platform": '"macOS"',
-                "sec-fetch-dest": "empty",
-                "sec-fetch-mode": "cors",
-                "sec-fetch-site": "same-origin",
-                "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
-            }
-            save_cookies = {
-                "PHPSESSID": "a0476b5169c42ba8f655a1a1d75eb5da",
-                "__51uvsct__23kqyqxydKgZPU3F": "1",
-                "__51vcke__23kqyqxydKgZPU3F": "d01d6191-1da7-5b83-9564-1debde0619dd",
-                "__51vuft__23kqyqxydKgZPU3F": "1754294369330",
-                "__vtins__23kqyqxydKgZPU3F": '{"sid": "b892af21-d2d2-5f7d-9b85-1dd452e1e616", "vd": 12, "stt": 1078845, "dr": 205780, "expires": 1754297248173, "ct": 1754295448173}'
-            }
-            # url 需 urlencode
-            post_data = {
-                "url": urllib.parse.quote(task["url"], safe=""),
-                "title": task["title"]
+            real_url = self._fetch_detail_cached(
+                task["url"], lambda url: self._save_url(url, task["title"]))
+            return {
+                "idx": task["idx"],
+                "real_url": real_url or "",
+                "title": task["title"],
+                "is_type": task["is_type"]
             }
+
+        # 2. 每收到一条 (url, title) 立即提交线程池请求 save_url
+        futures = []
+        complete = True
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
             try:
-                resp = requests.post(
-                    self.SAVE_URL,
-                    headers=save_headers,
-                    cookies=save_cookies,
-                    data=json.dumps(post_data),
-                    timeout=10
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                # 兼容不同返回结构
-                real_url = data.get("data", {}).get("final_url") or data.get("data", {}).get("url") or ""
-                if not real_url:
-                    # 兜底
-                    real_url = data.get("data", "") if isinstance(data.get("data", ""), str) else ""
-                return {
-                    "idx": task["idx"],
-                    "real_url": real_url,
-                    "stoken": task["stoken"],
-                    "title": task["title"],
-                    "is_type": task["is_type"]
-                }
+                for idx, item in enumerate(items):
+                    url = item.get("url", "")
+                    if not url:
+                        continue
+                    url = url.replace("\\/", "/")
+                    title = self._clean_html(item.get("title", ""))
+                    futures.append(http_client.submit(executor, fetch_real_link, {
+                        "idx": idx,
+                        "url": url,
+                        "title": title,
+                        "is_type": item.get("is_type", 0)
+                    }))
             except Exception as e:
-                print(f"save_url error: {str(e)} for url={task['url']}")
-                return {
-                    "idx": task["idx"],
-                    "real_url": "",
-                    "stoken": task["stoken"],
-                    "title": task["title"],
-                    "is_type": task["is_type"]
-                }
+                # 事件流中断时保留已收到条目的解析结果
+                if not futures:
+                    raise
+                complete = False
+                logger.error("planorg SSE stream error: %s", e)
 
-        # 用线程池并发
-        real_links = self._batch_fetch_details(tasks, fetch_real_link, max_workers=8)
+        real_links = []
+        for future in futures:
+            try:
+                real_links.append(future.result())
+            except Exception as e:
+                logger.warning("planorg fetch_real_link error: %s", e)
 
         # 3. 组装最终结果
         results = []
@@ -182,42 +153,64 @@ class PlanorgSearch(BaseSearch):
             if not real_url:
                 continue
             link_type = self.detect_cloud_type(real_url)
-            result = {
-                "messageId": f"planorg-{item['idx']}",
-                "title": item["title"],
-                "pubDate": "",
-                "content": item["title"],
-                "image": "",
-                "cloudLinks": [{
-                    "link": real_url,
-                    "cloudType": link_type,
-                    "stoken": item.get("stoken", "")
-                }],
-                "tags": [],
-                "magnetLink": "",
-                "channel": "planorg",
-                "channelId": "planorg"
-            }
-            results.append(result)
-        return results
+            # 事件中的 stoken 只用于 planorg 自身的中转链接，save_url 换出真链后不再需要，不进入输出
+            results.append(SearchResult(
+                messageId=f"planorg-{item['idx']}",
+                title=item["title"],
+                content=item["title"],
+                cloudLinks=[CloudLink(real_url, link_type)],
+                channel="planorg",
+                channelId="planorg"
+            ))
+        return results, complete
 
-    def _batch_fetch_details(self, tasks, func, max_workers=8):
-        """
-        通用线程池批量处理工具，仿照 quarkso/roubuyaoqian
-        """
-        import concurrent.futures
-        results = [None] * len(tasks)
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_idx = {executor.submit(func, task): i for i, task in enumerate(tasks)}
-            for future in concurrent.futures.as_completed(future_to_idx):
-                idx = future_to_idx[future]
-                try:
-                    result = future.result()
-                    results[idx] = result
-                except Exception as e:
-                    print(f"batch_fetch_details error: {str(e)}")
-        # 过滤 None
-        return [r for r in results if r]
+    def _save_url(self, url: str, title: str) -> str:
+        """POST save_url 获取真实网盘链接，没有链接时返回空字符串，请求失败时抛出异常（不写入详情缓存）"""
+        save_headers = {
+            "accept": "application/json, text/plain, */*",
+            "accept-language": "zh-CN,zh;q=0.9,en;q=0.8,zh-TW;q=0.7",
+            "content-type": "application/json;charset=UTF-8",
+            "origin": "https://v.planorg.cn",
+            "priority": "u=1, i",
+            "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
+            "sec-ch-ua-mobile": "?0",
+            "sec-ch-ua-platform": '"macOS"',
+            "sec-fetch-dest": "empty",
+            "sec-fetch-mode": "cors",
+            "sec-fetch-site": "same-origin",
+            "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
+        }
+        save_cookies = {
+            "PHPSESSID": "a0476b5169c42ba8f655a1a1d75eb5da",
+            "__51uvsct__23kqyqxydKgZPU3F": "1",
+            "__51vcke__23kqyqxydKgZPU3F": "d01d6191-1da7-5b83-9564-1debde0619dd",
+            "__51vuft__23kqyqxydKgZPU3F": "1754294369330",
+            "__vtins__23kqyqxydKgZPU3F": '{"sid": "b892af21-d2d2-5f7d-9b85-1dd452e1e616", "vd": 12, "stt": 1078845, "dr": 205780, "expires": 1754297248173, "ct": 1754295448173}'
+        }
+        # url 需 urlencode
+        post_data = {
+            "url": urllib.parse.quote(url, safe=""),
+            "title": title
+        }
+        try:
+            resp = requests.post(
+                self.SAVE_URL,
+                headers=save_headers,
+                cookies=save_cookies,
+                data=json.dumps(post_data),
+                timeout=10
+            )
+            resp.raise_for_status()
+            data = self.parse_json(resp)
+            # 兼容不同返回结构
+            real_url = data.get("data", {}).get("final_url") or data.get("data", {}).get("url") or ""
+            if not real_url:
+                # 兜底
+                real_url = data.get("data", "") if isinstance(data.get("data", ""), str) else ""
+            return real_url
+        except Exception as e:
+            logger.warning("save_url error: %s for url=%s", e, url)
+            raise
 
     def _clean_html(self, html: str) -> str:
         tags = [
@@ -230,17 +223,5 @@ class PlanorgSearch(BaseSearch):
         result = re.sub(r'<[^>]+>', '', result)
         return result.strip()
 
-    def _format_results(self, results: List[Dict[str, Any]], keyword: str) -> Dict[str, Any]:
-        return {
-            "list": results,
-            "channelInfo": {
-                "id": "planorg",
-                "name": "planorg",
-                "index": 1030,
-                "channelLogo": ""
-            },
-            "id": "planorg",
-            "index": 1030,
-            "total": len(results),
-            "keyword": keyword
-        }
\ No newline at end of file
+    def _format_results(self, results: List[SearchResult], keyword: str) -> Dict[str, Any]:
+        return result_block("planorg", "planorg", 1030, results, total=len(results), keyword=keyword)
\ No newline at end of file
@@ -1,15 +1,33 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..nuxt import NuxtPayload, compile_json_chain, match_key_contains
 import requests
 from bs4 import BeautifulSoup
 from typing import Dict, Any, List
+from pathlib import Path
+import os
 import re
 import json
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
 
 class QuarksoSearch(BaseSearch):
     """
     quark.so 网页搜索实现，解析主列表页 HTML，提取 image, tags, link, title, content, pubDate
     并自动跟进详情页面包屑最后的真实 doc_id 链接，提取 NUXT_DATA JSON，并支持 cookie_id、url 路径索引解析
     """
+    SHARE_LINK_FILE_NAME = "quarkso_share_links.json"  # doc_id -> final_share_url 持久化文件
+    SHARE_LINK_TTL = 7 * 24 * 3600
+    SHARE_LINK_MAXSIZE = 20000
+
+    # 跨实例共享：doc_id -> (final_share_url, 过期时间)，详情页链接 -> (doc_id, 过期时间)
+    _share_links: Dict[str, tuple] = {}
+    _doc_ids: Dict[str, tuple] = {}
+    _share_link_lock = threading.Lock()
+    _share_links_loaded = False
+    _share_links_dirty = False
 
     def __init__(self):
         self.base_url = "https://www.quark.so/s"
@@ -30,6 +48,7 @@ class QuarksoSearch(BaseSearch):
             'upgrade-insecure-requests': '1',
             'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36'
         }
+        self._load_share_links()
 
     def search(self, keyword: str) -> Dict[str, Any]:
         """
@@ -90,46 +109,151 @@ class QuarksoSearch(BaseSearch):
                             'a', class_='res_tags-tag_item')
                         tags = [self._clean_html(tag.text)
                                 for tag in tag_links]
-                    # 跟进详情页，获取真实 doc_id 链接和 NUXT_DATA
-                    doc_id, nuxt_json = self._get_real_detail_link_and_nuxtdata(
-                        fake_link)
-                    # 解析 cookie_id 和真实资源 url
-                    cookie_id = self._resolve_cookie_id_chain(nuxt_json)
-                    url = self._resolve_resource_url(nuxt_json)
-                    ret = self.save_quarkso_resource(url, cookie_id, doc_id)
-                    if isinstance(ret, dict) and 'data' in ret and 'final_share_url' in ret['data']:
-                        real_link = ret['data']['final_share_url']
-                    else:
-                        real_link = ""
+                    # 跟进详情页解析真实分享链接，结果按详情页链接缓存
+                    resolved = self._fetch_detail_cached(
+                        fake_link, self._resolve_share_link)
+                    doc_id, real_link = resolved if resolved else ("", "")
                     # 返回与 yunso.py 一致的结构
-                    return {
-                        "messageId": str(doc_id) if doc_id else "",
-                        "title": title,
-                        "pubDate": pub_date,
-                        "content": content,
-                        "image": image,
-                        "cloudLinks": [{
-                            "link": real_link,
-                            "cloudType": self.detect_cloud_type(real_link)
-                        }],
-                        "tags": tags,
-                        "magnetLink": "",
-                        "channel": "夸克搜",
-                        "channelId": "quarkso"
-                    }
+                    return SearchResult(
+                        messageId=str(doc_id) if doc_id else "",
+                        title=title,
+                        pubDate=pub_date,
+                        content=content,
+                        image=image,
+                        cloudLinks=[CloudLink(real_link, self.detect_cloud_type(real_link))],
+                        tags=tags,
+                        channel="夸克搜",
+                        channelId="quarkso"
+                    )
                 except Exception as e:
-                    print(f"解析条目失败: {str(e)}")
+                    logger.warning("解析条目失败: %s", e)
                     return None
 
             # 用父类多线程工具并发处理详情页
             results = self._batch_fetch_details(items, fetch_func, max_workers=8)
+            self._flush_share_links()
             # 过滤掉None
             results = [r for r in results if r]
             return self._format_results(results, keyword)
         except Exception as e:
-            print(f"quarkso搜索失败: {str(e)}")
+            logger.error("quarkso搜索失败: %s", e)
             return self._format_results([], keyword)
 
+    def _resolve_share_link(self, fake_link: str):
+        """
+        跟进详情页，获取真实 doc_id 和 NUXT_DATA，解析 cookie_id、资源 url 后保存并返回 (doc_id, final_share_url)
+        已保存过的 doc_id 直接返回持久化的分享链接，不再请求详情页和保存接口
+        解析失败返回 None
+        """
+        doc_id = self._lookup_doc_id(fake_link)
+        share_url = self._lookup_share_link(doc_id)
+        if share_url:
+            return doc_id, share_url
+
+        doc_id, nuxt_json = self._get_real_detail_link_and_nuxtdata(fake_link)
+        if doc_id:
+            share_url = self._lookup_share_link(doc_id)
+            if share_url:
+                self._store_share_link(fake_link, doc_id, share_url)
+                return doc_id, share_url
+        if nuxt_json is None:
+            return None
+        # 解析 cookie_id 和真实资源 url
+        cookie_id = self._resolve_cookie_id_chain(nuxt_json)
+        url = self._resolve_resource_url(nuxt_json)
+        ret = self.save_quarkso_resource(url, cookie_id, doc_id)
+        if isinstance(ret, dict) and 'data' in ret and 'final_share_url' in ret['data']:
+            share_url = ret['data']['final_share_url']
+            if doc_id and share_url:
+                self._store_share_link(fake_link, doc_id, share_url)
+            return doc_id, share_url
+        return None
+
+    def _lookup_doc_id(self, fake_link: str) -> str:
+        entry = QuarksoSearch._doc_ids.get(fake_link)
+        if entry and entry[1] > time.time():
+            return entry[0]
+        return ""
+
+    def _lookup_share_link(self, doc_id: str) -> str:
+        if not doc_id:
+            return ""
+        entry = QuarksoSearch._share_links.get(doc_id)
+        if entry and entry[1] > time.time():
+            return entry[0]
+        return ""
+
+    def _store_share_link(self, fake_link: str, doc_id: str, share_url: str):
+        cls = QuarksoSearch
+        expire_at = time.time() + self.SHARE_LINK_TTL
+        with cls._share_link_lock:
+            cls._share_links[doc_id] = (share_url, expire_at)
+            if fake_link:
+                cls._doc_ids[fake_link] = (doc_id, expire_at)
+            cls._share_links_dirty = True
+
+    def _flush_share_links(self):
+        """有新增条目时写入文件，多进程/重启后复用"""
+        cls = QuarksoSearch
+        with cls._share_link_lock:
+            if not cls._share_links_dirty:
+                return
+            cls._share_links_dirty = False
+            # 先合并文件中其他进程写入的条目，避免整体覆盖时丢失
+            self._merge_share_link_file()
+            self._prune_share_links()
+            data = {
+                "share_links": {k: list(v) for k, v in cls._share_links.items()},
+                "doc_ids": {k: list(v) for k, v in cls._doc_ids.items()},
+            }
+        try:
+            tmp_path = Path(f"{self.SHARE_LINK_FILE_NAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.SHARE_LINK_FILE_NAME)
+        except Exception as e:
+            logger.error("quarkso: 保存分享链接缓存失败: %s", e)
+
+    def _prune_share_links(self):
+        """清理过期条目，超出容量时按过期时间淘汰最旧的条目（调用方持有锁）"""
+        cls = QuarksoSearch
+        now = time.time()
+        for mapping in (cls._share_links, cls._doc_ids):
+            expired = [k for k, v in mapping.items() if v[1] <= now]
+            for k in expired:
+                del mapping[k]
+            overflow = len(mapping) - self.SHARE_LINK_MAXSIZE
+            if overflow > 0:
+                for k in sorted(mapping, key=lambda k: mapping[k][1])[:overflow]:
+                    del mapping[k]
+
+    def _load_share_links(self):
+        """从文件加载持久化的分享链接，每个进程只加载一次"""
+        cls = QuarksoSearch
+        with cls._share_link_lock:
+            if cls._share_links_loaded:
+                return
+            cls._share_links_loaded = True
+            self._merge_share_link_file()
+            self._prune_share_links()
+
+    def _merge_share_link_file(self):
+        """把文件中的条目合并进内存，同一 key 保留过期时间较晚的一条（调用方持有锁）"""
+        cls = QuarksoSearch
+        config_path = Path(self.SHARE_LINK_FILE_NAME)
+        if not config_path.exists():
+            return
+        try:
+            with open(config_path, 'r') as f:
+                data = json.load(f)
+            for mapping, name in ((cls._share_links, "share_links"), (cls._doc_ids, "doc_ids")):
+                for k, v in data.get(name, {}).items():
+                    current = mapping.get(k)
+                    if current is None or current[1] < v[1]:
+                        mapping[k] = tuple(v)
+        except Exception as e:
+            logger.error("quarkso: 加载分享链接缓存失败: %s", e)
+
     def save_quarkso_resource(self, url, cookie_id, doc_id):
         """
         向 https://www.quark.so/v1/local_resource_save 发起POST请求，保存资源。
@@ -163,16 +287,17 @@ class QuarksoSearch(BaseSearch):
                 })
             )
             resp.raise_for_status()
-            return resp.json()
+            return self.parse_json(resp)
         except Exception:
             pass
 
     def _get_real_detail_link_and_nuxtdata(self, fake_link: str):
         """
         跟进详情页，获取面包屑最后的真实 doc_id 链接、doc_id，并提取 NUXT_DATA JSON
+        返回 (doc_id, nuxt_json)，页面结构不符合时返回 ("", None)；请求失败时抛出异常（不写入详情缓存）
         """
         if not fake_link or not fake_link.startswith("http"):
-            return "", "", None
+            return "", None
         try:
             resp = requests.get(fake_link, headers=self.headers, timeout=15)
             resp.raise_for_status()
@@ -180,14 +305,14 @@ class QuarksoSearch(BaseSearch):
             breadcrumb = soup.find(
                 'ul', class_='yp-detail-main-breadcrumb yp-quarkso')
             if not breadcrumb:
-                return fake_link, "", None
+                return "", None
             all_li = breadcrumb.find_all(
                 'li', class_='yp-detail-main-breadcrumb-item yp-quarkso')
             if not all_li:
-                return fake_link, "", None
+                return "", None
             last_a = all_li[-1].find('a', class_='yp-quarkso')
             if not last_a or not last_a.has_attr('href'):
-                return fake_link, "", None
+                return "", None
             real_link = last_a['href']
             # 提取 doc_id
             doc_id = ""
@@ -199,78 +324,72 @@ class QuarksoSearch(BaseSearch):
             nuxt_json = None
             if script_tag:
                 try:
-                    nuxt_json = json.loads(script_tag.string)
+                    nuxt_json = NuxtPayload.from_json(script_tag.string)
                 except Exception as e:
-                    print(f"详情页 NUXT_DATA 解析失败: {str(e)}")
+                    logger.warning("详情页 NUXT_DATA 解析失败: %s", e)
             return doc_id, nuxt_json
         except Exception as e:
-            print(f"详情页解析失败: {str(e)}")
-            return fake_link, "", None
+            logger.warning("详情页解析失败: %s", e)
+            raise
+
+    # cookie_id 路径链路:
+    # 261 --> 258 cookie --> 252 [list] --> 251.list --> 213.transfer_save_config --> 212.global_config --> 733 --> 727.resource --> 712.page_config --> 711 --> 710
+    # --> 708.websiteConfig --> 707.website_config --> pina
+    # 规则：从最后往最前依次取值，遇到list类型取第一个元素，遇到key直接取key，遇到idx则用上一步的结果作为下标
+    COOKIE_ID_CHAIN = compile_json_chain([
+        ("idx", 1),
+        ("key", "pinia"),
+        ("origin", None),
+        ("key", "website_config"),
+        ("origin", None),
+        ("key", "websiteConfig"),
+        ("origin", None),
+        ("idx", 1),
+        ("origin", None),
+        ("idx", 1),
+        ("origin", None),
+        ("key", "page_config"),
+        ("origin", None),
+        ("key", "resource"),
+        ("origin", None),
+        ("idx", 1),
+        ("origin", None),
+        ("key", "global_config"),
+        ("origin", None),
+        ("key", "transfer_save_config"),
+        ("origin", None),
+        ("key", "list"),
+        ("origin", None),
+        ("list", 1),
+        ("origin", None),
+        ("key", "cookie"),
+        ("origin", None),
+    ])
 
-    # _resolve_json_chain 已移至父类
+    # url 路径: 3.{"is_cache":1,"seo_title":"..."} --> 找到key包含seo_title的dict，取其值，再依次 406.target_url
+    RESOURCE_URL_CHAIN = compile_json_chain([
+        ("idx", 2),
+        ("match", "seo_title"),
+        ("origin", None),
+        ("key", "detail_info"),
+        ("origin", None),
+        ("key", "target_urls"),
+        ("origin", None),
+        ("list", 0),
+        ("origin", None),
+        ("key", "target_url"),
+        ("origin", None),
+    ], match_func=match_key_contains)
 
     def _resolve_cookie_id_chain(self, nuxt_json):
-        """
-        cookie_id 路径链路:
-        261 --> 258 cookie --> 252 [list] --> 251.list --> 213.transfer_save_config --> 212.global_config --> 733 --> 727.resource --> 712.page_config --> 711 --> 710
-        --> 708.websiteConfig --> 707.website_config --> pina
-        规则：从最后往最前依次取值，遇到list类型取第一个元素，遇到key直接取key，遇到idx则用上一步的结果作为下标
-        """
-        chain = [
-            ("idx", 1),
-            ("key", "pinia"),
-            ("origin", None),
-            ("key", "website_config"),
-            ("origin", None),
-            ("key", "websiteConfig"),
-            ("origin", None),
-            ("idx", 1),
-            ("origin", None),
-            ("idx", 1),
-            ("origin", None),
-            ("key", "page_config"),
-            ("origin", None),
-            ("key", "resource"),
-            ("origin", None),
-            ("idx", 1),
-            ("origin", None),
-            ("key", "global_config"),
-            ("origin", None),
-            ("key", "transfer_save_config"),
-            ("origin", None),
-            ("key", "list"),
-            ("origin", None),
-            ("list", 1),
-            ("origin", None),
-            ("key", "cookie"),
-            ("origin", None),
-        ]
-        return self._resolve_json_chain(nuxt_json, chain, match_func=None, nuxt_json=nuxt_json)
+        if not nuxt_json:
+            return None
+        return nuxt_json.resolve(self.COOKIE_ID_CHAIN)
 
     def _resolve_resource_url(self, nuxt_json):
-        """
-        url 路径: 3.{"is_cache":1,"seo_title":"..."} --> 找到key包含seo_title的dict，取其值，再依次 406.target_url
-        """
-        chain = [
-            ("idx", 2),
-            ("match", "seo_title"),
-            ("origin", None),
-            ("key", "detail_info"),
-            ("origin", None),
-            ("key", "target_urls"),
-            ("origin", None),
-            ("list", 0),
-            ("origin", None),
-            ("key", "target_url"),
-            ("origin", None),
-        ]
-        def match_func(data, val):
-            if isinstance(data, dict):
-                for k, v in data.items():
-                    if isinstance(k, str) and val in k:
-                        return v
+        if not nuxt_json:
             return None
-        return self._resolve_json_chain(nuxt_json, chain, match_func=match_func, nuxt_json=nuxt_json)
+        return nuxt_json.resolve(self.RESOURCE_URL_CHAIN)
 
     def _clean_html(self, html: str) -> str:
         tags = [
@@ -283,17 +402,5 @@ class QuarksoSearch(BaseSearch):
         result = re.sub(r'<[^>]+>', '', result)
         return result.strip()
 
-    def _format_results(self, results: List[Dict[str, Any]], keyword: str) -> Dict[str, Any]:
-        return {
-            "list": results,
-            "channelInfo": {
-                "id": "quarkso",
-                "name": "夸克搜",
-                "index": 1022,
-                "channelLogo": ""
-            },
-            "id": "quarkso",
-            "index": 1022,
-            "total": len(results),
-            "keyword": keyword
-        }
\ No newline at end of file
+    def _format_results(self, results: List[SearchResult], keyword: str) -> Dict[str, Any]:
+        return result_block("quarkso", "夸克搜", 1022, results, total=len(results), keyword=keyword)
\ No newline at end of file
@@ -1,10 +1,14 @@
-from ..base import BaseSearch
-import requests
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..http_client import request_with_retry
+from ..query import canonicalize
 import threading
 import time
 from typing import List, Dict, Any
 import json
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 class QuPanSouSearch(BaseSearch):
     API_URL = "https://v.funletu.com/search"
@@ -28,7 +32,7 @@ class QuPanSouSearch(BaseSearch):
         t.start()
 
     def search(self, keyword: str) -> Dict[str, Any]:
-        cache_key = keyword.strip()
+        cache_key = canonicalize(keyword)
         now = time.time()
         with self._cache_lock:
             cached = self._cache.get(cache_key)
@@ -45,7 +49,7 @@ class QuPanSouSearch(BaseSearch):
                 }
             return self._format_results(results, keyword)
         except Exception as e:
-            print(f"qupansou API error: {str(e)}")
+            logger.error("qupansou API error: %s", e)
             return self._format_results([], keyword)
 
     def _search_api(self, keyword: str) -> List[Dict[str, Any]]:
@@ -78,14 +82,14 @@ class QuPanSouSearch(BaseSearch):
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Referer": "https://pan.funletu.com/",
         }
-        resp = requests.post(self.API_URL, headers=headers, json=req_body, timeout=15)
+        resp = request_with_retry("POST", self.API_URL, headers=headers, json=req_body, timeout=15)
         resp.raise_for_status()
-        data = resp.json()
+        data = self.parse_json(resp)
         if data.get("status") != 200:
             raise Exception(f"API returned error: {data.get('message')}")
         return data.get("data", [])
 
-    def _convert_results(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _convert_results(self, items: List[Dict[str, Any]]) -> List[SearchResult]:
         results = []
         for item in items:
             url = item.get("url") or item.get("link") or ""
@@ -97,23 +101,16 @@ class QuPanSouSearch(BaseSearch):
             # 解析时间
             datetime = item.get("updatetime", "") or item.get("createtime", "")
             # 组装
-            result = {
-                "messageId": f"qupansou-{item.get('id', '')}",
-                "title": title,
-                "pubDate": datetime,
-                "content": f"类别: {item.get('category', '')}, 文件类型: {item.get('filetype', '')}, 大小: {item.get('size', '')}",
-                "image": "",
-                "cloudLinks": [{
-                    "link": url,
-                    "cloudType": link_type,
-                    "pwd": ""  # 趣盘搜API不返回密码
-                }],
-                "tags": [],
-                "magnetLink": "",
-                "channel": "趣盘搜",
-                "channelId": "qupansou"
-            }
-            results.append(result)
+            # 趣盘搜API不返回密码
+            results.append(SearchResult(
+                messageId=f"qupansou-{item.get('id', '')}",
+                title=title,
+                pubDate=datetime,
+                content=f"类别: {item.get('category', '')}, 文件类型: {item.get('filetype', '')}, 大小: {item.get('size', '')}",
+                cloudLinks=[CloudLink(url, link_type)],
+                channel="趣盘搜",
+                channelId="qupansou"
+            ))
         return results
 
     def _clean_html(self, html: str) -> str:
@@ -129,17 +126,5 @@ class QuPanSouSearch(BaseSearch):
         result = re.sub(r'<[^>]+>', '', result)
         return result.strip()
 
-    def _format_results(self, results: List[Dict[str, Any]], keyword: str) -> Dict[str, Any]:
-        return {
-            "list": results,
-            "channelInfo": {
-                "id": "qupansou",
-                "name": "趣盘搜",
-                "index": 1021,
-                "channelLogo": ""
-            },
-            "id": "qupansou",
-            "index": 1021,
-            "total": len(results),
-            "keyword": keyword
-        }
\ No newline at end of file
+    def _format_results(self, results: List[SearchResult], keyword: str) -> Dict[str, Any]:
+        return result_block("qupansou", "趣盘搜", 1021, results, total=len(results), keyword=keyword)
\ No newline at end of file
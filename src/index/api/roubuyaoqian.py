@@ -1,6 +1,10 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..http_client import request_with_retry
 import requests
 from typing import Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
 
 class RoubuyaoqianSearch(BaseSearch):
     """roubuyaoqian.com 网盘搜索实现"""
@@ -56,7 +60,8 @@ class RoubuyaoqianSearch(BaseSearch):
                     "platform": "pc"
                 }
             }
-            resp = requests.post(
+            resp = request_with_retry(
+                "POST",
                 self.base_url,
                 headers=self.headers,
                 cookies=self.cookies,
@@ -64,7 +69,7 @@ class RoubuyaoqianSearch(BaseSearch):
                 timeout=10
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = self.parse_json(resp)
             results = data.get("data", {}).get("list", [])
 
             # 并发处理详情页，提取真实网盘链接
@@ -100,7 +105,7 @@ class RoubuyaoqianSearch(BaseSearch):
                     if link_tag and link_tag.has_attr('href'):
                         return link_tag['href']
                 except Exception as e:
-                    print(f"详情页解析失败: {doc_id} [{type(e).__name__}] {str(e)}")
+                    logger.warning("详情页解析失败: %s [%s] %s", doc_id, type(e).__name__, e)
                 return ""
 
             # 并发获取所有真实链接
@@ -114,49 +119,21 @@ class RoubuyaoqianSearch(BaseSearch):
                 disk_type = item.get("disk_type", "")
                 tags = item.get("tags") or []
                 real_link = real_links[idx] if idx < len(real_links) else ""
-                list_data.append({
-                    "messageId": item.get("doc_id", "") or item.get("disk_id", ""),
-                    "title": clean_html(item.get("disk_name", "")),
-                    "pubDate": item.get("shared_time", ""),
-                    "content": clean_html(item.get("files", "")),
-                    "fileType": item.get("disk_type", ""),
-                    "uploader": item.get("share_user", ""),
-                    "cloudLinks": [{
-                        "link": real_link,
-                        "cloudType": self._map_cloud_type(disk_type),
-                        "pwd": pwd
-                    }] if real_link else [],
-                    "tags": tags if isinstance(tags, list) else [],
-                    "magnetLink": "",
-                    "channel": "roubuyaoqian",
-                    "channelId": "roubuyaoqian"
-                })
-            return {
-                "list": list_data,
-                "channelInfo": {
-                    "id": "roubuyaoqian",
-                    "name": "肉不咬钱",
-                    "index": 1013,
-                    "channelLogo": ""
-                },
-                "id": "roubuyaoqian",
-                "index": 1013,
-                "total": data.get("data", {}).get("total", len(results)),
-                "keyword": keyword
-            }
+                list_data.append(SearchResult(
+                    messageId=item.get("doc_id", "") or item.get("disk_id", ""),
+                    title=clean_html(item.get("disk_name", "")),
+                    pubDate=item.get("shared_time", ""),
+                    content=clean_html(item.get("files", "")),
+                    cloudLinks=[CloudLink(real_link, self._map_cloud_type(disk_type), pwd)] if real_link else [],
+                    tags=tags if isinstance(tags, list) else [],
+                    channel="roubuyaoqian",
+                    channelId="roubuyaoqian"
+                ))
+            return result_block("roubuyaoqian", "肉不咬钱", 1013, list_data,
+                                total=data.get("data", {}).get("total", len(results)), keyword=keyword)
         except Exception as e:
-            print(f"API请求失败: {str(e)}")
-            return {
-                "list": [],
-                "channelInfo": {
-                    "id": "roubuyaoqian",
-                    "name": "肉不咬钱",
-                    "index": 1013,
-                    "channelLogo": ""
-                },
-                "id": "roubuyaoqian",
-                "index": 1013
-            }
+            logger.error("API请求失败: %s", e)
+            return result_block("roubuyaoqian", "肉不咬钱", 1013, [])
 
     def _map_cloud_type(self, disk_type: str) -> str:
         mapping = {
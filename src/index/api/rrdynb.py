@@ -1,10 +1,13 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, SearchResult, result_block
 import requests
 from typing import Dict, Any
 from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor
 import urllib.parse
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 class RrdynbSearch(BaseSearch):
     """rrdynb.com 网盘搜索实现（详情页并发解析，严格参考roubuyaoqian.py）"""
@@ -91,7 +94,7 @@ class RrdynbSearch(BaseSearch):
                         "image": image
                     })
                 except Exception as e:
-                    print(f"主列表项解析失败: {str(e)}")
+                    logger.warning("主列表项解析失败: %s", e)
                     continue
 
             # 并发处理详情页，提取真实网盘链接
@@ -124,13 +127,14 @@ class RrdynbSearch(BaseSearch):
                     # 网盘链接提取（基类通用方法）
                     return self._extract_cloud_links_from_html(detail_soup)
                 except Exception as e:
-                    print(f"详情页解析失败: {detail_url} [{type(e).__name__}] {str(e)}")
-                    return []
+                    logger.warning("详情页解析失败: %s [%s] %s", detail_url, type(e).__name__, e)
+                    # 请求失败不写入详情缓存，下次搜到时重新获取
+                    raise
 
-            # 并发获取所有真实链接（用基类方法，max_workers=10）
+            # 并发获取所有真实链接（用基类方法，max_workers=10），详情页结果按URL缓存
             real_links_list = self._batch_fetch_details(
                 [item["detail_url"] for item in detail_items],
-                fetch_real_links,
+                lambda detail_url: self._fetch_detail_cached(detail_url, fetch_real_links),
                 max_workers=10
             )
 
@@ -140,42 +144,18 @@ class RrdynbSearch(BaseSearch):
                 cloud_links = real_links_list[idx] if idx < len(real_links_list) else []
                 if not cloud_links:
                     continue
-                results.append({
-                    "messageId": item["detail_href"].split('/')[-1].replace('.html', ''),
-                    "title": self._clean_html(item["title"]),
-                    "pubDate": item["pub_date"],
-                    "content": self._clean_html(item["content"]),
-                    "image": item["image"],
-                    "cloudLinks": cloud_links,
-                    "tags": [],
-                    "magnetLink": "",
-                    "channel": "rrdynb",
-                    "channelId": "rrdynb"
-                })
+                results.append(SearchResult(
+                    messageId=item["detail_href"].split('/')[-1].replace('.html', ''),
+                    title=self._clean_html(item["title"]),
+                    pubDate=item["pub_date"],
+                    content=self._clean_html(item["content"]),
+                    image=item["image"],
+                    cloudLinks=cloud_links,
+                    channel="rrdynb",
+                    channelId="rrdynb"
+                ))
 
-            return {
-                "list": results,
-                "channelInfo": {
-                    "id": "rrdynb",
-                    "name": "人人电影",
-                    "index": 1014,
-                    "channelLogo": ""
-                },
-                "id": "rrdynb",
-                "index": 1014,
-                "total": len(results),
-                "keyword": keyword
-            }
+            return result_block("rrdynb", "人人电影", 1014, results, total=len(results), keyword=keyword)
         except Exception as e:
-            print(f"rrdynb搜索失败: {str(e)}")
-            return {
-                "list": [],
-                "channelInfo": {
-                    "id": "rrdynb",
-                    "name": "人人电影",
-                    "index": 1015,
-                    "channelLogo": ""
-                },
-                "id": "rrdynb",
-                "index": 1015
-            }
\ No newline at end of file
+            logger.error("rrdynb搜索失败: %s", e)
+            return result_block("rrdynb", "人人电影", 1014, [])
\ No newline at end of file
@@ -1,9 +1,12 @@
-from ..base import BaseSearch
-import requests
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..http_client import request_with_retry
 from bs4 import BeautifulSoup
 from typing import Dict, Any, List
 import urllib.parse
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 class SlowreadSearch(BaseSearch):
     """
@@ -51,7 +54,8 @@ class SlowreadSearch(BaseSearch):
             }
             
             # 发送POST请求
-            resp = requests.post(
+            resp = request_with_retry(
+                "POST",
                 self.base_url,
                 headers=self.headers,
                 cookies=self.cookies,
@@ -93,31 +97,23 @@ class SlowreadSearch(BaseSearch):
                     cloud_type = self.detect_cloud_type(link)
                     
                     # 构造结果对象
-                    result = {
-                        "messageId": self._extract_message_id(link),
-                        "title": self._clean_html(title),
-                        "pubDate": "",
-                        "content": self._clean_html(title),
-                        "image": "",
-                        "cloudLinks": [{
-                            "link": link,
-                            "cloudType": cloud_type
-                        }],
-                        "tags": [icon_alt] if icon_alt else [],
-                        "magnetLink": "",
-                        "channel": "SlowRead",
-                        "channelId": "slowread"
-                    }
-                    
-                    results.append(result)
+                    results.append(SearchResult(
+                        messageId=self._extract_message_id(link),
+                        title=self._clean_html(title),
+                        content=self._clean_html(title),
+                        cloudLinks=[CloudLink(link, cloud_type)],
+                        tags=[icon_alt] if icon_alt else [],
+                        channel="SlowRead",
+                        channelId="slowread"
+                    ))
                 except Exception as e:
-                    print(f"解析结果项失败: {str(e)}")
+                    logger.warning("解析结果项失败: %s", e)
                     continue
             
             return self._format_results(results, keyword)
             
         except Exception as e:
-            print(f"slowread搜索失败: {str(e)}")
+            logger.error("slowread搜索失败: %s", e)
             return self._format_results([], keyword)
 
     def _extract_message_id(self, link: str) -> str:
@@ -131,20 +127,8 @@ class SlowreadSearch(BaseSearch):
         return link
 
 
-    def _format_results(self, results: List[Dict[str, Any]], keyword: str) -> Dict[str, Any]:
+    def _format_results(self, results: List[SearchResult], keyword: str) -> Dict[str, Any]:
         """
         格式化结果，与quarkso.py保持一致
         """
-        return {
-            "list": results,
-            "channelInfo": {
-                "id": "slowread",
-                "name": "SlowRead",
-                "index": 1070,
-                "channelLogo": ""
-            },
-            "id": "slowread",
-            "index": 1070,
-            "total": len(results),
-            "keyword": keyword
-        }
\ No newline at end of file
+        return result_block("slowread", "SlowRead", 1070, results, total=len(results), keyword=keyword)
\ No newline at end of file
@@ -1,4 +1,5 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..nuxt import NuxtPayload, compile_json_chain, match_key_contains
 import requests
 import urllib.parse
 from bs4 import BeautifulSoup
@@ -7,6 +8,9 @@ import re
 import json
 import threading
 import time
+import logging
+
+logger = logging.getLogger(__name__)
 
 class SouziyuanbaSearch(BaseSearch):
     """
@@ -17,6 +21,22 @@ class SouziyuanbaSearch(BaseSearch):
     CACHE_TTL = 3600
     CACHE_CLEAN_INTERVAL = 3600
 
+    # 2 -> match source_name -> rows
+    ROWS_CHAIN = compile_json_chain([
+        ('idx', 2),
+        ('match', 'source_name'),
+        ("origin", None),
+        ("key", "rows"),
+        ("origin", None),
+    ], match_func=match_key_contains)
+    # row -> res_dict -> quark -> list,0 -> url
+    ROW_URL_CHAIN = compile_json_chain([
+        ('key', 'res_dict'), ('origin', None),
+        ('key', 'quark'), ('origin', None),
+        ('list', 0), ('origin', None),
+        ('key', 'url'), ('origin', None),
+    ])
+
     def __init__(self):
         self._cache = {}
         self._cache_lock = threading.Lock()
@@ -50,7 +70,7 @@ class SouziyuanbaSearch(BaseSearch):
                 }
             return self._format_results(results, keyword)
         except Exception as e:
-            print(f"souziyuanba API error: {str(e)}")
+            logger.error("souziyuanba API error: %s", e)
             return self._format_results([], keyword)
 
     def _search_html(self, keyword: str, category: str) -> (List[Dict[str, Any]], Any):
@@ -89,7 +109,7 @@ class SouziyuanbaSearch(BaseSearch):
                     "item_html": str(item)
                 })
             except Exception as e:
-                print(f"解析条目失败: {str(e)}")
+                logger.warning("解析条目失败: %s", e)
                 continue
         return results, nuxt_data
 
@@ -97,38 +117,23 @@ class SouziyuanbaSearch(BaseSearch):
         script_tag = soup.find("script", {"id": "__NUXT_DATA__"})
         if script_tag:
             try:
-                return json.loads(script_tag.string)
+                return NuxtPayload.from_json(script_tag.string)
             except Exception as e:
-                print(f"NUXT_DATA 解析失败: {str(e)}")
+                logger.warning("NUXT_DATA 解析失败: %s", e)
         return None
 
     def _resolve_resource_url_by_source(self, nuxt_json):
         """
         2 -> match source_name -> rows -> list,0 -> url
         """
-        chain = [
-            ('idx', 2),
-            ('match', 'source_name'),
-            ("origin", None),
-            ("key", "rows"),
-            ("origin", None),
-        ]        
-        def match_func(data, val):
-            if isinstance(data, dict):
-                for k, v in data.items():
-                    if isinstance(k, str) and val in k:
-                        return v
-            return None
-        totol = self._resolve_json_chain(nuxt_json, chain, match_func, nuxt_json)
-        print(totol)
-        urls = list()
-        for idx, _ in enumerate(totol):
-            echain = chain + [("list", idx), ("origin", None), ('key', 'res_dict'), ('origin', None), ('key', 'quark'), ('origin', None), ('list', 0), ('origin', None), ('key', 'url'), ('origin', None)]
-            url = self._resolve_json_chain(nuxt_json, echain, match_func, nuxt_json)
-            urls.append(url)
-        return urls
+        if not nuxt_json:
+            return []
+        rows = nuxt_json.resolve(self.ROWS_CHAIN)
+        if not isinstance(rows, list):
+            return []
+        return [self.ROW_URL_CHAIN(nuxt_json, nuxt_json.deref(ref)) for ref in rows]
 
-    def _convert_results(self, items: List[Dict[str, Any]], keyword: str, category: str, nuxt_data: any) -> List[Dict[str, Any]]:
+    def _convert_results(self, items: List[Dict[str, Any]], keyword: str, category: str, nuxt_data: any) -> List[SearchResult]:
         # 1. 收集所有 (url, pan_type, source_name)
         tasks = []
         urls = self._resolve_resource_url_by_source(nuxt_data)
@@ -143,32 +148,33 @@ class SouziyuanbaSearch(BaseSearch):
                 "source_name": category,
                 "title": item.get("title", "")
             })
-        # 2. 用父类线程池批量POST获取直链
-        real_links = super()._batch_fetch_details(tasks, self._fetch_real_link, max_workers=8)
+        # 2. 用父类线程池批量POST获取直链，同一资源url的直链跨关键词缓存
+        real_links = super()._batch_fetch_details(tasks, self._fetch_real_link_cached, max_workers=8)
         # 3. 组装最终结果
         results = []
         for idx, item in enumerate(items):
             # 匹配 real_link
             real_link_obj = next((r for r in real_links if r["idx"] == idx), None)
             if real_link_obj and real_link_obj.get("real_url"):
-                cloudLinks = [{
-                    "link": real_link_obj["real_url"],
-                    "cloudType": real_link_obj["pan_type"]
-                }]
-                results.append({
-                    "messageId": f"souziyuanba-{idx}",
-                    "title": item.get("title", ""),
-                    "pubDate": "",
-                    "content": item.get("content", ""),
-                    "image": "",
-                    "cloudLinks": cloudLinks,
-                    "tags": [],
-                    "magnetLink": "",
-                    "channel": "搜资源吧",
-                    "channelId": "souziyuanba"
-                })
+                results.append(SearchResult(
+                    messageId=f"souziyuanba-{idx}",
+                    title=item.get("title", ""),
+                    content=item.get("content", ""),
+                    cloudLinks=[CloudLink(real_link_obj["real_url"], real_link_obj["pan_type"])],
+                    channel="搜资源吧",
+                    channelId="souziyuanba"
+                ))
         return results
 
+    def _fetch_real_link_cached(self, task):
+        real_url = self._fetch_detail_cached(
+            task["url"], lambda url: self._fetch_real_link(task)["real_url"])
+        return {
+            "idx": task["idx"],
+            "real_url": real_url or "",
+            "pan_type": task["pan_type"]
+        }
+
     def _fetch_real_link(self, task):
         headers = {
             "accept": "application/json",
@@ -205,7 +211,7 @@ class SouziyuanbaSearch(BaseSearch):
                 timeout=15
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = self.parse_json(resp)
             real_url = data.get("data", {}).get("final_share_url")            
             return {
                 "idx": task["idx"],
@@ -213,12 +219,9 @@ class SouziyuanbaSearch(BaseSearch):
                 "pan_type": task["pan_type"]
             }
         except Exception as e:
-            print(f"resource_save error: {str(e)} for url={task['url']}")
-            return {
-                "idx": task["idx"],
-                "real_url": "",
-                "pan_type": task["pan_type"]
-            }
+            # 请求失败抛出，不写入详情缓存
+            logger.warning("resource_save error: %s for url=%s", e, task['url'])
+            raise
 
     # 不再实现 _batch_fetch_details 兜底，直接用父类
     def _clean_html(self, html: str) -> str:
@@ -232,17 +235,5 @@ class SouziyuanbaSearch(BaseSearch):
         result = re.sub(r'<[^>]+>', '', result)
         return result.strip()
 
-    def _format_results(self, results: List[Dict[str, Any]], keyword: str) -> Dict[str, Any]:
-        return {
-            "list": results,
-            "channelInfo": {
-                "id": "souziyuanba",
-                "name": "搜资源吧",
-                "index": 1040,
-                "channelLogo": ""
-            },
-            "id": "souziyuanba",
-            "index": 1040,
-            "total": len(results),
-            "keyword": keyword
-        }
\ No newline at end of file
+    def _format_results(self, results: List[SearchResult], keyword: str) -> Dict[str, Any]:
+        return result_block("souziyuanba", "搜资源吧", 1040, results, total=len(results), keyword=keyword)
\ No newline at end of file
@@ -1,6 +1,9 @@
-from ..base import BaseSearch
-import requests
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..http_client import request_with_retry
 from typing import List, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
 
 class VcsosoSearch(BaseSearch):
     """vcsoso.com Qsearch接口"""
@@ -34,7 +37,8 @@ class VcsosoSearch(BaseSearch):
         搜索vcsoso资源并返回libvio.py格式结构
         """
         try:
-            resp = requests.post(
+            resp = request_with_retry(
+                "POST",
                 self.api_url,
                 headers=self.headers,
                 cookies=self.cookies,
@@ -42,47 +46,20 @@ class VcsosoSearch(BaseSearch):
                 timeout=10
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = self.parse_json(resp)
             items = data.get("data", [])
             result_list = []
             for item in items:
                 url = item.get("url", "")
-                result_list.append({
-                    "messageId": str(item.get("id", "")),
-                    "title": item.get("title", ""),
-                    "pubDate": "",
-                    "content": item.get("title", ""),
-                    "image": "",
-                    "cloudLinks": [{
-                        "link": url,
-                        "cloudType": self.detect_cloud_type(url)
-                    }],
-                    "tags": [],
-                    "magnetLink": "",
-                    "channel": "Vcsoso",
-                    "channelId": "vcsoso"
-                })
-            return {
-                "list": result_list,
-                "channelInfo": {
-                    "id": "vcsoso",
-                    "name": "Vcsoso",
-                    "index": 1060,
-                    "channelLogo": ""
-                },
-                "id": "vcsoso",
-                "index": 1060
-            }
+                result_list.append(SearchResult(
+                    messageId=str(item.get("id", "")),
+                    title=item.get("title", ""),
+                    content=item.get("title", ""),
+                    cloudLinks=[CloudLink(url, self.detect_cloud_type(url))],
+                    channel="Vcsoso",
+                    channelId="vcsoso"
+                ))
+            return result_block("vcsoso", "Vcsoso", 1060, result_list)
         except Exception as e:
-            print(f"vcsoso Qsearch API请求失败: {str(e)}")
-            return {
-                "list": [],
-                "channelInfo": {
-                    "id": "vcsoso",
-                    "name": "Vcsoso",
-                    "index": 1060,
-                    "channelLogo": ""
-                },
-                "id": "vcsoso",
-                "index": 1060
-            }
\ No newline at end of file
+            logger.error("vcsoso Qsearch API请求失败: %s", e)
+            return result_block("vcsoso", "Vcsoso", 1060, [])
\ No newline at end of file
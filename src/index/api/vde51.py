@@ -1,7 +1,10 @@
-from ..base import BaseSearch
-import requests
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
+from ..http_client import request_with_retry
 import re
 from typing import List, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
 
 class Vde51Search(BaseSearch):
     """
@@ -77,14 +80,15 @@ class Vde51Search(BaseSearch):
                 "page[limit]": 3,
                 "include": "mostRelevantPost"
             }
-            response = requests.get(
+            response = request_with_retry(
+                "GET",
                 self.base_url,
                 headers=self.headers,
                 params=params,
                 timeout=15
             )
             response.raise_for_status()
-            data = response.json()
+            data = self.parse_json(response)
             
             valid_results = []
             for item in data.get('data', []):
@@ -100,21 +104,11 @@ class Vde51Search(BaseSearch):
                 if result:
                     valid_results.append(result)
             
-            return {
-                "list": valid_results,
-                "channelInfo": {
-                    "id": "51vde",
-                    "name": "51vde",
-                    "index": 1006,
-                    "channelLogo": ""
-                },
-                "id": "51vde",
-                "index": 1006
-            }
+            return result_block("51vde", "51vde", 1006, valid_results)
             
         except Exception as e:
-            print(f"API请求失败: {str(e)}")
-            return []
+            logger.error("API请求失败: %s", e)
+            return result_block("51vde", "51vde", 1006, [])
     
     def _process_post(self, discussion, post):
         """处理帖子内容"""
@@ -129,26 +123,20 @@ class Vde51Search(BaseSearch):
             for url in matches:
                 cloud_type = self.detect_cloud_type(url)
                 if cloud_type:
-                    links.append({
-                        "link": url,
-                        "cloudType": cloud_type
-                    })
+                    links.append(CloudLink(url, cloud_type))
             
             if not links:
                 return None
                 
-            return {
-                "messageId": discussion.get('id'),
-                "title": discussion.get('attributes', {}).get('title', ''),
-                "pubDate": discussion.get('attributes', {}).get('createdAt', ''),
-                "content": content.replace('<p>', '').replace('</p>', ''),
-                "image": "",
-                "cloudLinks": links,
-                "tags": [],
-                "magnetLink": "",
-                "channel": "51vde",
-                "channelId": "51vde"
-            }
+            return SearchResult(
+                messageId=discussion.get('id'),
+                title=discussion.get('attributes', {}).get('title', ''),
+                pubDate=discussion.get('attributes', {}).get('createdAt', ''),
+                content=content.replace('<p>', '').replace('</p>', ''),
+                cloudLinks=links,
+                channel="51vde",
+                channelId="51vde"
+            )
         except Exception as e:
-            print(f"帖子处理失败: {str(e)}")
+            logger.warning("帖子处理失败: %s", e)
             return None
\ No newline at end of file
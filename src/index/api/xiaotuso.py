@@ -1,57 +1,82 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
 import requests
 from typing import List, Dict, Any
 import time
 import re
 from bs4 import BeautifulSoup
 import hashlib
+import threading
 import urllib.parse
+from ..cache import TTLCache
+from .. import json_backend
+import logging
+
+logger = logging.getLogger(__name__)
 
 class XiaotusoSearch(BaseSearch):
     """小兔搜资源搜索实现"""
 
+    SOPAN_URL = "https://xiaotusoso.com/sopan"
+    SIGN_KEY_TTL = 24 * 3600
+    PAGE_HEADERS = {
+        'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+        'accept-language': 'zh-CN,zh;q=0.9,en;q=0.8,zh-TW;q=0.7',
+        'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
+        'referer': SOPAN_URL,
+        'priority': 'u=0, i',
+        'sec-ch-ua': '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
+        'sec-ch-ua-mobile': '?0',
+        'sec-ch-ua-platform': '"macOS"',
+        'sec-fetch-dest': 'document',
+        'sec-fetch-mode': 'navigate',
+        'sec-fetch-site': 'same-origin',
+        'sec-fetch-user': '?1',
+        'upgrade-insecure-requests': '1',
+    }
+    PAGE_COOKIES = {
+        '_ga': 'GA1.1.908594567.1753181907',
+        '_ga_XF5VQM9RJN': 'GS2.1.s1754393631$o2$g1$t1754394468$j58$l0$h0'
+    }
+
+    # NEXT_PUBLIC_SIGN_KEY 为站点级配置，按 Next.js chunk URL 缓存，所有实例共享
+    _sign_key_cache = TTLCache(maxsize=16, ttl=SIGN_KEY_TTL)
+    _current_chunk_url = None
+    _sign_key_lock = threading.Lock()
+
     def __init__(self, use_playwright: bool = False):
         self.use_playwright = use_playwright
-        self._sign_key_cache = {}
 
-    def _get_sign_key(self, keyword: str) -> str:
+    def _get_sign_key(self, refresh: bool = False) -> str:
         """
-        动态获取 NEXT_PUBLIC_SIGN_KEY，按 keyword 缓存
+        获取 NEXT_PUBLIC_SIGN_KEY，命中站点级缓存时不发起任何请求
+        :param refresh: 签名校验失败时为True，重新解析当前 chunk URL，chunk 未变化时重新提取密钥
         """
-        if keyword in self._sign_key_cache:
-            return self._sign_key_cache[keyword]
-        q = urllib.parse.quote(keyword)
-        url = f"https://xiaotusoso.com/sopan?q={q}"
-        headers = {
-            'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'accept-language': 'zh-CN,zh;q=0.9,en;q=0.8,zh-TW;q=0.7',
-            'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
-            'referer': url,
-            'priority': 'u=0, i',
-            'sec-ch-ua': '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
-            'sec-ch-ua-mobile': '?0',
-            'sec-ch-ua-platform': '"macOS"',
-            'sec-fetch-dest': 'document',
-            'sec-fetch-mode': 'navigate',
-            'sec-fetch-site': 'same-origin',
-            'sec-fetch-user': '?1',
-            'upgrade-insecure-requests': '1',
-        }
-        cookies = {
-            '_ga': 'GA1.1.908594567.1753181907',
-            '_ga_XF5VQM9RJN': 'GS2.1.s1754393631$o2$g1$t1754394468$j58$l0$h0'
-        }
-        resp = requests.get(url, headers=headers, cookies=cookies, timeout=10)
+        cls = XiaotusoSearch
+        if not refresh and cls._current_chunk_url:
+            sign_key = cls._sign_key_cache.get(cls._current_chunk_url)
+            if sign_key:
+                return sign_key
+        with cls._sign_key_lock:
+            chunk_url = self._discover_chunk_url()
+            sign_key = cls._sign_key_cache.get(chunk_url)
+            if not sign_key or (refresh and chunk_url == cls._current_chunk_url):
+                sign_key = self._extract_sign_key(chunk_url)
+                cls._sign_key_cache.set(chunk_url, sign_key)
+            cls._current_chunk_url = chunk_url
+            return sign_key
+
+    def _discover_chunk_url(self) -> str:
+        """从 /sopan 页面找到包含 runtimeEnv 的 Next.js chunk URL"""
+        resp = requests.get(self.SOPAN_URL, headers=self.PAGE_HEADERS, cookies=self.PAGE_COOKIES, timeout=10)
         soup = BeautifulSoup(resp.text, "html.parser")
-        script_tag = None
         for s in soup.find_all("script", src=True):
             if "/_next/static/chunks/app/" in s["src"] and "sopan/page-" in s["src"]:
-                script_tag = s
-                break
-        if not script_tag:
-            raise Exception("未找到目标script标签")
-        script_url = "https://xiaotusoso.com" + script_tag["src"]
-        script_resp = requests.get(script_url, headers=headers, cookies=cookies, timeout=10)
+                return "https://xiaotusoso.com" + s["src"]
+        raise Exception("未找到目标script标签")
+
+    def _extract_sign_key(self, chunk_url: str) -> str:
+        """下载 chunk 并提取 runtimeEnv 中的 NEXT_PUBLIC_SIGN_KEY"""
+        script_resp = requests.get(chunk_url, headers=self.PAGE_HEADERS, cookies=self.PAGE_COOKIES, timeout=10)
         # 提取 runtimeEnv 结构体
         m_env = re.search(r'runtimeEnv\s*:\s*\{([^}]+)\}', script_resp.text)
         if not m_env:
@@ -60,9 +85,21 @@ class XiaotusoSearch(BaseSearch):
         m_key = re.search(r'NEXT_PUBLIC_SIGN_KEY["\']?\s*:\s*["\']([^"\']+)["\']', env_block)
         if not m_key:
             raise Exception("未找到 NEXT_PUBLIC_SIGN_KEY")
-        sign_key = m_key.group(1)
-        self._sign_key_cache[keyword] = sign_key
-        return sign_key
+        return m_key.group(1)
+
+    @staticmethod
+    def _is_sign_error(response) -> bool:
+        """判断请求是否因签名校验失败被拒绝"""
+        if response.status_code in (401, 403):
+            return True
+        try:
+            data = json_backend.response_json(response)
+        except ValueError:
+            return False
+        if not isinstance(data, dict):
+            return False
+        message = str(data.get("message") or data.get("msg") or "")
+        return "sign" in message.lower() or "签名" in message
 
     def _build_sign_string_sha256(self, e: dict, s: str, t: str) -> str:
         """
@@ -84,21 +121,8 @@ class XiaotusoSearch(BaseSearch):
         """
         return self._search_with_api(keyword)
 
-    def _search_with_api(self, keyword: str) -> List[Dict[str, Any]]:
-        """通过API搜索"""
-        url = "https://xiaotusoso.com/api/extra/disk/search"
-        payload = {
-            "page": 1,
-            "size": 20,
-            "q": keyword,
-            "type": "ALL",
-            "share_time": "ALL",
-            "format": "",
-            "mode": "common",
-            "gateway": "G1"
-        }
-        # 动态获取 sign key
-        sign_key = self._get_sign_key(keyword)
+    def _post_search(self, url: str, payload: dict, keyword: str, sign_key: str):
+        """按签名算法生成 x-sign 后提交搜索请求"""
         # 生成 x-timestamp
         x_timestamp = str(int(time.time() * 1000))
         # 用 build_sign_string_sha256 算法生成 x-sign
@@ -124,17 +148,35 @@ class XiaotusoSearch(BaseSearch):
             '_ga': 'GA1.1.908594567.1753181907',
             '_ga_XF5VQM9RJN': 'GS2.1.s1754393631$o2$g1$t1754394255$j18$l0$h0'
         }
+        return requests.post(
+            url,
+            headers=headers,
+            cookies=cookies,
+            json=payload,
+            timeout=10
+        )
 
+    def _search_with_api(self, keyword: str) -> List[Dict[str, Any]]:
+        """通过API搜索"""
+        url = "https://xiaotusoso.com/api/extra/disk/search"
+        payload = {
+            "page": 1,
+            "size": 20,
+            "q": keyword,
+            "type": "ALL",
+            "share_time": "ALL",
+            "format": "",
+            "mode": "common",
+            "gateway": "G1"
+        }
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                cookies=cookies,
-                json=payload,
-                timeout=10
-            )
+            # 站点级 sign key（发现失败同样按请求失败处理），签名校验失败时重新发现后重试一次
+            sign_key = self._get_sign_key()
+            response = self._post_search(url, payload, keyword, sign_key)
+            if self._is_sign_error(response):
+                response = self._post_search(url, payload, keyword, self._get_sign_key(refresh=True))
             response.raise_for_status()
-            data = response.json()
+            data = self.parse_json(response)
 
             # 资源列表在 result['list']
             items = data.get('result', {}).get('list', [])
@@ -149,32 +191,17 @@ class XiaotusoSearch(BaseSearch):
                         return f"{link}?pwd={disk_pass}"
                 return link
 
-            return {
-                "list": [{
-                    "messageId": str(item.get("disk_id", "")),
-                    "title": self._clean_html(item.get("disk_name", "")),
-                    "pubDate": item.get("shared_time", ""),
-                    "content": self._clean_html(item.get("disk_name", "")),
-                    "image": "",
-                    "cloudLinks": [{
-                        "link": build_link(item),
-                        "cloudType": self.detect_cloud_type(item.get("link", ""))
-                    }],
-                    "tags": safe_tags(item.get("tags", [])),
-                    "magnetLink": "",
-                    "channel": "小兔搜",
-                    "channelId": "xiaotuso"
-                } for item in items],
-                "channelInfo": {
-                    "id": "xiaotuso",
-                    "name": "小兔搜",
-                    "index": 1002,
-                    "channelLogo": ""
-                },
-                "id": "xiaotuso",
-                "index": 1002
-            }
+            return result_block("xiaotuso", "小兔搜", 1002, [SearchResult(
+                messageId=str(item.get("disk_id", "")),
+                title=self._clean_html(item.get("disk_name", "")),
+                pubDate=item.get("shared_time", ""),
+                content=self._clean_html(item.get("disk_name", "")),
+                cloudLinks=[CloudLink(build_link(item), self.detect_cloud_type(item.get("link", "")))],
+                tags=safe_tags(item.get("tags", [])),
+                channel="小兔搜",
+                channelId="xiaotuso"
+            ) for item in items])
 
         except Exception as e:
-            print(f"小兔搜 API请求失败: {str(e)}")
-            return []
\ No newline at end of file
+            logger.error("小兔搜 API请求失败: %s", e)
+            return result_block("xiaotuso", "小兔搜", 1002, [])
\ No newline at end of file
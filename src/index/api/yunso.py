@@ -1,7 +1,10 @@
-from ..base import BaseSearch
+from ..base import BaseSearch, CloudLink, SearchResult, result_block
 import requests
 import urllib.parse
 from typing import List, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
 
 class YunsoSearch(BaseSearch):
     """天翼搜搜索实现"""
@@ -37,38 +40,23 @@ class YunsoSearch(BaseSearch):
                 headers={'Connection': 'keep-alive'}
             )
             response.raise_for_status()
-            data = response.json()
+            data = self.parse_json(response)
 
             # 转换为标准格式，只保留夸克盘结果
-            return {
-                "list": [{
-                    "messageId": str(item.get("ScrID", "")),
-                    "title": item.get("ScrName", ""),
-                    "pubDate": "2022-11-03T14:07:54+00:00",
-                    "content": item.get("ScrName", ""),
-                    "image": "",
-                    "cloudLinks": [{
-                        "link": (
-                            item.get("Scrurl", "") + f"?pwd={item.get('Scrpass')}"
-                            if item.get("Scrpass") else item.get("Scrurl", "")
-                        ),
-                        "cloudType": self.detect_cloud_type(item.get("Scrurl", ""))
-                    }],
-                    "tags": [],
-                    "magnetLink": "",
-                    "channel": "云桥计划",
-                    "channelId": "yunso"
-                } for item in data.get("Data", []) if item.get("Scrurlname") == "夸克"],
-                "channelInfo": {
-                    "id": "yunso",
-                    "name": "云桥计划",
-                    "index": 1000,
-                    "channelLogo": ""
-                },
-                "id": "yunso",
-                "index": 1000
-            }
+            return result_block("yunso", "云桥计划", 1000, [SearchResult(
+                messageId=str(item.get("ScrID", "")),
+                title=item.get("ScrName", ""),
+                pubDate="2022-11-03T14:07:54+00:00",
+                content=item.get("ScrName", ""),
+                cloudLinks=[CloudLink(
+                    item.get("Scrurl", "") + f"?pwd={item.get('Scrpass')}"
+                    if item.get("Scrpass") else item.get("Scrurl", ""),
+                    self.detect_cloud_type(item.get("Scrurl", ""))
+                )],
+                channel="云桥计划",
+                channelId="yunso"
+            ) for item in data.get("Data", []) if item.get("Scrurlname") == "夸克"])
 
         except Exception as e:
-            print(f"API请求失败: {str(e)}")
-            return []
+            logger.error("API请求失败: %s", e)
+            return result_block("yunso", "云桥计划", 1000, [])
@@ -1,21 +1,72 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from typing import List, Dict, Any
+from .cache import detail_cache
+from . import http_client
+from . import json_backend
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# 插件输出约定：结果条目与网盘链接。字段名即接口返回的 JSON 键名，
+# 由 json_backend 直接序列化（orjson / msgspec 原生支持 dataclass），不再逐条构建 dict
+@dataclass(slots=True)
+class CloudLink:
+    link: str
+    cloudType: str
+    password: str = ""
+
+
+@dataclass(slots=True)
+class SearchResult:
+    messageId: str
+    title: str
+    pubDate: str = ""
+    content: str = ""
+    image: str = ""
+    cloudLinks: List[CloudLink] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    magnetLink: str = ""
+    channel: str = ""
+    channelId: str = ""
+
+
+def result_block(channel_id: str, name: str, index: int, items: List[SearchResult], **extra) -> Dict[str, Any]:
+    """插件的返回结构，所有插件统一使用；extra 为附加到块上的额外字段"""
+    block = {
+        "list": items,
+        "channelInfo": {
+            "id": channel_id,
+            "name": name,
+            "index": index,
+            "channelLogo": ""
+        },
+        "id": channel_id,
+        "index": index
+    }
+    block.update(extra)
+    return block
+
 
 class BaseSearch(ABC):
     """搜索基类，支持多线程调用"""
 
     @abstractmethod
-    def search(self, keyword: str) -> List[Dict[str, Any]]:
+    def search(self, keyword: str) -> Dict[str, Any]:
         """执行搜索并返回格式化结果
 
         Args:
             keyword: 搜索关键词
 
         Returns:
-            标准化的结果列表
+            result_block() 结构，list 中为 SearchResult
         """
         pass
 
+    async def aclose(self):
+        """应用关闭时调用，释放插件自己创建的连接池等资源，默认无需处理"""
+
     def detect_cloud_type(self, url: str) -> str:
         """根据URL判断云盘类型，所有子类统一调用"""
         if not url:
@@ -40,6 +91,10 @@ class BaseSearch(ABC):
             return "xunlei"
         return ""
 
+    def parse_json(self, response) -> Any:
+        """解析接口响应体（替代 response.json()），使用 config.yaml 中配置的 JSON 后端"""
+        return json_backend.response_json(response)
+
     def _clean_html(self, text):
         """通用HTML标签清理"""
         import re
@@ -49,17 +104,14 @@ class BaseSearch(ABC):
         """
         从BeautifulSoup对象中提取所有支持的云盘链接
         :param soup: BeautifulSoup对象
-        :return: [{'link': url, 'cloudType': type}, ...]
+        :return: [CloudLink, ...]
         """
         links = []
         for a in soup.find_all('a', href=True):
             link = a['href']
             cloud_type = self.detect_cloud_type(link)
             if cloud_type:
-                links.append({
-                    "link": link,
-                    "cloudType": cloud_type
-                })
+                links.append(CloudLink(link, cloud_type))
         return links
 
     def _batch_fetch_details(self, tasks, func, max_workers=8):
@@ -69,19 +121,33 @@ class BaseSearch(ABC):
         import concurrent.futures
         results = [None] * len(tasks)
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_idx = {executor.submit(func, task): i for i, task in enumerate(tasks)}
+            future_to_idx = {http_client.submit(executor, func, task): i for i, task in enumerate(tasks)}
             for future in concurrent.futures.as_completed(future_to_idx):
                 idx = future_to_idx[future]
                 try:
                     result = future.result()
                     results[idx] = result
                 except Exception as e:
-                    print(f"batch_fetch_details error: {str(e)}")
+                    logger.warning("batch_fetch_details error: %s", e)
         return [r for r in results if r]
 
+    def _fetch_detail_cached(self, url, fetch_func, is_negative=None):
+        """
+        按详情页URL缓存解析结果，同一详情页被不同关键词搜到时只解析一次
+        :param url: 详情页URL（缓存key，按插件区分）
+        :param fetch_func: 实际解析函数，参数为url
+        :param is_negative: 可选，判定结果无效（写入负缓存）的函数，默认结果为假值即无效
+        fetch_func 抛出的异常不缓存，由调用方处理
+        """
+        return detail_cache.get_or_fetch(
+            (self.__class__.__name__, url),
+            lambda: fetch_func(url),
+            is_negative=is_negative
+        )
+
     def _resolve_json_chain(self, data, chain, match_func=None, nuxt_json=None):
         """
-        通用链式 JSON 路径解析工具
+        通用链式 JSON 路径解析工具（逐步解释执行；固定路径请用 index.nuxt.compile_json_chain 预编译）
         :param data: 初始 JSON 数据
         :param chain: 操作链 [("key"/"idx"/"list"/"origin"/"match", value), ...]
         :param match_func: 可选，处理 match 类型的自定义函数，参数(data, val)
@@ -120,7 +186,7 @@ class BaseSearch(ABC):
                     return None
             return data
         except Exception as e:
-            print(f"resolve_json_chain 解析失败: {str(e)}")
+            logger.warning("resolve_json_chain 解析失败: %s", e)
             return None
 
     def get_random_ua(self):
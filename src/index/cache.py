@@ -0,0 +1,207 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+def estimate_size(obj: Any, _depth: int = 0) -> int:
+    """估算对象占用的内存字节数（递归统计常见容器，深度有限）"""
+    size = sys.getsizeof(obj)
+    if _depth >= 6:
+        return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            size += estimate_size(v, _depth + 1)
+    return size
+
+
+class _Flight:
+    """进行中的一次获取，等待者共享其结果或异常"""
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """线程安全的 LRU + TTL 缓存，支持负缓存（确定无效的结果以较短 TTL 记录，避免反复请求）
+
+    设置 max_bytes 时按估算内存占用限制总量，超出时淘汰最久未使用的条目。
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600, negative_ttl: float = 300,
+                 max_bytes: Optional[int] = None, sizeof: Callable[[Any], int] = estimate_size):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        # key -> (过期时间, 值, 是否负缓存, 估算字节数)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        # 正在获取中的key，同一key并发请求只发起一次
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: Hashable, record: bool = True):
+        """查询缓存
+
+        Args:
+            record: 为 False 时不计入命中统计、不调整 LRU 顺序（用于预热等内部探测）
+
+        Returns:
+            (是否命中, 值)；负缓存命中时返回 (True, None)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                if record:
+                    self.misses += 1
+                return False, None
+            expire_at, value, negative, _ = entry
+            if expire_at <= now:
+                self._remove(key)
+                if record:
+                    self.misses += 1
+                return False, None
+            if record:
+                self._data.move_to_end(key)
+                self.hits += 1
+            return True, None if negative else value
+
+    def peek(self, key: Hashable) -> bool:
+        """是否有未过期的条目（含负缓存），不计入命中统计"""
+        return self.lookup(key, record=False)[0]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        found, value = self.lookup(key)
+        if not found or value is None:
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._store(key, value, ttl if ttl is not None else self.ttl, False)
+
+    def set_negative(self, key: Hashable, ttl: Optional[float] = None):
+        """记录失败结果，在 negative_ttl 内不再重复获取"""
+        self._store(key, None, ttl if ttl is not None else self.negative_ttl, True)
+
+    def _store(self, key, value, ttl, negative):
+        size = self.sizeof(value) if self.max_bytes is not None and not negative else 0
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (time.time() + ttl, value, negative, size)
+            self.bytes += size
+            while len(self._data) > self.maxsize or \
+                    (self.max_bytes is not None and self.bytes > self.max_bytes and len(self._data) > 1):
+                _, entry = self._data.popitem(last=False)
+                self.bytes -= entry[3]
+
+    def _remove(self, key):
+        """删除条目并扣减字节数（调用方持有锁）"""
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[3]
+        return entry
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._remove(key)
+        if entry is None or entry[2]:
+            return default
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def purge_expired(self) -> int:
+        """清理所有已过期条目，返回清理数量"""
+        now = time.time()
+        with self._lock:
+            expired = [k for k, entry in self._data.items() if entry[0] <= now]
+            for k in expired:
+                self._remove(k)
+        return len(expired)
+
+    def get_or_fetch(self, key: Hashable, fetch_func: Callable[[], Any],
+                     is_negative: Optional[Callable[[Any], bool]] = None) -> Any:
+        """命中则直接返回，否则调用 fetch_func 获取并缓存
+
+        同一key的并发调用只会执行一次 fetch_func，其余调用等待并共享其结果或异常。
+        结果被 is_negative 判定为无效（默认：结果为假值）时写入负缓存；
+        fetch_func 抛出的异常（超时、连接失败等）不缓存，直接向上抛出，下次调用会重新获取。
+        """
+        found, value = self.lookup(key)
+        if found:
+            return value
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._inflight[key] = _Flight()
+
+        if not owner:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = fetch_func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            negative = is_negative(value) if is_negative else not value
+            if negative:
+                self.set_negative(key)
+            else:
+                self.set(key, value)
+            flight.value = value
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key: Hashable):
+        return self.lookup(key)[0]
+
+
+# 详情页解析结果缓存（详情URL -> 网盘链接/密码/图片等），独立于关键词搜索缓存，跨关键词共享
+DETAIL_CACHE_MAXSIZE = 8192
+DETAIL_CACHE_TTL = 6 * 3600
+DETAIL_CACHE_NEGATIVE_TTL = 10 * 60
+
+detail_cache = TTLCache(
+    maxsize=DETAIL_CACHE_MAXSIZE,
+    ttl=DETAIL_CACHE_TTL,
+    negative_ttl=DETAIL_CACHE_NEGATIVE_TTL
+)
@@ -0,0 +1,280 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterable, Optional
+
+import requests
+
+try:
+    import httpx
+except ImportError:  # 可选依赖
+    httpx = None
+
+
+# 当前搜索请求的截止时间（time.monotonic()），由主程序按插件超时设置，
+# 所有插件的 HTTP 请求据此限制单次超时、重试与对冲，不会超出外层任务的超时时间
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("search_deadline", default=None)
+
+# 对冲请求使用的共享线程池
+_hedge_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="http-hedge")
+
+
+class DeadlineExceeded(Exception):
+    """剩余时间不足以再发起请求"""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """在 with 块内设置截止时间，已有更早的截止时间时保持不变"""
+    with deadline_at(time.monotonic() + seconds):
+        yield
+
+
+@contextmanager
+def deadline_at(when: float):
+    """同 deadline，参数为绝对截止时间（time.monotonic()）"""
+    current = _deadline.get()
+    token = _deadline.set(when if current is None else min(current, when))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def run_with_deadline(when: float, func: Callable, *args, **kwargs):
+    """
+    在截止时间内执行同步函数（供 asyncio.to_thread 使用）
+    :param when: 绝对截止时间（time.monotonic()），应在提交任务时计算，在线程池中排队的时间同样计入
+    """
+    with deadline_at(when):
+        return func(*args, **kwargs)
+
+
+def remaining() -> Optional[float]:
+    """距截止时间的剩余秒数，未设置截止时间时返回 None"""
+    current = _deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def submit(executor, fn: Callable, *args, **kwargs):
+    """提交到线程池并携带当前上下文（截止时间），线程池默认不传递 contextvars"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def classify_exception(exc: BaseException) -> str:
+    """异常分类: timeout / connect / error"""
+    if isinstance(exc, requests.exceptions.Timeout) or (httpx and isinstance(exc, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(exc, requests.exceptions.ConnectionError) or (httpx and isinstance(exc, httpx.NetworkError)):
+        return "connect"
+    return "error"
+
+
+def classify_response(resp) -> str:
+    """响应分类: ok / forbidden / throttled / server / client"""
+    status = resp.status_code
+    if status < 400:
+        return "ok"
+    if status == 403:
+        return "forbidden"
+    if status == 429:
+        return "throttled"
+    if status >= 500:
+        return "server"
+    return "client"
+
+
+class RetryPolicy:
+    """
+    截止时间感知的重试/对冲策略
+    - 单次请求超时取 min(timeout, 剩余时间)，剩余时间不足 min_attempt_time 时不再发起请求
+    - 仅对 retry_on 中的错误类型重试（默认连接失败/超时/429/5xx，403 通常是反爬，重试无意义）
+    - 退避等待不会超出截止时间
+    - hedge_after 秒内未返回时发出一个重复请求，取先返回的结果
+    call 用于同步请求（对冲请求在共享线程池中发出），acall 用于异步请求（在事件循环中等待，落后的请求会被取消）
+    """
+
+    def __init__(self, max_attempts: int = 2, timeout: float = 15, backoff: float = 0.2,
+                 max_backoff: float = 2.0, min_attempt_time: float = 0.5,
+                 retry_on: Iterable[str] = ("connect", "timeout", "throttled", "server"),
+                 hedge_after: Optional[float] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.min_attempt_time = min_attempt_time
+        self.retry_on = frozenset(retry_on)
+        self.hedge_after = hedge_after
+
+    def _attempt_timeout(self, timeout: float) -> Optional[float]:
+        left = remaining()
+        if left is None:
+            return timeout
+        if left < self.min_attempt_time:
+            return None
+        return min(timeout, left)
+
+    def call(self, send: Callable[[float], object], timeout: Optional[float] = None):
+        """
+        按策略执行请求
+        :param send: 发起一次请求的函数，参数为本次请求的超时时间（秒），返回响应对象
+        :param timeout: 单次请求超时上限，默认使用策略的 timeout
+        :return: 最后一次响应（可能为不可重试或重试用尽的错误状态码，由调用方判断）
+        """
+        timeout = timeout or self.timeout
+        last_exc, last_resp = None, None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                delay = self._backoff_delay(attempt)
+                if delay is None:
+                    break
+                time.sleep(delay)
+            attempt_timeout = self._attempt_timeout(timeout)
+            if attempt_timeout is None:
+                break
+            try:
+                resp = self._send(send, attempt_timeout, timeout)
+            except Exception as e:
+                if classify_exception(e) not in self.retry_on:
+                    raise
+                last_exc, last_resp = e, None
+                continue
+            if classify_response(resp) not in self.retry_on:
+                return resp
+            last_resp = resp
+        return self._give_up(last_resp, last_exc)
+
+    async def acall(self, send: Callable[[float], Awaitable], timeout: Optional[float] = None):
+        """
+        call 的异步版本
+        :param send: 发起一次请求的协程函数，参数为本次请求的超时时间（秒），返回响应对象
+        """
+        timeout = timeout or self.timeout
+        last_exc, last_resp = None, None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                delay = self._backoff_delay(attempt)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+            attempt_timeout = self._attempt_timeout(timeout)
+            if attempt_timeout is None:
+                break
+            try:
+                resp = await self._asend(send, attempt_timeout, timeout)
+            except Exception as e:
+                if classify_exception(e) not in self.retry_on:
+                    raise
+                last_exc, last_resp = e, None
+                continue
+            if classify_response(resp) not in self.retry_on:
+                return resp
+            last_resp = resp
+        return self._give_up(last_resp, last_exc)
+
+    def _backoff_delay(self, attempt: int) -> Optional[float]:
+        """第 attempt 次重试前的退避时间，等待后剩余时间不足时返回 None"""
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        left = remaining()
+        if left is not None and left - delay < self.min_attempt_time:
+            return None
+        return delay
+
+    @staticmethod
+    def _give_up(last_resp, last_exc):
+        if last_resp is not None:
+            return last_resp
+        if last_exc is not None:
+            raise last_exc
+        raise DeadlineExceeded("请求剩余时间不足")
+
+    def _send(self, send, attempt_timeout: float, timeout: float):
+        if not self.hedge_after or self.hedge_after >= attempt_timeout:
+            return send(attempt_timeout)
+        started = threading.Event()
+        start_time = []
+
+        def first_send():
+            start_time.append(time.monotonic())
+            started.set()
+            # 线程池繁忙时请求可能排队，超时按开始执行时的剩余时间重新计算
+            left = self._attempt_timeout(timeout)
+            if left is None:
+                raise DeadlineExceeded("请求剩余时间不足")
+            return send(min(left, attempt_timeout))
+
+        first = submit(_hedge_executor, first_send)
+        # 对冲计时从首个请求开始执行时算起，排队时间不计入，避免线程池饱和时为尚未发出的请求对冲
+        hedge_timeout = None
+        if started.wait(attempt_timeout):
+            wait_time = self.hedge_after - (time.monotonic() - start_time[0])
+            done, _ = wait([first], timeout=max(0.0, wait_time))
+            if not done:
+                hedge_timeout = self._attempt_timeout(timeout)
+        if hedge_timeout is None:
+            return first.result()
+        # 慢尾请求：发出一个重复请求，谁先成功用谁
+        pending = {first, submit(_hedge_executor, send, hedge_timeout)}
+        last_exc = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_exc = e
+        raise last_exc
+
+    async def _asend(self, send, attempt_timeout: float, timeout: float):
+        if not self.hedge_after or self.hedge_after >= attempt_timeout:
+            return await send(attempt_timeout)
+        tasks = [asyncio.ensure_future(send(attempt_timeout))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            hedge_timeout = None if done else self._attempt_timeout(timeout)
+            if hedge_timeout is None:
+                return await tasks[0]
+            # 慢尾请求：发出一个重复请求，谁先成功用谁
+            tasks.append(asyncio.ensure_future(send(hedge_timeout)))
+            pending, last_exc = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_exc = e
+            raise last_exc
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+def request_with_retry(method: str, url: str, session=None, policy: Optional[RetryPolicy] = None, **kwargs):
+    """
+    按重试策略发送请求，用法同 requests.request
+    :param session: requests.Session / httpx.Client，默认使用 requests 模块
+    :param kwargs: 其中 timeout 为单次请求超时上限
+    """
+    session = session or requests
+    policy = policy or DEFAULT_POLICY
+    timeout = kwargs.pop("timeout", None)
+    return policy.call(lambda t: session.request(method, url, timeout=t, **kwargs), timeout)
+
+
+async def arequest_with_retry(method: str, url: str, client, policy: Optional[RetryPolicy] = None, **kwargs):
+    """
+    request_with_retry 的异步版本
+    :param client: httpx.AsyncClient
+    """
+    policy = policy or DEFAULT_POLICY
+    timeout = kwargs.pop("timeout", None)
+    return await policy.acall(lambda t: client.request(method, url, timeout=t, **kwargs), timeout)
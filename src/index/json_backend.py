@@ -0,0 +1,136 @@
+"""
+可替换的 JSON 编解码后端：orjson > msgspec > 标准库，按安装情况自动选择，也可在 config.yaml 中指定
+
+- dumps 输出紧凑的 UTF-8 字节（不转义非 ASCII 字符），与 JSONResponse 一致，支持 dataclass
+- loads 接受 bytes / str，解析失败统一抛出 ValueError，调用方无需关心后端
+"""
+import dataclasses
+import json
+import re
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # 可选依赖
+    msgspec = None
+
+
+def _stdlib_default(obj: Any) -> Any:
+    """标准库不支持 dataclass（如 index.base.SearchResult），按字段浅层转换，嵌套值由 json 继续处理"""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_stdlib_default).encode("utf-8")
+
+
+def _stdlib_loads(data):
+    return json.loads(data)
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _make_msgspec() -> Tuple[Callable, Callable]:
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def loads(data):
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    return encoder.encode, loads
+
+
+def _available() -> Dict[str, Tuple[Callable, Callable]]:
+    backends = {}
+    if orjson is not None:
+        # orjson.JSONDecodeError 是 ValueError 的子类
+        backends["orjson"] = (_orjson_dumps, orjson.loads)
+    if msgspec is not None:
+        backends["msgspec"] = _make_msgspec()
+    backends["json"] = (_stdlib_dumps, _stdlib_loads)
+    return backends
+
+
+BACKENDS = _available()
+backend = next(iter(BACKENDS))
+dumps, loads = BACKENDS[backend]
+
+
+def use(name: Optional[str] = "auto") -> str:
+    """切换后端，auto 按 orjson > msgspec > json 选择；指定的后端未安装时回退到 auto，返回实际使用的后端"""
+    global backend, dumps, loads
+    if not name or name == "auto" or name not in BACKENDS:
+        name = next(iter(BACKENDS))
+    backend = name
+    dumps, loads = BACKENDS[name]
+    return backend
+
+
+def response_json(response) -> Any:
+    """解析 requests / httpx 响应体，替代 response.json()"""
+    return loads(response.content)
+
+
+# 跳过字符串（含转义）并定位括号，用于跟踪嵌套深度
+_TOKEN_REGEX = re.compile(rb'"(?:[^"\\]|\\.)*"|[\[\]{}]')
+_ARRAY_VALUE_REGEX = re.compile(rb'\s*:\s*\[')
+
+
+def _find_array(body: bytes, key: str) -> Optional[Tuple[int, int]]:
+    """
+    定位顶层对象中 key 对应数组的 [ 和与之匹配的 ] 的位置
+    键不存在、值不是数组、键重复或括号不配对时返回 None
+    """
+    literal = b'"' + key.encode("utf-8") + b'"'
+    depth = 0
+    start = end = None
+    for m in _TOKEN_REGEX.finditer(body):
+        token = m.group()
+        if token[0] == 0x22:  # 字符串
+            # 顶层对象中紧跟 ": [" 的字符串一定是键（值后面不会出现冒号）
+            if depth == 1 and token == literal:
+                value = _ARRAY_VALUE_REGEX.match(body, m.end())
+                if value is None or start is not None:
+                    return None
+                start = value.end() - 1
+        elif token in (b"{", b"["):
+            depth += 1
+        else:
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 1 and start is not None and end is None and token == b"]":
+                end = m.start()
+    if depth != 0 or end is None:
+        return None
+    return start, end
+
+
+def splice_array_member(body: bytes, key: str, items: bytes) -> Optional[bytes]:
+    """
+    不解码地把若干 JSON 值追加到顶层对象中 key 对应数组的末尾
+    从 "key": [ 处做括号匹配找到数组真正的结尾，key 不必是最后一个成员；
+    结构不符合时返回 None，由调用方回退到解码合并
+    :param items: 逗号分隔的已序列化 JSON 值（不含外层方括号）
+    """
+    if not items or not body.lstrip().startswith(b"{"):
+        return None
+    span = _find_array(body, key)
+    if span is None:
+        return None
+    start, end = span
+    empty = not body[start + 1:end].strip()
+    return b"".join((body[:end], b"" if empty else b",", items, body[end:]))
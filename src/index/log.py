@@ -0,0 +1,173 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# 插件日志记录器前缀，插件内统一使用 logging.getLogger(__name__)
+PLUGIN_LOGGER_PREFIXES = ("index.api.", "index.render_spider.")
+# 第三方库默认只输出警告以上
+DEFAULT_LOGGER_LEVELS = {
+    "httpx": "WARNING",
+    "httpcore": "WARNING",
+    "urllib3": "WARNING",
+    "hpack": "WARNING",
+}
+
+
+class _LazyQueueHandler(QueueHandler):
+    """入队时不格式化消息，格式化（含 % 参数拼接与异常堆栈）在后台线程中完成"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    警告及以上日志按 (记录器, 消息模板) 限流，避免同一错误在逐条处理循环中刷屏
+    - 每个 interval 秒内前 burst 条照常输出，之后按 sample_rate 抽样
+    - 被丢弃的条数附加在该模板下一条输出的日志上
+    消息需使用 % 参数（logger.error("失败: %s", e)）而非 f-string，同一模板才能归为一类
+    """
+
+    def __init__(self, interval: float = 60, burst: int = 5, sample_rate: float = 0.0,
+                 min_level: int = logging.WARNING):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.sample_rate = sample_rate
+        self.min_level = min_level
+        # (记录器, 模板) -> [窗口开始时间, 窗口内条数, 已丢弃条数]
+        self._buckets: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+        key = (record.name, record.msg if isinstance(record.msg, str) else str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or now - bucket[0] >= self.interval:
+                suppressed = bucket[2] if bucket else 0
+                bucket = self._buckets[key] = [now, 0, 0]
+                if len(self._buckets) > 10000:
+                    self._prune(now)
+            else:
+                suppressed = bucket[2]
+            bucket[1] += 1
+            if bucket[1] > self.burst and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+                bucket[2] += 1
+                return False
+            bucket[2] = 0
+        record.suppressed = suppressed
+        return True
+
+    def _prune(self, now: float):
+        for key in [k for k, b in self._buckets.items() if now - b[0] >= self.interval]:
+            del self._buckets[key]
+
+
+class TextFormatter(logging.Formatter):
+    """文本格式，限流丢弃的条数追加在消息末尾"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" (已省略 {suppressed} 条相同日志)"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """每行一个 JSON 对象，便于日志采集"""
+
+    # LogRecord 自带属性，其余属性视为 extra 字段输出
+    _RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self._RESERVED and not key.startswith("_"):
+                data[key] = value
+        if not data.get("suppressed"):
+            data.pop("suppressed", None)
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(cfg: Optional[Dict[str, Any]] = None) -> QueueListener:
+    """
+    按配置初始化日志：根记录器只挂一个 QueueHandler，格式化与输出在后台线程完成
+    :param cfg: config.yaml 中的 logging 配置段
+    """
+    global _listener
+    cfg = cfg or {}
+    stop_logging()
+
+    fmt = cfg.get("format", "text")
+    if fmt == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = TextFormatter(DEFAULT_FORMAT if fmt == "text" else fmt)
+
+    handlers = []
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+    handlers.append(stream_handler)
+    if cfg.get("file"):
+        file_handler = logging.FileHandler(cfg["file"], encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    queue_handler = _LazyQueueHandler(queue.SimpleQueue())
+    rate_cfg = cfg.get("rate_limit") or {}
+    if rate_cfg.get("enabled", True):
+        queue_handler.addFilter(RateLimitFilter(
+            interval=rate_cfg.get("interval", 60),
+            burst=rate_cfg.get("burst", 5),
+            sample_rate=rate_cfg.get("sample_rate", 0.0),
+            min_level=logging.getLevelName(rate_cfg.get("min_level", "WARNING")),
+        ))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(cfg.get("level", "INFO"))
+
+    for name, level in {**DEFAULT_LOGGER_LEVELS, **(cfg.get("loggers") or {})}.items():
+        logging.getLogger(name).setLevel(level)
+    # 插件级别：按插件名设置，如 fox4k: DEBUG
+    for name, level in (cfg.get("plugins") or {}).items():
+        for prefix in PLUGIN_LOGGER_PREFIXES:
+            logging.getLogger(prefix + name).setLevel(level)
+
+    _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """停止后台线程并输出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,130 @@
+from . import json_backend
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+
+class NuxtPayload:
+    """__NUXT_DATA__（devalue 格式）载荷
+
+    devalue 把整个状态树打平为一个数组，对象/数组中的值均为指向该数组的下标。
+    每个页面只解析一次，引用在查找时按需解引用，同一页面的所有路径结果按页面缓存复用。
+    """
+    __slots__ = ("raw", "_resolved")
+
+    def __init__(self, raw: Any):
+        self.raw = raw if isinstance(raw, list) else []
+        # CompiledChain -> 解析结果
+        self._resolved = {}
+
+    @classmethod
+    def from_json(cls, text: str) -> "NuxtPayload":
+        return cls(json_backend.loads(text))
+
+    def deref(self, ref: Any) -> Any:
+        """解引用；负数为 devalue 的特殊常量（undefined/NaN 等），统一返回 None"""
+        if type(ref) is not int:
+            return ref
+        if ref < 0:
+            return None
+        return self.raw[ref]
+
+    def resolve(self, chain: "CompiledChain") -> Any:
+        """按编译后的路径从根解析，结果按页面缓存"""
+        try:
+            return self._resolved[chain]
+        except KeyError:
+            value = self._resolved[chain] = chain(self)
+            return value
+
+    def __bool__(self):
+        return bool(self.raw)
+
+
+def match_key_contains(data: Any, val: str) -> Any:
+    """match 步骤的常用实现：返回第一个 key 包含 val 的值"""
+    if isinstance(data, dict):
+        for k, v in data.items():
+            if isinstance(k, str) and val in k:
+                return v
+    return None
+
+
+class _ChainError(Exception):
+    pass
+
+
+def _compile_step(typ: str, val: Any, deref: bool, match_func: Optional[Callable]) -> Callable:
+    """把 (操作, 参数) 及其后的 origin 编译为一个函数 (data, raw) -> data"""
+    if typ == "key":
+        if deref:
+            def step(data, raw):
+                if type(data) is not dict:
+                    raise _ChainError
+                return raw[data[val]]
+        else:
+            def step(data, raw):
+                if type(data) is not dict:
+                    raise _ChainError
+                return data[val]
+    elif typ in ("idx", "list"):
+        allow_empty = typ == "list"
+        if deref:
+            def step(data, raw):
+                if type(data) is not list or not (data or allow_empty):
+                    raise _ChainError
+                return raw[data[val]]
+        else:
+            def step(data, raw):
+                if type(data) is not list or not (data or allow_empty):
+                    raise _ChainError
+                return data[val]
+    elif typ == "match":
+        if match_func is None:
+            raise ValueError("match 步骤需要提供 match_func")
+        if deref:
+            def step(data, raw):
+                return raw[match_func(data, val)]
+        else:
+            def step(data, raw):
+                return match_func(data, val)
+    elif typ == "origin":
+        def step(data, raw):
+            return raw[data]
+    else:
+        raise ValueError(f"未知的路径步骤: {typ}")
+    return step
+
+
+class CompiledChain:
+    """编译后的 JSON 路径，语义与 BaseSearch._resolve_json_chain 一致
+
+    ("key"/"idx"/"list"/"match", v) 与其后的 ("origin", None) 合并为一步；
+    解析失败返回 None，不逐步捕获异常、不打印日志。
+    """
+    __slots__ = ("chain", "_steps")
+
+    def __init__(self, chain: Iterable[Tuple[str, Any]], match_func: Optional[Callable] = None):
+        self.chain = tuple(chain)
+        self._steps = []
+        i = 0
+        while i < len(self.chain):
+            typ, val = self.chain[i]
+            deref = typ != "origin" and i + 1 < len(self.chain) and self.chain[i + 1][0] == "origin"
+            self._steps.append(_compile_step(typ, val, deref, match_func))
+            i += 2 if deref else 1
+
+    def __call__(self, payload: Any, data: Any = None) -> Any:
+        """从载荷根（或给定的中间结果 data）开始解析；payload 可为 NuxtPayload 或原始列表"""
+        raw = payload.raw if isinstance(payload, NuxtPayload) else payload
+        if data is None:
+            data = raw
+        try:
+            for step in self._steps:
+                data = step(data, raw)
+            return data
+        except (_ChainError, LookupError, TypeError):
+            return None
+
+
+def compile_json_chain(chain: Iterable[Tuple[str, Any]], match_func: Optional[Callable] = None) -> CompiledChain:
+    """编译路径链，建议在类/模块级别编译一次后复用"""
+    return CompiledChain(chain, match_func)
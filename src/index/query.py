@@ -0,0 +1,97 @@
+"""
+搜索关键词规范化：等价的查询得到同一规范形式，用于结果缓存、并发请求合并与预热去重
+
+- Unicode NFKC（全角字母/数字/标点转半角，兼容字符展开）
+- 繁体转简体（需安装 opencc，未安装时跳过）
+- 英文统一小写
+- 标点折叠：中文之间的间隔号/连接号直接去掉，其余标点视为空白
+- 季/集标记统一为“第N季”“第N集”（第二季 / S2 / Season 02 / 第02季 → 第2季，EP12 / 第十二话 → 第12集）
+- 连续空白合并为一个空格
+
+规范化是幂等的：canonicalize(canonicalize(s)) == canonicalize(s)
+matches 按规范形式判断文本是否包含关键词的每个词，用于插件结果的相关性过滤
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Optional
+
+try:
+    import opencc
+except ImportError:  # 可选依赖
+    opencc = None
+
+_converter = opencc.OpenCC("t2s") if opencc is not None else None
+
+_CN_DIGITS = {"零": 0, "〇": 0, "一": 1, "二": 2, "两": 2, "三": 3, "四": 4,
+              "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+_NUMBER = r"[零〇一二两三四五六七八九十百\d]+"
+
+_CJK = r"㐀-䶿一-鿿"
+# 中文名字中的间隔号/连接号（哈利·波特、进击の巨人 等写法不一），直接去掉
+_CJK_JOINER_REGEX = re.compile(rf"(?<=[{_CJK}])\s*[·・•‧\-—_]+\s*(?=[{_CJK}])")
+_APOSTROPHES = str.maketrans("", "", "'’‘`")
+
+_SEASON_EPISODE_REGEX = re.compile(r"(?<![a-z0-9])s0*(\d{1,2})\s*e0*(\d{1,4})(?![a-z0-9])")
+_SEASON_REGEX = re.compile(
+    rf"第\s*({_NUMBER})\s*季|(?<![a-z0-9])(?:season\s*|s)0*(\d{{1,2}})(?![a-z0-9])")
+_EPISODE_REGEX = re.compile(
+    rf"第\s*({_NUMBER})\s*[集话話回]|(?<![a-z0-9])(?:episode\s*|ep\s*)0*(\d{{1,4}})(?![a-z0-9])")
+
+
+def _parse_number(text: str) -> Optional[int]:
+    """阿拉伯数字或中文数字（最多到百位）"""
+    if text.isdecimal():
+        return int(text)
+    total, num = 0, 0
+    for ch in text:
+        if ch == "百":
+            total += (num or 1) * 100
+            num = 0
+        elif ch == "十":
+            total += (num or 1) * 10
+            num = 0
+        elif ch in _CN_DIGITS:
+            num = _CN_DIGITS[ch]
+        elif ch.isdecimal():
+            num = num * 10 + int(ch)
+        else:
+            return None
+    return total + num
+
+
+def _marker(unit: str):
+    def replace(m: "re.Match") -> str:
+        text = m.group(1) or m.group(2)
+        n = _parse_number(text)
+        # 无法解析的数字保持原样
+        return m.group(0) if n is None else f" 第{n}{unit} "
+    return replace
+
+
+_season = _marker("季")
+_episode = _marker("集")
+
+
+def _fold_punctuation(text: str) -> str:
+    text = _CJK_JOINER_REGEX.sub("", text.translate(_APOSTROPHES))
+    return "".join(" " if unicodedata.category(ch).startswith("P") else ch for ch in text)
+
+
+@lru_cache(maxsize=4096)
+def canonicalize(keyword: str) -> str:
+    """返回关键词的规范形式，空白或纯标点的关键词返回空串"""
+    text = unicodedata.normalize("NFKC", keyword or "")
+    if _converter is not None:
+        text = _converter.convert(text)
+    text = _fold_punctuation(text.casefold())
+    text = _SEASON_EPISODE_REGEX.sub(lambda m: f" 第{int(m.group(1))}季 第{int(m.group(2))}集 ", text)
+    text = _SEASON_REGEX.sub(_season, text)
+    text = _EPISODE_REGEX.sub(_episode, text)
+    return " ".join(text.split())
+
+
+def matches(keyword: str, text: str) -> bool:
+    """text 是否包含关键词规范形式中的每个词（同样先规范化，不经过缓存，避免结果文本挤占关键词缓存）"""
+    target = canonicalize.__wrapped__(text)
+    return all(token in target for token in canonicalize(keyword).split())
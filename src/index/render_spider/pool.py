@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Callable, Iterable, List, Optional
+
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger(__name__)
+
+try:
+    from playwright_stealth import Stealth
+except ImportError:  # 可选依赖
+    Stealth = None
+
+
+# 渲染搜索不需要的资源类型
+DEFAULT_BLOCK_RESOURCE_TYPES = ("image", "font", "media")
+# 统计/广告脚本
+DEFAULT_BLOCK_URL_PATTERNS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "hm.baidu.com",
+    "cnzz.com",
+    "51.la",
+    "clarity.ms",
+)
+DEFAULT_LAUNCH_ARGS = (
+    '--disable-blink-features=AutomationControlled',
+    '--disable-web-security',
+    '--disable-features=IsolateOrigins,site-per-process',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+)
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36'
+
+
+class BrowserPool:
+    """
+    常驻的 Chromium 浏览器与页面池，随应用 lifespan 启动/关闭
+    - 单个持久化 context，页面用完归还复用，避免每次搜索冷启动
+    - context 级请求拦截，屏蔽图片/字体/统计脚本
+    """
+
+    def __init__(self, pool_size: int = 2, headless: bool = True, user_data_dir: Optional[str] = None,
+                 block_resource_types: Iterable[str] = DEFAULT_BLOCK_RESOURCE_TYPES,
+                 block_url_patterns: Iterable[str] = DEFAULT_BLOCK_URL_PATTERNS,
+                 launch_args: Iterable[str] = DEFAULT_LAUNCH_ARGS,
+                 user_agent: str = DEFAULT_USER_AGENT):
+        self.pool_size = max(1, pool_size)
+        self.headless = headless
+        self.user_data_dir = os.path.expanduser(user_data_dir or "~/chrome_profile")
+        self.block_resource_types = frozenset(block_resource_types)
+        self.block_url_patterns = tuple(block_url_patterns)
+        self.launch_args = list(launch_args)
+        self.user_agent = user_agent
+        self._playwright = None
+        self.context = None
+        self._idle_pages: List = []
+        self._semaphore = asyncio.Semaphore(self.pool_size)
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self.context is not None
+
+    async def start(self):
+        """启动浏览器并预热页面，重复调用无副作用"""
+        async with self._start_lock:
+            if self.context:
+                return
+            self._playwright = await async_playwright().start()
+            self.context = await self._playwright.chromium.launch_persistent_context(
+                self.user_data_dir,
+                headless=self.headless,
+                args=self.launch_args,
+                ignore_default_args=["--enable-automation"],
+                viewport={'width': 1920, 'height': 1080},
+                ignore_https_errors=True,
+                user_agent=self.user_agent
+            )
+            if Stealth is not None:
+                await Stealth(init_scripts_only=True).apply_stealth_async(self.context)
+            await self.context.add_init_script("""
+                Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+            """)
+            if self.block_resource_types or self.block_url_patterns:
+                await self.context.route("**/*", self._route)
+            # 持久化 context 启动时自带一个空白页，直接纳入池中
+            self._idle_pages = list(self.context.pages)
+            while len(self._idle_pages) < self.pool_size:
+                self._idle_pages.append(await self.context.new_page())
+            logger.info("浏览器池已启动: %s 个页面", self.pool_size)
+
+    async def stop(self):
+        async with self._start_lock:
+            context, playwright = self.context, self._playwright
+            self.context, self._playwright = None, None
+            self._idle_pages = []
+            try:
+                if context:
+                    await context.close()
+            finally:
+                if playwright:
+                    await playwright.stop()
+
+    async def _route(self, route):
+        request = route.request
+        if request.resource_type in self.block_resource_types or \
+                any(p in request.url for p in self.block_url_patterns):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @asynccontextmanager
+    async def page(self):
+        """借出一个预热好的页面，最多同时借出 pool_size 个，用完自动归还"""
+        if not self.context:
+            await self.start()
+        async with self._semaphore:
+            page = None
+            while self._idle_pages and page is None:
+                candidate = self._idle_pages.pop()
+                if not candidate.is_closed():
+                    page = candidate
+            if page is None:
+                page = await self.context.new_page()
+            try:
+                yield page
+            finally:
+                if self.context and not page.is_closed():
+                    self._idle_pages.append(page)
+
+    async def capture_request(self, url: str, predicate: Callable[[str], bool], timeout: float = 10000,
+                              referer: Optional[str] = None) -> str:
+        """
+        在临时页面中打开 url，返回第一个满足 predicate 的请求地址（含服务端重定向和 JS 跳转），
+        命中后立即中止该请求并关闭页面，不等待目标页面加载
+        :param timeout: 毫秒，超时返回空字符串
+        """
+        if not self.context:
+            await self.start()
+        page = await self.context.new_page()
+        captured = asyncio.get_running_loop().create_future()
+
+        def on_request(request):
+            if not captured.done() and predicate(request.url):
+                captured.set_result(request.url)
+
+        async def on_route(route):
+            on_request(route.request)
+            await route.abort()
+
+        page.on("request", on_request)
+        await page.route(predicate, on_route)
+        navigation = asyncio.ensure_future(
+            page.goto(url, referer=referer, wait_until="commit", timeout=timeout))
+        # 命中后中止导航会抛出 ERR_ABORTED，忽略即可
+        navigation.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            return await asyncio.wait_for(asyncio.shield(captured), timeout / 1000)
+        except asyncio.TimeoutError:
+            return ""
+        finally:
+            navigation.cancel()
+            await page.close()
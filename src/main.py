@@ -1,6 +1,10 @@
 from contextlib import asynccontextmanager
 import asyncio
+import hashlib
 import json
+import os
+import re
+import urllib.parse
 import importlib
 import pkgutil
 import yaml
@@ -12,24 +16,29 @@ from resource.bangumi import Bangumi
 import httpx
 from httpx import Timeout
 from index.base import BaseSearch
+from index.cache import TTLCache
+from index.http_client import deadline_at, run_with_deadline
+from index.log import setup_logging
+from index.query import canonicalize
+from router import PathRouter
+from compression import CompressionMiddleware
+from index import json_backend
 import time
 import logging
+from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor
 
-# 配置日志
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-# 限制第三方库的日志级别
-logging.getLogger('httpx').setLevel(logging.WARNING)
-logging.getLogger('httpcore').setLevel(logging.WARNING)
-logging.getLogger('urllib3').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 # 加载配置文件
 with open(Path(__file__).parent.parent / "config.yaml") as f:
     config = yaml.safe_load(f)
 
+# 配置日志：输出在后台线程完成，插件级别与错误限流见 config.yaml 的 logging 配置
+setup_logging(config.get("logging"))
+
+# JSON 编解码后端：auto / orjson / msgspec / json
+json_backend.use(config.get("json_backend", "auto"))
+
 # 服务配置
 TARGET_SERVICE = config["target_service"]
 INTERCEPT_PATHS = config["intercept_paths"]
@@ -47,53 +56,78 @@ class PluginManager:
         """自动发现api目录下的搜索插件，支持vde51/taiqiongle双实例"""
         disabled_plugins = disabled_plugins or []
         api_path = Path(__file__).parent / "index" / "api"
-        print(f"搜索插件目录: {api_path}")
+        logger.info("搜索插件目录: %s", api_path)
 
         if not api_path.exists():
-            print(f"错误: 插件目录不存在 {api_path}")
+            logger.error("错误: 插件目录不存在 %s", api_path)
             return
 
         for finder, name, _ in pkgutil.iter_modules([str(api_path)]):
-            print(f"发现模块: {name}")
+            logger.debug("发现模块: %s", name)
             try:
                 module = importlib.import_module(f"index.api.{name}")
-                print(f"尝试加载模块: {name}")
+                logger.debug("尝试加载模块: %s", name)
                 for attr in dir(module):
                     try:
                         cls = getattr(module, attr)
                         if (isinstance(cls, type) and
                             issubclass(cls, BaseSearch) and
                                 cls != BaseSearch):
-                            print(f"找到搜索插件类: {cls.__name__}")
+                            logger.debug("找到搜索插件类: %s", cls.__name__)
                             if name == "vde51":
                                 # 注册vde51和taiqiongle两个实例
                                 for site_key in ["vde51", "taiqiongle"]:
                                     if site_key in disabled_plugins:
-                                        print(f"插件 {site_key} 被禁用")
+                                        logger.info("插件 %s 被禁用", site_key)
                                         continue
                                     self.search_plugins[site_key] = {
                                         'cls': cls,
                                         'enabled': site_key not in disabled_plugins,
                                         'site': "51vde" if site_key == "vde51" else "taiqiongle"
                                     }
-                                    print(f"成功注册插件: {site_key}")
+                                    logger.info("成功注册插件: %s", site_key)
                             else:
                                 if name in disabled_plugins:
-                                    print(f"插件 {name} 被禁用")
+                                    logger.info("插件 %s 被禁用", name)
                                     continue
                                 self.search_plugins[name] = {
                                     'cls': cls,
                                     'enabled': name not in disabled_plugins
                                 }
-                                print(f"成功注册插件: {name}")
+                                logger.info("成功注册插件: %s", name)
                     except Exception as e:
-                        print(f"检查类 {attr} 时出错: {str(e)}")
+                        logger.warning("检查类 %s 时出错: %s", attr, e)
                         continue
             except Exception as e:
-                print(f"加载插件 {name} 失败: {str(e)}")
+                logger.error("加载插件 %s 失败: %s", name, e)
                 continue
 
-    async def init_plugins(self, app: FastAPI):
+    def discover_render_plugins(self, names: list, disabled_plugins: list = None):
+        """注册 render_spider 目录下基于浏览器渲染的插件，名称为 <模块名>_render"""
+        disabled_plugins = disabled_plugins or []
+        for name in names:
+            plugin_name = f"{name}_render"
+            if plugin_name in disabled_plugins:
+                logger.info("插件 %s 被禁用", plugin_name)
+                continue
+            try:
+                module = importlib.import_module(f"index.render_spider.{name}")
+            except Exception as e:
+                logger.error("加载渲染插件 %s 失败: %s", name, e)
+                continue
+            for attr in dir(module):
+                cls = getattr(module, attr)
+                if (isinstance(cls, type) and issubclass(cls, BaseSearch) and
+                        cls != BaseSearch and cls.__module__ == module.__name__):
+                    self.search_plugins[plugin_name] = {
+                        'cls': cls,
+                        'enabled': True,
+                        'render': True
+                    }
+                    logger.info("成功注册渲染插件: %s", plugin_name)
+                    break
+
+    async def init_plugins(self, app: FastAPI, browser_pool=None):
         """初始化所有启用的插件"""
         self.plugin_instances = {}  # 存储插件实例
 
@@ -101,12 +135,9 @@ class PluginManager:
             if not plugin['enabled']:
                 continue
             cls = plugin['cls']
-            # 特殊处理aipan需要多个实例
-            if name == 'aipan':
-                self.plugin_instances[name] = [
-                    cls(source_id=i) for i in range(1, 9)]
-                # 仅aipan需要挂载到app.state
-                app.state.aipan_searches = self.plugin_instances[name]
+            if plugin.get('render'):
+                # 渲染插件共享应用级浏览器池
+                self.plugin_instances[name] = cls(pool=browser_pool)
             elif name in ['vde51', 'taiqiongle']:
                 # 分别初始化site参数
                 self.plugin_instances[name] = cls(
@@ -114,6 +145,14 @@ class PluginManager:
             else:
                 self.plugin_instances[name] = cls()
 
+    async def close_plugins(self):
+        """应用关闭时释放插件持有的资源"""
+        for name, inst in getattr(self, "plugin_instances", {}).items():
+            try:
+                await inst.aclose()
+            except Exception as e:
+                logger.warning("关闭插件 %s 失败: %s", name, e)
+
 
 plugin_manager = PluginManager()
 
@@ -122,6 +161,12 @@ plugin_manager = PluginManager()
 disabled_plugins = config.get("disabled_plugins", [])
 plugin_manager.discover_plugins(disabled_plugins)
 
+# 浏览器渲染插件（需安装 playwright），浏览器池随应用启动
+RENDER_SPIDER_CONFIG = config.get("render_spider") or {}
+RENDER_SPIDER_ENABLED = RENDER_SPIDER_CONFIG.get("enabled", False)
+if RENDER_SPIDER_ENABLED:
+    plugin_manager.discover_render_plugins(RENDER_SPIDER_CONFIG.get("plugins", []), disabled_plugins)
+
 # 设置自定义线程池大小（例如设置为32个线程）
 CUSTOM_THREAD_POOL_SIZE = 32
 thread_pool_executor = ThreadPoolExecutor(max_workers=CUSTOM_THREAD_POOL_SIZE)
@@ -134,12 +179,34 @@ loop.set_default_executor(thread_pool_executor)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理 - 只在应用启动和关闭时触发一次"""
-    # 初始化插件实例
-    await plugin_manager.init_plugins(app)
-    print(
-        f"已初始化插件: {[name for name, p in plugin_manager.search_plugins.items() if p['enabled']]}")
+    # 启动浏览器池并初始化插件实例
+    browser_pool = None
+    if RENDER_SPIDER_ENABLED:
+        from index.render_spider.pool import BrowserPool
+        pool_kwargs = {k: v for k, v in RENDER_SPIDER_CONFIG.items() if k not in ("enabled", "plugins")}
+        browser_pool = BrowserPool(**pool_kwargs)
+        try:
+            await browser_pool.start()
+        except Exception as e:
+            # 启动失败时插件在首次搜索时重试启动
+            logger.error("浏览器池启动失败: %s", e)
+    await plugin_manager.init_plugins(app, browser_pool)
+    logger.info("已初始化插件: %s", [name for name, p in plugin_manager.search_plugins.items() if p['enabled']])
+    # 预先加载 Bangumi 每日放送，之后的请求都直接读取内存
+    calendar_task = asyncio.create_task(Bangumi().get_bangumi_calendar())
+    # 启动 Bangumi 每日放送缓存预热任务
+    warmup_task = None
+    if BANGUMI_WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(bangumi_warmup_loop())
     yield
     # 应用关闭时的清理逻辑可以放在这里
+    calendar_task.cancel()
+    if warmup_task:
+        warmup_task.cancel()
+    await plugin_manager.close_plugins()
+    if browser_pool:
+        await browser_pool.stop()
+    await upstream_client.aclose()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -158,14 +225,31 @@ PLUGIN_SEARCH_TIMEOUT = 10
 PLUGIN_SEARCH_TIMEOUT_MAX = 23
 
 def create_search_task(search_func, use_all_plugins):
-    """创建搜索任务，非全量模式下应用超时"""
-    task = asyncio.to_thread(search_func)
-    if not use_all_plugins:
-        # 非全量模式设置超时
-        task = asyncio.wait_for(task, timeout=PLUGIN_SEARCH_TIMEOUT)
+    """创建搜索任务，非全量模式下应用超时
+
+    search_func 为同步函数时在线程池中执行，为协程（异步插件）时直接在事件循环中执行；
+    插件内的 HTTP 请求可通过 index.http_client 获知剩余时间，重试不会超出超时
+    """
+    # 非全量模式使用较短超时
+    timeout = PLUGIN_SEARCH_TIMEOUT if not use_all_plugins else PLUGIN_SEARCH_TIMEOUT_MAX
+    # 截止时间在创建任务时确定：在默认线程池中排队等待的时间同样计入，插件内不会超出外层 wait_for
+    expires = time.monotonic() + timeout
+    if asyncio.iscoroutine(search_func):
+        task = _run_coroutine_with_deadline(search_func, expires)
     else:
-        task = asyncio.wait_for(task, timeout=PLUGIN_SEARCH_TIMEOUT_MAX)
-    return task
+        task = asyncio.to_thread(run_with_deadline, expires, search_func)
+    return asyncio.wait_for(task, timeout=timeout)
+
+
+async def _run_coroutine_with_deadline(coro, expires: float):
+    with deadline_at(expires):
+        return await coro
+
+async def _timed_async_search(name: str, search_inst, keyword: str):
+    """异步插件的搜索包装，返回值与同步插件一致: (名称, 开始时间, 结果)"""
+    start_time = time.time()
+    return name, start_time, await search_inst.search(keyword)
+
 
 async def fetch_external_data(keyword: str, use_all_plugins: bool = False):
     """从多个数据源并发获取外部数据
@@ -198,25 +282,16 @@ async def fetch_external_data(keyword: str, use_all_plugins: bool = False):
         # 如果不使用所有插件且当前插件不在指定列表中，则跳过
         if not use_all_plugins and name not in SPECIFIC_PLUGINS:
             continue
-        if name == 'aipan':
-            # 特殊处理aipan的多个实例
-            for search in plugin_manager.plugin_instances[name]:
-                instance_name = f"{name}_{search.source_id}"
-                task = create_search_task(
-                    lambda s=search, n=instance_name: (n, time.time(), s.search(keyword)),
-                    use_all_plugins
-                )
-                named_tasks.append(task)
-                task_names.append(instance_name)
-        else:
-            search_inst = plugin_manager.plugin_instances.get(name)
-            if search_inst:
-                task = create_search_task(
-                    lambda s=search_inst, n=name: (n, time.time(), s.search(keyword)),
-                    use_all_plugins
-                )
-                named_tasks.append(task)
-                task_names.append(name)
+        # aipan 的多个数据源在插件内部并发请求并合并，与其他插件一样只占一个任务
+        search_inst = plugin_manager.plugin_instances.get(name)
+        if search_inst:
+            if asyncio.iscoroutinefunction(search_inst.search):
+                search_func = _timed_async_search(name, search_inst, keyword)
+            else:
+                search_func = lambda s=search_inst, n=name: (n, time.time(), s.search(keyword))
+            task = create_search_task(search_func, use_all_plugins)
+            named_tasks.append(task)
+            task_names.append(name)
     
     # 执行并发搜索
     search_results = await asyncio.gather(*named_tasks, return_exceptions=True)
@@ -226,9 +301,9 @@ async def fetch_external_data(keyword: str, use_all_plugins: bool = False):
         plugin_name = task_names[i] if i < len(task_names) else "Unknown"
         if isinstance(result, Exception):
             if isinstance(result, asyncio.TimeoutError):
-                logger.warning(f"搜索任务超时 [{plugin_name}]: {str(result)}")
+                logger.warning("搜索任务超时 [%s]: %s", plugin_name, result)
             else:
-                logger.error(f"搜索任务失败 [{plugin_name}]: {str(result)}")
+                logger.error("搜索任务失败 [%s]: %s", plugin_name, result)
             continue
         if not result or not isinstance(result, tuple) or len(result) != 3:
             continue
@@ -238,7 +313,7 @@ async def fetch_external_data(keyword: str, use_all_plugins: bool = False):
         valid_results.append(data)
         elapsed = time.time() - start_time
         time_records.append((name, elapsed))
-        logger.debug(f"接口[{name}] 耗时: {elapsed:.3f}秒")
+        logger.debug("接口[%s] 耗时: %.3f秒", name, elapsed)
     # 输出统计信息
     if time_records:
         names, times = zip(*time_records)
@@ -246,157 +321,471 @@ async def fetch_external_data(keyword: str, use_all_plugins: bool = False):
         avg_time = total_time / len(time_records)
         min_time = min(time_records, key=lambda x: x[1])
         max_time = max(time_records, key=lambda x: x[1])
-        logger.debug(f"接口调用统计:")
-        logger.debug(f"总调用次数: {len(time_records)}")
-        logger.debug(f"总耗时: {total_time:.3f}秒")
-        logger.debug(f"平均耗时: {avg_time:.3f}秒")
-        logger.debug(f"最快接口: [{min_time[0]}] {min_time[1]:.3f}秒")
-        logger.debug(f"最慢接口: [{max_time[0]}] {max_time[1]:.3f}秒")
+        logger.debug("接口调用统计:")
+        logger.debug("总调用次数: %s", len(time_records))
+        logger.debug("总耗时: %.3f秒", total_time)
+        logger.debug("平均耗时: %.3f秒", avg_time)
+        logger.debug("最快接口: [%s] %.3f秒", min_time[0], min_time[1])
+        logger.debug("最慢接口: [%s] %.3f秒", max_time[0], max_time[1])
 
     return valid_results
 
 
-@app.middleware("http")
-async def proxy_middleware(request: Request, call_next):
-    path = request.url.path
-    query = str(request.url.query)
-
-    # 新增：拦截 /api/douban/hot 且 category=bangumi，直接返回指定结果
-    if path == "/api/douban/hot":
-        import urllib.parse
-        query_params = dict(request.query_params)
-        if query_params.get("category") == "bangumi":
-            ret = Bangumi().get_bangumi_calendar()
-            return JSONResponse(
-                ret,
-                status_code=200
-            )
-
-    # 新增：拦截 /assets/douban-xxxx.js，转发并在数组末尾插入 Bangumi 分类
-    import re
-    if re.fullmatch(r"/assets/douban-[\w\-]+\.js", path):
-        target_url = f"{TARGET_SERVICE}{path}?{query}" if query else f"{TARGET_SERVICE}{path}"
-        async with httpx.AsyncClient(timeout=HTTPX_TIMEOUT) as client:
-            headers = dict(request.headers)
-            headers.pop("host", None)
-            resp = await client.get(target_url, headers=headers)
-            js_code = resp.text
-            # 用正则找到 const t = [ ... ];，在数组末尾插入新项
-            import re as _re
-            match = _re.search(
-                r"(const\s+t\s*=\s*\[)(.*?)(\]\s*;\s*export\s*\{\s*t\s+as\s+d\s*\}\s*;?)",
-                js_code,
-                _re.DOTALL | _re.IGNORECASE
-            )
-            if match:
-                arr_start, arr_body, arr_end = match.groups()
-                # 插入新项，注意逗号处理
-                arr_body = arr_body.rstrip()
-                if not arr_body.endswith(",") and arr_body.strip():
-                    arr_body += ","
-                arr_body += '''
+# 搜索结果缓存（(关键词, 是否全量插件) -> 各插件结果），正常搜索与批量预热共用
+SEARCH_CACHE_CONFIG = config.get("search_cache") or {}
+search_result_cache = TTLCache(
+    maxsize=SEARCH_CACHE_CONFIG.get("maxsize", 1024),
+    ttl=SEARCH_CACHE_CONFIG.get("ttl", 1800),
+    negative_ttl=SEARCH_CACHE_CONFIG.get("negative_ttl", 60)
+)
+# 正在执行的搜索任务，相同关键词的并发请求共享同一次插件调用
+_inflight_searches: Dict[tuple, asyncio.Future] = {}
+
+
+def _on_search_done(cache_key: tuple, task: asyncio.Future):
+    _inflight_searches.pop(cache_key, None)
+    if task.cancelled() or task.exception():
+        return
+    results = task.result()
+    if results:
+        search_result_cache.set(cache_key, results)
+    else:
+        search_result_cache.set_negative(cache_key)
+
+
+async def search_with_cache(keyword: str, use_all_plugins: bool = False, refresh: bool = False,
+                            ttl: float = None, record_stats: bool = True):
+    """带结果缓存的外部数据搜索
+    :param refresh: 为True时忽略已有缓存，重新获取并覆盖
+    :param ttl: 可选，覆盖默认缓存时间（秒）
+    :param record_stats: 为False时查询不计入缓存命中统计（预热使用）
+    等价关键词（全半角、大小写、标点、季/集写法不同）按规范形式共享缓存与同一次插件调用；
+    规范形式只用作缓存键，插件搜索的仍是首个请求的原始关键词
+    """
+    keyword = keyword.strip()
+    canonical = canonicalize(keyword)
+    if not canonical:
+        return []
+    cache_key = (canonical, use_all_plugins)
+    if not refresh:
+        found, cached = search_result_cache.lookup(cache_key, record=record_stats)
+        if found:
+            return cached or []
+    task = _inflight_searches.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(fetch_external_data(keyword, use_all_plugins))
+        _inflight_searches[cache_key] = task
+        task.add_done_callback(lambda t: _on_search_done(cache_key, t))
+    # shield: 单个请求被取消时不影响其他等待同一任务的请求
+    results = await asyncio.shield(task)
+    if ttl and results:
+        search_result_cache.set(cache_key, results, ttl)
+    return results
+
+
+# 本服务自身的接口前缀，不转发到目标服务
+LOCAL_API_PREFIX = "/_proxy"
+
+# 批量预热配置
+WARMUP_CONFIG = config.get("warmup") or {}
+WARMUP_CONCURRENCY = WARMUP_CONFIG.get("concurrency", 2)  # 同时执行的关键词数
+WARMUP_INTERVAL = WARMUP_CONFIG.get("interval", 1.0)  # 相邻关键词开始搜索的最小间隔（秒）
+WARMUP_MAX_KEYWORDS = WARMUP_CONFIG.get("max_keywords", 200)  # 单次批量的关键词上限
+
+
+async def warm_search_cache(keywords: list, use_all_plugins: bool = False, refresh: bool = False,
+                            ttl: float = None):
+    """批量执行关键词搜索并写入结果缓存，在全局并发和速率限制下运行
+    :param keywords: 关键词列表
+    :param refresh: 为True时即使已有缓存也重新获取
+    :param ttl: 可选，覆盖默认缓存时间（秒）
+    :return: 每个关键词的耗时统计
+    """
+    semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+    rate_lock = asyncio.Lock()
+    last_start = 0.0
+
+    async def warm_one(keyword: str):
+        nonlocal last_start
+        cache_key = (canonicalize(keyword), use_all_plugins)
+        if not refresh and search_result_cache.peek(cache_key):
+            return {"keyword": keyword, "cached": True, "elapsed": 0.0}
+        async with semaphore:
+            async with rate_lock:
+                wait = last_start + WARMUP_INTERVAL - time.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                last_start = time.time()
+            start_time = time.time()
+            try:
+                results = await search_with_cache(keyword, use_all_plugins, refresh, ttl, record_stats=False)
+            except Exception as e:
+                logger.error("预热搜索失败 [%s]: %s", keyword, e)
+                return {"keyword": keyword, "cached": False, "elapsed": round(time.time() - start_time, 3),
+                        "error": str(e)}
+            elapsed = time.time() - start_time
+            logger.debug("预热关键词[%s] 耗时: %.3f秒", keyword, elapsed)
+            return {
+                "keyword": keyword,
+                "cached": False,
+                "elapsed": round(elapsed, 3),
+                "plugins": len(results),
+                "results": sum(len(data.get("list", [])) for data in results)
+            }
+
+    # 按规范形式去重并保持顺序，同一规范形式保留首个原始关键词
+    unique = {}
+    for k in keywords:
+        if k and k.strip():
+            unique.setdefault(canonicalize(k), k.strip())
+    unique.pop("", None)
+    keywords = list(unique.values())
+    return await asyncio.gather(*(warm_one(k) for k in keywords))
+
+
+# Bangumi 每日放送预热配置：每天在低峰时段用当日放送的番剧标题预热搜索缓存
+BANGUMI_WARMUP_ENABLED = WARMUP_CONFIG.get("bangumi_enabled", True)
+BANGUMI_WARMUP_HOUR = WARMUP_CONFIG.get("bangumi_hour", 5)  # 每天执行的整点（本地时间）
+BANGUMI_WARMUP_RUN_ON_START = WARMUP_CONFIG.get("bangumi_run_on_start", False)
+BANGUMI_WARMUP_MAX_TITLES = WARMUP_CONFIG.get("bangumi_max_titles", 200)
+BANGUMI_WARMUP_ALL_PLUGINS = WARMUP_CONFIG.get("bangumi_use_all_plugins", False)
+# 预热结果保留到下一次预热，默认略长于一天
+BANGUMI_WARMUP_TTL = WARMUP_CONFIG.get("bangumi_ttl", 25 * 3600)
+
+
+def _seconds_until_hour(hour: int) -> float:
+    """距离下一个指定整点的秒数"""
+    now = datetime.now()
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+async def warm_bangumi_titles():
+    """拉取 Bangumi 当天放送的标题并刷新其搜索缓存（只预热当天，避免每轮搜索整周约 7 倍的标题）"""
+    try:
+        # Bangumi 的 weekday id 与 isoweekday 一致：1 为周一，7 为周日
+        titles = await Bangumi().calendar_titles(week=datetime.now().isoweekday())
+    except Exception as e:
+        logger.error("获取 Bangumi 放送标题失败: %s", e)
+        return
+    if not titles:
+        logger.warning("Bangumi 放送标题为空，跳过预热")
+        return
+    titles = titles[:BANGUMI_WARMUP_MAX_TITLES]
+    start_time = time.time()
+    report = await warm_search_cache(
+        titles,
+        use_all_plugins=BANGUMI_WARMUP_ALL_PLUGINS,
+        refresh=True,
+        ttl=BANGUMI_WARMUP_TTL
+    )
+    failed = sum(1 for r in report if "error" in r)
+    logger.info("Bangumi 预热完成: %s 个标题, 失败 %s 个, 耗时 %.3f秒", len(report), failed, time.time() - start_time)
+
+
+async def bangumi_warmup_loop():
+    """每天在 BANGUMI_WARMUP_HOUR 点执行一次 Bangumi 标题预热"""
+    if BANGUMI_WARMUP_RUN_ON_START:
+        await warm_bangumi_titles()
+    while True:
+        await asyncio.sleep(_seconds_until_hour(BANGUMI_WARMUP_HOUR))
+        await warm_bangumi_titles()
+
+
+@app.post(f"{LOCAL_API_PREFIX}/search/batch")
+async def batch_search(request: Request):
+    """批量搜索预热接口
+    请求体: {"keywords": ["关键词1", ...], "use_all_plugins": false, "refresh": false}
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        return JSONResponse({"error": "请求体不是合法JSON"}, status_code=400)
+    keywords = body.get("keywords") if isinstance(body, dict) else None
+    if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+        return JSONResponse({"error": "keywords 必须是字符串列表"}, status_code=400)
+    if len(keywords) > WARMUP_MAX_KEYWORDS:
+        return JSONResponse({"error": f"单次最多 {WARMUP_MAX_KEYWORDS} 个关键词"}, status_code=400)
+
+    start_time = time.time()
+    report = await warm_search_cache(
+        keywords,
+        use_all_plugins=bool(body.get("use_all_plugins", False)),
+        refresh=bool(body.get("refresh", False))
+    )
+    return {
+        "total": len(report),
+        "elapsed": round(time.time() - start_time, 3),
+        "keywords": report,
+        "cache": search_result_cache.stats()
+    }
+
+
+# 代理路由表：本服务接口 / 特殊改写 / 搜索拦截，未命中的路径原样转发
+path_router = PathRouter()
+path_router.add_prefix(LOCAL_API_PREFIX, "local")
+path_router.add_exact("/api/douban/hot", "douban_hot")
+path_router.add_pattern(r"/assets/douban-[\w\-]+\.js", "douban_js")
+for intercept_path in INTERCEPT_PATHS:
+    path_router.add_prefix(intercept_path, "search")
+path_router.compile()
+
+# 转发到目标服务的共享连接池，随应用关闭
+upstream_client = httpx.AsyncClient(timeout=HTTPX_TIMEOUT)
+
+DOUBAN_JS_ARRAY_REGEX = re.compile(
+    r"(const\s+t\s*=\s*\[)(.*?)(\]\s*;\s*export\s*\{\s*t\s+as\s+d\s*\}\s*;?)",
+    re.DOTALL | re.IGNORECASE
+)
+
+
+def _forward_headers(request: Request):
+    """转发用请求头（去掉 host），直接使用原始字节避免逐个解码复制"""
+    return [(k, v) for k, v in request.headers.raw if k != b"host"]
+
+
+def _target_url(path: str, query: str) -> str:
+    return f"{TARGET_SERVICE}{path}?{query}" if query else f"{TARGET_SERVICE}{path}"
+
+
+async def handle_douban_hot(request: Request):
+    """拦截 /api/douban/hot 且 category=bangumi，直接返回指定结果"""
+    if request.query_params.get("category") == "bangumi":
+        ret = await Bangumi().get_bangumi_calendar()
+        return JSONResponse(
+            ret,
+            status_code=200
+        )
+    return None
+
+
+# 改写后的豆瓣分类 JS 缓存：文件名带内容哈希，同一路径的内容不会变化，
+# 每次部署只需请求上游并改写一次；内存中按路径缓存，同时落盘供重启后复用
+ASSET_CACHE_CONFIG = config.get("asset_cache") or {}
+ASSET_CACHE_DIR = Path(ASSET_CACHE_CONFIG.get("dir", "asset_cache"))
+ASSET_CACHE_MAX_FILES = ASSET_CACHE_CONFIG.get("max_files", 20)  # 磁盘上保留的历史版本数
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+BANGUMI_CATEGORY_JS = '''
     {
         type: "tv_animation",
         category: "bangumi",
         api: "tv",
         title: "Bangumi"
     }'''
-                new_js = f"{arr_start}{arr_body}{arr_end}"
-                print(new_js)
-                return Response(content=new_js, media_type="application/javascript")
-            # 若未匹配到，原样返回
-            return Response(content=js_code, media_type="application/javascript")
-
-    if any(path.startswith(p) for p in INTERCEPT_PATHS):
-        # 从查询参数获取keyword
-        import urllib.parse
-        query_params = dict(request.query_params)
-        keyword = query_params.get("keyword", "")
-        # keyword以#结尾时，原始请求keyword也去除#
-        if keyword and keyword.endswith("#"):
-            query_params["keyword"] = keyword[:-1]
-            query = urllib.parse.urlencode(query_params)
-        # 并发获取原始数据和外部数据
-        target_url = f"{TARGET_SERVICE}{path}?{query}" if query else f"{TARGET_SERVICE}{path}"
-
-        async with httpx.AsyncClient(timeout=HTTPX_TIMEOUT) as client:
-            # 复制请求头
-            headers = dict(request.headers)
-            headers.pop("host", None)
-
-            # 并发执行
-            original_task = client.get(target_url, headers=headers) if request.method == "GET" else \
-                client.post(target_url, content=await request.body(), headers=headers)
-            # 根据keyword决定是否获取外部数据
-            tasks = [original_task]
-            if keyword and keyword.endswith("#"):
-                tasks.append(fetch_external_data(keyword[:-1], True))
-            else:
-                tasks.append(fetch_external_data(keyword[:-1]))
-            
+# 路径 -> (内容, ETag)
+rewritten_assets: Dict[str, tuple] = {}
+_inflight_assets: Dict[str, asyncio.Future] = {}
 
-            results = await asyncio.gather(*tasks)
-            original_response = results[0]
-            external_data = results[1] if len(results) > 1 else []
 
-            # 处理原始响应
-            try:
-                original_data = original_response.json()
-            except:
-                original_data = {"data": []}
-
-            # 合并数据
-            if "data" not in original_data:
-                original_data["data"] = []
-
-            if external_data:
-                for data in external_data:
-                    if data != []:  # 确保数据非空
-                        original_data["data"].append(data)
-
-            return JSONResponse(original_data, status_code=200)
-
-    # 正常代理流程
-    target_url = f"{TARGET_SERVICE}{path}?{query}" if query else f"{TARGET_SERVICE}{path}"
-
-    # 转发请求
-    async with httpx.AsyncClient(timeout=HTTPX_TIMEOUT) as client:
-        # 复制原始请求头
-        headers = dict(request.headers)
-        headers.pop("host", None)
-
-        # 根据请求方法转发
-        if request.method == "GET":
-            response = await client.get(target_url, headers=headers)
-        elif request.method == "POST":
-            body = await request.body()
-            response = await client.post(target_url, content=body, headers=headers)
-        else:
-            return JSONResponse(
-                {"error": "Method not supported"},
-                status_code=405
-            )
-
-    # 返回响应
-    headers = dict(response.headers)
-    if "content-length" in headers:
-        del headers["content-length"]
+def rewrite_douban_js(js_code: str) -> str:
+    """在 const t = [ ... ]; 数组末尾插入 Bangumi 分类，未匹配到时原样返回"""
+    match = DOUBAN_JS_ARRAY_REGEX.search(js_code)
+    if not match:
+        return js_code
+    arr_start, arr_body, arr_end = match.groups()
+    # 插入新项，注意逗号处理
+    arr_body = arr_body.rstrip()
+    if not arr_body.endswith(",") and arr_body.strip():
+        arr_body += ","
+    arr_body += BANGUMI_CATEGORY_JS
+    return f"{js_code[:match.start()]}{arr_start}{arr_body}{arr_end}{js_code[match.end():]}"
+
+
+def _asset_etag(content: bytes) -> str:
+    return '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
 
+
+def _asset_file(path: str) -> Path:
+    # 路由已限定为 /assets/douban-[\w-]+.js，文件名可直接使用
+    return ASSET_CACHE_DIR / path.rsplit("/", 1)[-1]
+
+
+def _load_asset_from_disk(path: str):
     try:
-        content = response.json()
-        return JSONResponse(
-            content=content,
-            status_code=response.status_code,
-            headers=headers
-        )
+        content = _asset_file(path).read_bytes()
+    except OSError:
+        return None
+    return content, _asset_etag(content)
+
+
+def _save_asset_to_disk(path: str, content: bytes):
+    try:
+        ASSET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        target = _asset_file(path)
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, target)
+        # 只保留最近的几个版本
+        files = sorted(ASSET_CACHE_DIR.glob("douban-*.js"), key=lambda f: f.stat().st_mtime, reverse=True)
+        for old in files[ASSET_CACHE_MAX_FILES:]:
+            old.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning("保存豆瓣JS缓存失败: %s", e)
+
+
+async def _fetch_rewritten_asset(request: Request):
+    """请求上游并改写，成功时写入内存与磁盘缓存；上游失败时返回原始响应"""
+    path = request.url.path
+    cached = await asyncio.to_thread(_load_asset_from_disk, path)
+    if cached:
+        rewritten_assets[path] = cached
+        return cached
+    resp = await upstream_client.get(
+        _target_url(path, request.url.query), headers=_forward_headers(request))
+    if resp.status_code != 200:
+        return resp
+    content = rewrite_douban_js(resp.text).encode("utf-8")
+    cached = rewritten_assets[path] = (content, _asset_etag(content))
+    await asyncio.to_thread(_save_asset_to_disk, path, content)
+    return cached
+
+
+async def handle_douban_js(request: Request):
+    """拦截 /assets/douban-xxxx.js，转发并在数组末尾插入 Bangumi 分类，改写结果长期缓存"""
+    path = request.url.path
+    cached = rewritten_assets.get(path)
+    if cached is None:
+        # 同一路径的并发请求共享一次上游请求
+        task = _inflight_assets.get(path)
+        if task is None:
+            task = _inflight_assets[path] = asyncio.ensure_future(_fetch_rewritten_asset(request))
+            task.add_done_callback(lambda _: _inflight_assets.pop(path, None))
+        cached = await asyncio.shield(task)
+        if isinstance(cached, httpx.Response):
+            return Response(content=cached.content, status_code=cached.status_code,
+                            media_type=cached.headers.get("content-type", "application/javascript"))
+
+    content, etag = cached
+    headers = {"ETag": etag, "Cache-Control": ASSET_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    # If-None-Match 使用弱比较，压缩后返回的 W/ ETag 同样命中
+    if if_none_match and (if_none_match.strip() == "*" or
+                          etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/javascript", headers=headers)
+
+
+async def handle_search(request: Request):
+    """搜索接口：并发获取原始数据和插件数据后合并"""
+    query = request.url.query
+    # 从查询参数获取keyword
+    query_params = dict(request.query_params)
+    keyword = query_params.get("keyword", "")
+    # keyword以#结尾时使用全部插件，原始请求keyword也去除#
+    use_all_plugins = keyword.endswith("#")
+    if use_all_plugins:
+        keyword = keyword[:-1]
+        query_params["keyword"] = keyword
+        query = urllib.parse.urlencode(query_params)
+    target_url = _target_url(request.url.path, query)
+    headers = _forward_headers(request)
+
+    # 并发执行
+    original_task = upstream_client.get(target_url, headers=headers) if request.method == "GET" else \
+        upstream_client.post(target_url, content=await request.body(), headers=headers)
+    tasks = [original_task, search_with_cache(keyword, use_all_plugins)]
+
+    results = await asyncio.gather(*tasks)
+    original_response = results[0]
+    external_data = results[1] if len(results) > 1 else []
+
+    # 合并结果可达数百KB，使用更快的序列化；压缩由 CompressionMiddleware 统一处理
+    return Response(merge_search_response(original_response.content, external_data),
+                    status_code=200, media_type="application/json")
+
+
+def merge_search_response(body: bytes, external_data) -> bytes:
+    """把插件结果块追加到上游响应的 data 数组中"""
+    blocks = [data for data in external_data or [] if data != []]  # 确保数据非空
+    if blocks:
+        # 插件结果直接拼接进上游字节，上游结构不符合时才解码合并
+        merged = json_backend.splice_array_member(body, "data", json_backend.dumps(blocks)[1:-1])
+        if merged is not None:
+            return merged
+
+    # 处理原始响应
+    try:
+        original_data = json_backend.loads(body)
     except ValueError:
-        return Response(
-            content=response.content,
-            status_code=response.status_code,
-            headers=headers,
-            media_type=response.headers.get("content-type")
+        original_data = {"data": []}
+    if not isinstance(original_data, dict):
+        original_data = {"data": []}
+
+    # 合并数据
+    if not isinstance(original_data.get("data"), list):
+        original_data["data"] = []
+    original_data["data"].extend(blocks)
+    return json_backend.dumps(original_data)
+
+
+async def proxy_pass(request: Request):
+    """正常代理流程"""
+    target_url = _target_url(request.url.path, request.url.query)
+    headers = _forward_headers(request)
+
+    # 根据请求方法转发
+    if request.method == "GET":
+        response = await upstream_client.get(target_url, headers=headers)
+    elif request.method == "POST":
+        body = await request.body()
+        response = await upstream_client.post(target_url, content=body, headers=headers)
+    else:
+        return JSONResponse(
+            {"error": "Method not supported"},
+            status_code=405
         )
 
+    # 返回响应；httpx 已解压上游内容，去掉原编码相关的头，由本服务重新压缩
+    headers = dict(response.headers)
+    for name in ("content-length", "content-encoding", "transfer-encoding"):
+        headers.pop(name, None)
+
+    # 上游字节原样返回，不再解码后重新编码 JSON
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        headers=headers,
+        media_type=response.headers.get("content-type")
+    )
+
+
+# 路由名 -> 处理函数，处理函数返回 None 时按正常代理流程转发
+ROUTE_HANDLERS = {
+    "douban_hot": handle_douban_hot,
+    "douban_js": handle_douban_js,
+    "search": handle_search,
+}
+
+
+@app.middleware("http")
+async def proxy_middleware(request: Request, call_next):
+    # 直接读取 scope 中的路径，避免为每个请求构建完整 URL 对象
+    route = path_router.route(request.scope["path"])
+    # 本服务自身接口直接交给路由处理
+    if route == "local":
+        return await call_next(request)
+    handler = ROUTE_HANDLERS.get(route)
+    if handler is not None:
+        response = await handler(request)
+        if response is not None:
+            return response
+    return await proxy_pass(request)
+
+
+# 响应压缩：后注册的中间件在外层，压缩作用于代理与合并后的最终响应
+COMPRESSION_CONFIG = config.get("compression") or {}
+if COMPRESSION_CONFIG.get("enabled", True):
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_CONFIG.get("minimum_size", 1024),
+        encodings=COMPRESSION_CONFIG.get("encodings", ["zstd", "br", "gzip"]),
+        gzip_level=COMPRESSION_CONFIG.get("gzip_level", 6),
+        brotli_quality=COMPRESSION_CONFIG.get("brotli_quality", 4),
+        zstd_level=COMPRESSION_CONFIG.get("zstd_level", 3),
+    )
+
 
 @app.get("/")
 async def root():
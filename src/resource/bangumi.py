@@ -1,10 +1,9 @@
 from datetime import datetime
-from functools import lru_cache
-import json
+import asyncio
 import time
 import logging
 
-import requests
+import httpx
 
 logger = logging.getLogger(__name__)
 
@@ -19,36 +18,117 @@ class Bangumi(object):
     }
     _base_url = "https://api.bgm.tv/"
     _page_num = 50
+    _timeout = 20
+    # 每日放送缓存：超过刷新间隔或跨天后在后台刷新，刷新期间继续返回旧数据
+    _calendar_refresh_interval = 3600
+    # 刷新失败后的退避时间：期间不再请求 API，直接返回旧数据（没有旧数据时返回空）
+    _calendar_retry_backoff = 60
+    _calendar_cache = {
+        "raw": None,         # 原始 calendar 数据
+        "cards": {},         # {weeknum: (weekday, [豆瓣风格卡片])}
+        "response": None,    # 不区分星期的完整返回结构
+        "updated_at": 0,
+        "day": "",
+        "failed_at": 0,      # 最近一次刷新失败的时间
+    }
+    _refresh_task = None
 
     def __init__(self):
         pass
 
     @classmethod
-    @lru_cache(maxsize=128)
-    def __invoke(cls, url, **kwargs):
+    async def __invoke(cls, url, **kwargs):
         req_url = cls._base_url + url
         params = {}
         if kwargs:
             params.update(kwargs)
         try:
-            resp = requests.get(req_url, params=params, timeout=20)
-            resp.raise_for_status()
-            return resp.json()
+            async with httpx.AsyncClient(timeout=cls._timeout) as client:
+                resp = await client.get(req_url, params=params)
+                resp.raise_for_status()
+                return resp.json()
         except Exception as e:
-            logger.error(f"Bangumi API请求失败: {e}")
+            logger.error("Bangumi API请求失败: %s", e)
             return None
 
-    def calendar(self):
+    async def calendar(self):
         """
-        获取每日放送
+        获取每日放送（原始数据，带缓存）
         """
-        return self.__invoke(self._urls["calendar"], _ts=datetime.strftime(datetime.now(), '%Y%m%d'))
+        await self._ensure_calendar()
+        return self._calendar_cache["raw"]
 
-    def detail(self, bid):
+    async def detail(self, bid):
         """
         获取番剧详情
         """
-        return self.__invoke(self._urls["detail"] % bid, _ts=datetime.strftime(datetime.now(), '%Y%m%d'))
+        return await self.__invoke(self._urls["detail"] % bid)
+
+    @classmethod
+    def _calendar_is_stale(cls):
+        cache = cls._calendar_cache
+        return (time.time() - cache["updated_at"] > cls._calendar_refresh_interval
+                or cache["day"] != datetime.now().strftime('%Y%m%d'))
+
+    @classmethod
+    async def _ensure_calendar(cls):
+        """
+        stale-while-revalidate：有缓存时立即返回，过期则后台刷新；首次无缓存时等待刷新完成
+        刷新失败后的退避期内不再请求，直接返回旧数据或空
+        """
+        if cls._calendar_cache["response"] is not None and not cls._calendar_is_stale():
+            return
+        if time.time() - cls._calendar_cache["failed_at"] < cls._calendar_retry_backoff:
+            return
+        if cls._refresh_task is None or cls._refresh_task.done():
+            cls._refresh_task = asyncio.ensure_future(cls._refresh_calendar())
+        if cls._calendar_cache["response"] is None:
+            await asyncio.shield(cls._refresh_task)
+
+    @classmethod
+    async def _refresh_calendar(cls):
+        """
+        拉取每日放送并预先转换为豆瓣风格卡片，失败时保留旧数据
+        """
+        start_time = time.time()
+        infos = await cls.__invoke(cls._urls["calendar"])
+        api_time = time.time() - start_time
+        logger.debug("Bangumi API请求耗时: %.3fs", api_time)
+        if not infos:
+            cls._calendar_cache["failed_at"] = time.time()
+            logger.warning("Bangumi 每日放送刷新失败，%ss 内返回旧数据", cls._calendar_retry_backoff)
+            return
+
+        cards = {}
+        ret_list = []
+        for info in infos:
+            weeknum = info.get("weekday", {}).get("id")
+            weekday = info.get("weekday").get("cn")
+            week_cards = []
+            for item in info.get("items") or []:
+                item["weekday"] = weekday
+                week_cards.append(cls._to_douban_card(item))
+            cards[int(weeknum)] = week_cards
+            ret_list.extend(week_cards)
+
+        cls._calendar_cache.update({
+            "raw": infos,
+            "cards": cards,
+            "response": cls._build_response(ret_list),
+            "updated_at": time.time(),
+            "day": datetime.now().strftime('%Y%m%d'),
+            "failed_at": 0,
+        })
+        logger.debug("Bangumi 每日放送已刷新，总耗时: %.3fs, 条目数: %s", time.time() - start_time, len(ret_list))
+
+    @staticmethod
+    def _build_response(ret_list):
+        return {
+            "success": True,
+            "code": 0,
+            "data": ret_list,
+            "message": "操作成功"
+        }
 
     @staticmethod
     def _to_douban_card(item):
@@ -116,47 +196,31 @@ class Bangumi(object):
             "id": id_
         }
 
-    def get_bangumi_calendar(self, page=1, week=None):
+    async def calendar_titles(self, week=None):
         """
-        获取每日放送
+        获取每日放送的番剧标题列表（优先中文名），用于搜索预热
         """
-        start_time = time.time()
-        
-        # API请求阶段
-        api_start = time.time()
-        infos = self.calendar()
-        api_time = time.time() - api_start
-        logger.debug(f"Bangumi API请求耗时: {api_time:.3f}s")
-        
-        if not infos:
-            return []
-            
-        # 数据处理阶段
-        process_start = time.time()
-        ret_list = []
-        
-        # 记录原始数据量
-        total_items = sum(len(info.get("items", [])) for info in infos)
-        logger.debug(f"开始处理数据，总条目数: {total_items}")
-        
+        infos = await self.calendar() or []
+        titles = []
         for info in infos:
             weeknum = info.get("weekday", {}).get("id")
             if week and int(weeknum) != int(week):
                 continue
-            weekday = info.get("weekday").get("cn")
-            items = info.get("items")
-            for item in items:
-                item["weekday"] = weekday
-                ret_list.append(self._to_douban_card(item))
-        
-        process_time = time.time() - process_start
-        total_time = time.time() - start_time
-        logger.debug(f"数据处理耗时: {process_time:.3f}s")
-        logger.debug(f"总耗时: {total_time:.3f}s, 返回结果数: {len(ret_list)}")
-        
-        return {
-            "success": True,
-            "code": 0,
-            "data": ret_list,
-            "message": "操作成功"
-        }
+            for item in info.get("items") or []:
+                title = item.get("name_cn") or item.get("name")
+                if title:
+                    titles.append(title)
+        # 去重并保持顺序
+        return list(dict.fromkeys(titles))
+
+    async def get_bangumi_calendar(self, page=1, week=None):
+        """
+        获取每日放送（豆瓣风格卡片），直接读取内存缓存
+        """
+        await self._ensure_calendar()
+        cache = self._calendar_cache
+        if cache["response"] is None:
+            return []
+        if not week:
+            return cache["response"]
+        return self._build_response(cache["cards"].get(int(week), []))
@@ -0,0 +1,58 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+
+class PathRouter:
+    """
+    代理中间件的路径路由表，启动时编译一次
+    - 精确路径 / 前缀 / 正则（整体匹配）三类规则按添加顺序决定优先级
+    - 所有规则合并为一个正则，匹配结果按路径缓存，规则数量不影响命中后的单次开销
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._rules: List[Tuple[str, str]] = []
+        self._names: List[str] = []
+        self._regex: Optional[re.Pattern] = None
+        self._route = None
+
+    def add_exact(self, path: str, name: str) -> "PathRouter":
+        return self._add(re.escape(path) + r"\Z", name)
+
+    def add_prefix(self, prefix: str, name: str) -> "PathRouter":
+        """与 str.startswith 语义一致"""
+        return self._add(re.escape(prefix), name)
+
+    def add_pattern(self, pattern: str, name: str) -> "PathRouter":
+        """与 re.fullmatch 语义一致"""
+        return self._add(f"(?:{pattern})\\Z", name)
+
+    def _add(self, regex: str, name: str) -> "PathRouter":
+        self._rules.append((regex, name))
+        self._route = None
+        return self
+
+    def compile(self) -> "PathRouter":
+        self._names = [name for _, name in self._rules]
+        if self._rules:
+            self._regex = re.compile("|".join(
+                f"(?P<r{i}>{regex})" for i, (regex, _) in enumerate(self._rules)))
+        else:
+            self._regex = None
+        self._route = lru_cache(maxsize=self.cache_size)(self._match)
+        return self
+
+    def _match(self, path: str) -> Optional[str]:
+        if self._regex is None:
+            return None
+        m = self._regex.match(path)
+        if m is None:
+            return None
+        return self._names[int(m.lastgroup[1:])]
+
+    def route(self, path: str) -> Optional[str]:
+        """返回命中规则的名称，未命中返回 None"""
+        if self._route is None:
+            self.compile()
+        return self._route(path)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 与运行服务时一致，src 目录作为导入根
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,94 @@
+import base64
+import hashlib
+
+import pytest
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
+
+from index.api import buyutu
+from index.api.buyutu import BuyutuSearch, decrypt_data, extract_secret_key
+
+SECRET_KEY = "bYt2024SecretKey"
+LINK = "https://pan.quark.cn/s/abcdef123456"
+
+
+def encrypt(plain: str, secret_key: str) -> str:
+    """与站点 detail.js 相同的加密方式：SHA256(密钥) 作 AES-256 key，前16字节作 iv"""
+    digest = hashlib.sha256(secret_key.encode()).digest()
+    cipher = AES.new(digest, AES.MODE_CBC, digest[:16])
+    return base64.b64encode(cipher.encrypt(pad(plain.encode(), AES.block_size))).decode()
+
+
+def obfuscator_base64(value: str) -> str:
+    """obfuscator.io 字符串数组的编码：大小写互换的 base64，去掉填充"""
+    return base64.b64encode(value.encode()).decode().rstrip("=").swapcase()
+
+
+SAMPLE = encrypt(LINK, SECRET_KEY)
+
+LITERAL_JS = """
+function _0x2215d5(_0x1f2e, _0x3a4b) { return CryptoJS.AES.decrypt(_0x1f2e, _0x3a4b); }
+var link = _0x2215d5(_0x4c1d9e, "%s");
+""" % SECRET_KEY
+
+OBFUSCATED_JS = """
+function _0x5e1c(){var _0x1a=['%s','%s','Y3J5CHRVsNm=','\\x64\\x65\\x63\\x72\\x79\\x70\\x74'];
+_0x5e1c=function(){return _0x1a;};return _0x5e1c();}
+(function(_0x2b,_0x3c){var _0x4d=_0x2b();}(_0x5e1c,0x1f2a3));
+""" % (obfuscator_base64("encryptedData"), obfuscator_base64(SECRET_KEY))
+
+
+def test_decrypt_round_trip():
+    assert decrypt_data(SAMPLE, SECRET_KEY) == LINK
+
+
+@pytest.mark.parametrize("js_code", [LITERAL_JS, OBFUSCATED_JS], ids=["literal", "swapcase-base64"])
+def test_extract_secret_key(js_code):
+    cipher = extract_secret_key(js_code, SAMPLE)
+    assert cipher is not None
+    assert cipher.secret_key == SECRET_KEY
+    assert cipher.decrypt(SAMPLE) == LINK
+
+
+def test_extract_secret_key_without_matching_candidate():
+    js_code = "var a = ['%s', 'otherCandidateKey'];" % obfuscator_base64("notTheKey123")
+    assert extract_secret_key(js_code, SAMPLE) is None
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.content = text.encode()
+
+    def raise_for_status(self):
+        pass
+
+
+def test_failed_extraction_is_negatively_cached(monkeypatch):
+    downloads = []
+
+    def fake_get(url, timeout=None):
+        downloads.append(url)
+        return FakeResponse("var a = ['nothingUseful'];")
+
+    monkeypatch.setattr(buyutu.requests, "get", fake_get)
+    search = BuyutuSearch()
+    url = "https://buyutu.com/js/detail.js"
+    assert search._get_cipher(url, SAMPLE) is None
+    assert search._get_cipher(url, SAMPLE) is None
+    assert len(downloads) == 1
+
+
+def test_cipher_cached_per_detail_js(monkeypatch):
+    downloads = []
+
+    def fake_get(url, timeout=None):
+        downloads.append(url)
+        return FakeResponse(OBFUSCATED_JS)
+
+    monkeypatch.setattr(buyutu.requests, "get", fake_get)
+    search = BuyutuSearch()
+    url = "https://buyutu.com/js/detail.js"
+    assert search._get_cipher(url, SAMPLE).secret_key == SECRET_KEY
+    assert search._get_cipher(url, SAMPLE).secret_key == SECRET_KEY
+    assert len(downloads) == 1
@@ -0,0 +1,188 @@
+import threading
+import time
+
+import pytest
+
+from index import cache as cache_module
+from index.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def counting(value):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return value
+
+    return fetch, calls
+
+
+def test_positive_result_cached_until_ttl(clock):
+    cache = TTLCache(ttl=10, negative_ttl=1)
+    fetch, calls = counting(["link"])
+    assert cache.get_or_fetch("k", fetch) == ["link"]
+    assert cache.get_or_fetch("k", fetch) == ["link"]
+    assert len(calls) == 1
+    clock.now += 11
+    assert cache.get_or_fetch("k", fetch) == ["link"]
+    assert len(calls) == 2
+
+
+def test_empty_result_negatively_cached(clock):
+    cache = TTLCache(ttl=10, negative_ttl=2)
+    fetch, calls = counting([])
+    assert cache.get_or_fetch("k", fetch) == []
+    assert cache.get_or_fetch("k", fetch) is None
+    assert len(calls) == 1
+    assert "k" in cache
+    clock.now += 3
+    cache.get_or_fetch("k", fetch)
+    assert len(calls) == 2
+
+
+def test_is_negative_predicate():
+    cache = TTLCache()
+    fetch, calls = counting({"downloads": []})
+    cache.get_or_fetch("k", fetch, is_negative=lambda d: not d["downloads"])
+    cache.get_or_fetch("k", fetch, is_negative=lambda d: not d["downloads"])
+    assert len(calls) == 1
+    assert cache.get("k") is None
+
+
+def test_exception_not_cached():
+    cache = TTLCache()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TimeoutError("upstream timeout")
+        return ["link"]
+
+    with pytest.raises(TimeoutError):
+        cache.get_or_fetch("k", flaky)
+    assert "k" not in cache
+    assert cache.get_or_fetch("k", flaky) == ["link"]
+    assert len(attempts) == 2
+
+
+def run_concurrently(cache, fetch, n=8):
+    results, errors = [None] * n, [None] * n
+
+    def worker(i):
+        try:
+            results[i] = cache.get_or_fetch("k", fetch)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def test_single_flight_shares_result():
+    cache = TTLCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ["link"]
+
+    threads, results, errors = run_concurrently(cache, slow)
+    assert started.wait(5)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert results == [["link"]] * len(threads)
+    assert errors == [None] * len(threads)
+
+
+def test_single_flight_shares_exception():
+    cache = TTLCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        raise ConnectionError("reset")
+
+    threads, results, errors = run_concurrently(cache, failing)
+    assert started.wait(5)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert all(isinstance(e, ConnectionError) for e in errors)
+    assert "k" not in cache
+
+
+def test_maxsize_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_max_bytes_evicts_oldest_and_tracks_bytes():
+    cache = TTLCache(maxsize=100, max_bytes=250, sizeof=lambda v: len(v))
+    cache.set("a", "x" * 100)
+    cache.set("b", "x" * 100)
+    assert cache.bytes == 200
+    cache.get("a")
+    cache.set("c", "x" * 100)
+    assert "b" not in cache
+    assert cache.bytes == 200
+    cache.pop("a")
+    assert cache.bytes == 100
+    # 单个超限条目仍会保留最近写入的一条
+    cache.set("d", "x" * 1000)
+    assert len(cache) == 1 and cache.bytes == 1000
+    cache.clear()
+    assert cache.bytes == 0
+
+
+def test_negative_entries_take_no_bytes():
+    cache = TTLCache(max_bytes=100, sizeof=lambda v: len(v))
+    cache.set_negative("a")
+    cache.set("b", "x" * 50)
+    assert cache.bytes == 50
+    assert len(cache) == 2
+
+
+def test_peek_and_unrecorded_lookup_skip_stats_and_lru():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.peek("a") and not cache.peek("missing")
+    assert cache.lookup("a", record=False) == (True, 1)
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 0
+    # 未计入的查询不刷新 LRU 顺序，"a" 仍是最久未使用的
+    cache.set("c", 3)
+    assert not cache.peek("a")
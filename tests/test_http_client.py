@@ -0,0 +1,227 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+import requests
+
+from index import http_client
+from index.http_client import DeadlineExceeded, RetryPolicy, deadline, run_with_deadline
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class Recorder:
+    """按顺序返回预设结果（响应状态码或异常），记录每次调用的超时参数"""
+
+    def __init__(self, *outcomes, delays=None):
+        self.outcomes = list(outcomes)
+        self.delays = list(delays or [])
+        self.timeouts = []
+        self.lock = threading.Lock()
+
+    def __call__(self, timeout):
+        with self.lock:
+            index = len(self.timeouts)
+            self.timeouts.append(timeout)
+        if index < len(self.delays):
+            time.sleep(self.delays[index])
+        outcome = self.outcomes[min(index, len(self.outcomes) - 1)]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+def test_attempt_timeout_capped_by_remaining():
+    send = Recorder(200)
+    with deadline(1.0):
+        resp = RetryPolicy(timeout=15).call(send)
+    assert resp.status_code == 200
+    assert send.timeouts[0] <= 1.0
+
+
+def test_no_deadline_uses_policy_timeout():
+    send = Recorder(200)
+    RetryPolicy(timeout=7).call(send)
+    assert send.timeouts == [7]
+
+
+def test_backoff_never_sleeps_past_deadline():
+    send = Recorder(requests.exceptions.ConnectionError("reset"))
+    policy = RetryPolicy(max_attempts=3, backoff=5, max_backoff=5)
+    start = time.monotonic()
+    with deadline(1.0):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            policy.call(send)
+    assert time.monotonic() - start < 0.5
+    assert len(send.timeouts) == 1
+
+
+def test_retries_server_errors_then_succeeds():
+    send = Recorder(503, 200)
+    resp = RetryPolicy(max_attempts=3, backoff=0.01).call(send)
+    assert resp.status_code == 200
+    assert len(send.timeouts) == 2
+
+
+@pytest.mark.parametrize("status", [400, 403, 404])
+def test_no_retry_on_client_errors(status):
+    send = Recorder(status, 200)
+    resp = RetryPolicy(max_attempts=3, backoff=0.01).call(send)
+    assert resp.status_code == status
+    assert len(send.timeouts) == 1
+
+
+def test_non_retryable_exception_propagates():
+    send = Recorder(ValueError("bad"), 200)
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=3, backoff=0.01).call(send)
+    assert len(send.timeouts) == 1
+
+
+def test_hedge_fires_after_hedge_after():
+    # 首个请求慢，对冲请求先返回
+    send = Recorder(200, 201, delays=[0.5, 0])
+    start = time.monotonic()
+    resp = RetryPolicy(hedge_after=0.1).call(send)
+    elapsed = time.monotonic() - start
+    assert resp.status_code == 201
+    assert len(send.timeouts) == 2
+    assert 0.1 <= elapsed < 0.4
+
+
+def test_no_hedge_when_first_attempt_is_fast():
+    send = Recorder(200, delays=[0])
+    RetryPolicy(hedge_after=0.2).call(send)
+    time.sleep(0.25)
+    assert len(send.timeouts) == 1
+
+
+def test_queueing_time_does_not_trigger_hedge(monkeypatch):
+    # 线程池被占满时首个请求排队，排队时间超过 hedge_after 也不应发出对冲请求
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(http_client, "_hedge_executor", executor)
+    executor.submit(time.sleep, 0.3)
+    send = Recorder(200, delays=[0])
+    start = time.monotonic()
+    resp = RetryPolicy(hedge_after=0.1).call(send)
+    assert resp.status_code == 200
+    assert time.monotonic() - start >= 0.25
+    assert len(send.timeouts) == 1
+    executor.shutdown()
+
+
+def test_hedge_clock_starts_when_request_runs(monkeypatch):
+    # 排队后开始执行、执行时间超过 hedge_after 的请求仍会对冲
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(http_client, "_hedge_executor", executor)
+    executor.submit(time.sleep, 0.2)
+    executor.submit(time.sleep, 0.2)
+    send = Recorder(200, 201, delays=[1.0, 0])
+    resp = RetryPolicy(hedge_after=0.1).call(send)
+    assert resp.status_code == 201
+    assert len(send.timeouts) == 2
+    executor.shutdown(wait=False)
+
+
+def test_deadline_exceeded_when_budget_too_small():
+    send = Recorder(200)
+    with deadline(0.1):
+        with pytest.raises(DeadlineExceeded):
+            RetryPolicy(min_attempt_time=0.5).call(send)
+    assert send.timeouts == []
+
+
+def test_run_with_deadline_uses_absolute_deadline():
+    # 截止时间在提交时确定，排队耗时计入
+    expires = time.monotonic() + 1.0
+    time.sleep(0.2)
+    left = run_with_deadline(expires, http_client.remaining)
+    assert left <= 0.8
+    assert http_client.remaining() is None
+
+
+def test_nested_deadline_keeps_earlier():
+    with deadline(0.5):
+        with deadline(10):
+            assert http_client.remaining() <= 0.5
+
+
+class AsyncRecorder(Recorder):
+    """Recorder 的协程版本，记录被取消的请求"""
+
+    def __init__(self, *outcomes, delays=None):
+        super().__init__(*outcomes, delays=delays)
+        self.cancelled = 0
+
+    async def __call__(self, timeout):
+        index = len(self.timeouts)
+        self.timeouts.append(timeout)
+        try:
+            if index < len(self.delays):
+                await asyncio.sleep(self.delays[index])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        outcome = self.outcomes[min(index, len(self.outcomes) - 1)]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+def run_async(policy, send, seconds=None):
+    async def main():
+        if seconds is None:
+            return await policy.acall(send)
+        with deadline(seconds):
+            return await policy.acall(send)
+    return asyncio.run(main())
+
+
+def test_acall_timeout_capped_by_remaining():
+    send = AsyncRecorder(200)
+    assert run_async(RetryPolicy(timeout=15), send, seconds=1.0).status_code == 200
+    assert send.timeouts[0] <= 1.0
+
+
+def test_acall_retries_server_errors():
+    send = AsyncRecorder(502, 200)
+    assert run_async(RetryPolicy(max_attempts=3, backoff=0.01), send).status_code == 200
+    assert len(send.timeouts) == 2
+
+
+@pytest.mark.parametrize("status", [400, 403, 404])
+def test_acall_no_retry_on_client_errors(status):
+    send = AsyncRecorder(status, 200)
+    assert run_async(RetryPolicy(max_attempts=3, backoff=0.01), send).status_code == status
+    assert len(send.timeouts) == 1
+
+
+def test_acall_backoff_never_sleeps_past_deadline():
+    send = AsyncRecorder(httpx.ConnectError("reset"))
+    start = time.monotonic()
+    with pytest.raises(httpx.ConnectError):
+        run_async(RetryPolicy(max_attempts=3, backoff=5, max_backoff=5), send, seconds=1.0)
+    assert time.monotonic() - start < 0.5
+    assert len(send.timeouts) == 1
+
+
+def test_acall_hedge_cancels_slower_request():
+    send = AsyncRecorder(200, 201, delays=[0.5, 0])
+    start = time.monotonic()
+    resp = run_async(RetryPolicy(hedge_after=0.1), send)
+    assert resp.status_code == 201
+    assert 0.1 <= time.monotonic() - start < 0.4
+    assert send.cancelled == 1
+
+
+def test_acall_deadline_exceeded():
+    send = AsyncRecorder(200)
+    with pytest.raises(DeadlineExceeded):
+        run_async(RetryPolicy(min_attempt_time=0.5), send, seconds=0.1)
+    assert send.timeouts == []
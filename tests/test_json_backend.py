@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from index import json_backend
+from index.json_backend import splice_array_member
+
+ITEMS = b'{"id":"x"},{"id":"y"}'
+
+
+def splice(body, key="data"):
+    return splice_array_member(body.encode("utf-8") if isinstance(body, str) else body, key, ITEMS)
+
+
+def assert_spliced(body, key="data"):
+    """拼接结果必须与解码后追加的结果一致"""
+    merged = splice(body, key)
+    assert merged is not None
+    expected = json.loads(body)
+    expected[key].extend([{"id": "x"}, {"id": "y"}])
+    assert json.loads(merged) == expected
+    return merged
+
+
+def test_appends_to_last_member():
+    assert_spliced('{"code":0,"data":[{"id":"a"}]}')
+
+
+def test_empty_array():
+    merged = assert_spliced('{"code":0,"data":[]}')
+    assert b"[," not in merged
+
+
+def test_empty_array_with_whitespace():
+    assert_spliced('{"code": 0, "data": [ \n ] }')
+
+
+@pytest.mark.parametrize("body", [
+    '{"data":[{"id":"a"}],"code":0}',
+    '{"data":[{"id":"a"}],"meta":{"list":[1,2]}}',
+    '{"data":[[1],[2]],"tail":[3]}',
+])
+def test_non_last_member(body):
+    assert_spliced(body)
+
+
+@pytest.mark.parametrize("body", [
+    '{ "code" : 0 ,\n  "data" :\t[ {"id": "a"} ]\n}\n',
+    '\n  {"data"  :  [1, 2]}  ',
+    '{"data":[1]\r\n}',
+])
+def test_whitespace_variants(body):
+    assert_spliced(body)
+
+
+def test_escaped_quotes_and_brackets_in_strings():
+    body = '{"msg":"he said \\"data\\": [ ] }","data":[{"title":"a]\\"}[{"}],"end":"]"}'
+    assert_spliced(body)
+
+
+def test_nested_data_key_is_ignored():
+    body = '{"meta":{"data":[1]},"data":[{"inner":{"data":[2]}}],"x":{"data":[]}}'
+    merged = assert_spliced(body)
+    result = json.loads(merged)
+    assert result["meta"]["data"] == [1]
+    assert result["x"]["data"] == []
+
+
+@pytest.mark.parametrize("body", [
+    '{"code":0}',
+    '{"data":{"list":[]}}',
+    '{"data":"[]"}',
+    '{"meta":{"data":[1]}}',
+    '[{"data":[]}]',
+    '{"data":[1],"data":[2]}',
+    '{"data":[1}',
+    '',
+])
+def test_unsupported_structure_returns_none(body):
+    assert splice(body) is None
+
+
+def test_no_items_returns_none():
+    assert splice_array_member(b'{"data":[]}', "data", b"") is None
+
+
+def test_dumps_dataclass_with_every_backend():
+    from index.base import CloudLink, SearchResult, result_block
+    block = result_block("x", "X", 1, [SearchResult("1", "t", cloudLinks=[CloudLink("u", "quark", "pw")])])
+    for name in json_backend.BACKENDS:
+        dumps, loads = json_backend.BACKENDS[name]
+        decoded = loads(dumps(block))
+        assert decoded["list"][0]["cloudLinks"][0] == {"link": "u", "cloudType": "quark", "password": "pw"}
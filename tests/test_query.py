@@ -0,0 +1,89 @@
+import pytest
+
+from index.query import canonicalize, matches
+
+
+@pytest.mark.parametrize("keyword", [
+    "进击的巨人第二季",
+    "进击的巨人 S2",
+    "进击的巨人　Season 02",
+    "进击的巨人-第二季",
+    "进击的巨人 第02季",
+])
+def test_season_variants_share_canonical_form(keyword):
+    assert canonicalize(keyword) == "进击的巨人 第2季"
+
+
+@pytest.mark.parametrize("keyword, expected", [
+    ("凡人修仙传 第十二话", "凡人修仙传 第12集"),
+    ("凡人修仙传EP12", "凡人修仙传 第12集"),
+    ("凡人修仙传 Episode 012", "凡人修仙传 第12集"),
+    ("第一百零五集", "第105集"),
+    ("Grey's Anatomy s01e02", "greys anatomy 第1季 第2集"),
+])
+def test_episode_markers(keyword, expected):
+    assert canonicalize(keyword) == expected
+
+
+@pytest.mark.parametrize("keyword, expected", [
+    ("哈利·波特", "哈利波特"),
+    ("哈利・波特", "哈利波特"),
+    ("进击的巨人 - 最终季", "进击的巨人最终季"),
+    ("Spider-Man", "spider man"),
+])
+def test_cjk_joiners_removed_only_between_cjk(keyword, expected):
+    assert canonicalize(keyword) == expected
+
+
+@pytest.mark.parametrize("keyword, expected", [
+    ("ＡＢＣ１２３", "abc123"),
+    ("复仇者联盟4：终局之战", "复仇者联盟4 终局之战"),
+    ("  Fate/Stay   Night ", "fate stay night"),
+    ("C++ 教程", "c++ 教程"),
+    ("ps5", "ps5"),
+])
+def test_width_case_and_punctuation_folding(keyword, expected):
+    assert canonicalize(keyword) == expected
+
+
+@pytest.mark.parametrize("keyword", ["", "   ", "！！", "……"])
+def test_blank_or_punctuation_only(keyword):
+    assert canonicalize(keyword) == ""
+
+
+@pytest.mark.parametrize("keyword", [
+    "进击的巨人第二季",
+    "Grey's Anatomy s01e02",
+    "哈利·波特 第三部",
+    "S.W.A.T. 第八季 EP03",
+    "ＡＢＣ　第十话",
+    "鬼灭之刃 第03季 第21集",
+])
+def test_idempotent(keyword):
+    once = canonicalize(keyword)
+    assert canonicalize(once) == once
+
+
+@pytest.mark.parametrize("keyword, text", [
+    ("进击的巨人 第二季", "【进击的巨人 S2】全集 1080P"),
+    ("哈利波特", "哈利·波特与魔法石"),
+    ("Breaking Bad", "绝命毒师 BREAKING.BAD 全五季"),
+    ("  ", "任意文本"),
+])
+def test_matches(keyword, text):
+    assert matches(keyword, text)
+
+
+@pytest.mark.parametrize("keyword, text", [
+    ("进击的巨人 第二季", "进击的巨人 第三季"),
+    ("哈利波特", "指环王"),
+    ("breaking bad", "breaking news"),
+])
+def test_matches_requires_every_token(keyword, text):
+    assert not matches(keyword, text)
+
+
+def test_matches_does_not_fill_keyword_cache():
+    canonicalize.cache_clear()
+    matches("哈利波特", "哈利·波特与魔法石 " * 10)
+    assert canonicalize.cache_info().currsize == 1